@@ -0,0 +1,74 @@
+import asyncio
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException, Request
+
+from core.persona_store import PersonaStore
+from services.job_queue import JobQueue
+
+if TYPE_CHECKING:
+    from workflows.workflow import PersonaWorkflow
+
+
+def username_from_url(reddit_url: str) -> str:
+    """
+    Extracts the username from a Reddit profile URL (eg - https://www.reddit.com/user/kojied/)
+
+    Raises:
+        HTTPException: 400 if the URL can't be parsed
+    """
+    try:
+        return reddit_url.strip().split("/")[-2]
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid Reddit URL")
+
+
+async def get_workflow(request: Request) -> "PersonaWorkflow":
+    """
+    Returns the process-wide PersonaWorkflow built during app startup
+    While it's still being built in the background (WORKFLOW_WARMUP=background), waits for the build
+
+    Args:
+        request (Request): Incoming request, used to reach the app state
+
+    Returns:
+        PersonaWorkflow: The shared, pre-warmed workflow
+
+    Raises:
+        HTTPException: 503 if the workflow couldn't be built
+    """
+    build = getattr(request.app.state, "workflow_build", None)
+    if build is not None and not build.done():
+        # Shielded, so a client giving up doesn't cancel the build for everyone else
+        await asyncio.shield(build)
+    workflow = getattr(request.app.state, "workflow", None)
+    if workflow is None:
+        detail = getattr(request.app.state, "workflow_error", None) or "Persona workflow is not ready"
+        raise HTTPException(status_code=503, detail=detail)
+    return workflow
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """
+    Returns the durable persona job queue opened during app startup
+
+    Raises:
+        HTTPException: 503 if the queue couldn't be opened
+    """
+    queue = getattr(request.app.state, "job_queue", None)
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Persona job queue is not available")
+    return queue
+
+
+def get_persona_store(request: Request) -> PersonaStore:
+    """
+    Returns the structured persona store opened during app startup
+
+    Raises:
+        HTTPException: 503 if the store is disabled or couldn't be opened
+    """
+    store = getattr(request.app.state, "persona_store", None)
+    if store is None:
+        raise HTTPException(status_code=503, detail="Persona store is not available")
+    return store
@@ -1,5 +1,142 @@
-from fastapi import FastAPI
-from api.routes import persona
+import asyncio
+import time
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+from fastapi import FastAPI, Request
+from api.profiling import ProfilingMiddleware
+from api.request_context import RequestIdMiddleware
+from api.routes import health, jobs, metrics, persona
+from configs.app_config import AppConfig
+from core.metrics import REGISTRY
+from core.persona_store import PersonaStore
+from services.job_queue import JobQueue, JobWorkerPool
+from logs.logging_config import intercept_stdlib_logging, logger
+
+_HTTP_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time until the response headers were sent", ["method", "route", "status"]
+)
+
+
+def _persona_workflow():
+    # Imported here, not at module level: LangGraph & LangChain would double the app's import time
+    from workflows.workflow import PersonaWorkflow
+
+    return PersonaWorkflow()
+
+
+async def _build_workflow(app: FastAPI):
+    """
+    Builds the persona workflow on a worker thread & starts the job workers on it
+
+    If the build fails, the error is kept in the app state for the readiness endpoint
+    instead of crashing the worker.
+    """
+    start = time.perf_counter()
+    try:
+        workflow_factory = getattr(app.state, "workflow_factory", None) or _persona_workflow
+        app.state.workflow = await asyncio.to_thread(workflow_factory)
+        app.state.workflow_build_seconds = time.perf_counter() - start
+        logger.info(f"Persona workflow warmed up in {app.state.workflow_build_seconds:.3f}s")
+    except Exception as e:
+        app.state.workflow_error = str(e)
+        logger.error(f"Couldn't build persona workflow at startup: {e}")
+        return
+
+    if app.state.job_queue is not None:
+        app.state.job_workers = JobWorkerPool.from_config(app.state.job_queue, app.state.workflow)
+        await app.state.job_workers.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Builds the persona workflow once per process & shares it across requests
+
+    The Reddit client, Groq client, output directory & compiled LangGraph are created here,
+    so the request path only runs the graph.
+
+    WORKFLOW_WARMUP picks when:
+        > background (default) - the app serves as soon as it's imported & the workflow is built alongside;
+                                 requests that need it wait for the build, health & metrics don't
+        > startup - startup waits for the build, as a pre-warmed replica should
+
+    The durable job queue is opened here too, & its workers start draining it once the workflow is warm.
+    So is the persona store behind the search endpoints.
+
+    Set 'app.state.workflow_factory' before startup to build the workflow some other way,
+    eg - on the offline fakes used by benchmarks/bench_end_to_end.py
+    """
+    # uvicorn has set up its loggers by now, route them (& httpx, praw, ...) into loguru
+    intercept_stdlib_logging()
+
+    app.state.workflow = None
+    app.state.workflow_build = None
+    app.state.job_queue = None
+    app.state.job_workers = None
+    app.state.persona_store = None
+    app.state.workflow_error = None
+    app.state.workflow_build_seconds = None
+
+    # The queue & the store are optional extras - if one can't be opened, its endpoints answer 503
+    # but persona generation still works
+    try:
+        app.state.job_queue = JobQueue.from_config()
+    except Exception as e:
+        app.state.job_queue = None
+        logger.error(f"Couldn't open the persona job queue at startup: {e}")
+    try:
+        app.state.persona_store = PersonaStore.from_config()
+    except Exception as e:
+        app.state.persona_store = None
+        logger.error(f"Couldn't open the persona store at startup: {e}")
+
+    warmup = (AppConfig.get_config_instance().get("WORKFLOW_WARMUP", "background") or "background").lower()
+    if warmup == "startup":
+        await _build_workflow(app)
+    else:
+        app.state.workflow_build = asyncio.create_task(_build_workflow(app))
+
+    yield
+
+    if app.state.workflow_build is not None:
+        await app.state.workflow_build
+    if app.state.job_workers is not None:
+        await app.state.job_workers.stop()
+    app.state.workflow = None
+    from core.llm import LLMManager
+
+    await LLMManager.aclose()
+    await logger.complete()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Times every request into http_request_duration_seconds, labelled by route template (not raw path)
+    Streaming responses are timed until their headers are sent
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        _HTTP_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status,
+        )
+
+
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestIdMiddleware)
+app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(health.router, prefix="/api", tags=["Health"])
 app.include_router(persona.router, prefix="/api", tags=["Persona"])
+app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
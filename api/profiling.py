@@ -0,0 +1,115 @@
+import asyncio
+import json
+import random
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from configs.app_config import AppConfig
+from core.metrics import collect_spans
+from core.profiler import StackSampler
+from logs.logging_config import logger
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in, per-request profiling for the persona API (plain ASGI middleware)
+
+    A request is profiled when PROFILING_ENABLED is on and either
+        > it carries the PROFILE_HEADER header (default: X-Profile) - with the PROFILE_TOKEN value, if one is set
+        > it's picked by PROFILE_SAMPLE_RATE (default: 0) & its path starts with PROFILE_PATH_PREFIX
+
+    While the request runs, a StackSampler takes a stack of every thread each PROFILE_INTERVAL_MS (default: 5)
+    & every span (workflow nodes, LLM calls) is timed. When it ends, PROFILE_DIR (default: logs/profiles) gets
+        > <profile id>.collapsed - collapsed stacks, for flamegraph.pl / speedscope
+        > <profile id>.json - request, duration, sample count & the node/LLM timing breakdown
+    & the response carries an 'X-Profile-Id' header. One request is profiled at a time, others run unprofiled.
+
+    Disabled (the default), a request costs one attribute check on top of the wrapped app.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        config = AppConfig.get_config_instance()
+        self.enabled = config.get_bool("PROFILING_ENABLED", False)
+        self.sample_rate = max(0.0, min(1.0, config.get_float("PROFILE_SAMPLE_RATE", 0.0)))
+        self.header = (config.get("PROFILE_HEADER", "X-Profile") or "X-Profile").lower().encode("latin-1")
+        self.token = config.get("PROFILE_TOKEN") or None
+        self.path_prefix = config.get("PROFILE_PATH_PREFIX", "/api/generate-persona")
+        self.interval = max(0.001, config.get_float("PROFILE_INTERVAL_MS", 5.0) / 1000.0)
+        self.output_dir = Path(config.get("PROFILE_DIR", "logs/profiles"))
+        self._busy = threading.Lock()
+        if self.enabled:
+            logger.info(f"Request profiling enabled (header {self.header.decode()}, sample rate {self.sample_rate})")
+
+    def _wants_profile(self, scope: Dict[str, Any]) -> bool:
+        for name, value in scope.get("headers", ()):
+            if name == self.header:
+                return self.token is None or value.decode("latin-1") == self.token
+        return bool(self.sample_rate) and scope["path"].startswith(self.path_prefix) and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http" or not self._wants_profile(scope):
+            return await self.app(scope, receive, send)
+        if not self._busy.acquire(blocking=False):
+            logger.debug(f"Skipping profile of {scope['path']}, another request is being profiled")
+            return await self.app(scope, receive, send)
+
+        profile_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        status: Dict[str, Optional[int]] = {"code": None}
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        sampler = StackSampler(interval=self.interval)
+        try:
+            with collect_spans() as spans:
+                sampler.start()
+                try:
+                    await self.app(scope, receive, _send)
+                finally:
+                    sampler.stop()
+        finally:
+            self._busy.release()
+            # Collapsing the stacks & writing both files is blocking work, kept off the event loop
+            await asyncio.to_thread(self._write, profile_id, scope, status["code"], sampler, spans)
+
+    def _write(self, profile_id: str, scope: Dict[str, Any], status: Optional[int], sampler: StackSampler,
+               spans: List[Dict[str, Any]]):
+        """
+        Saves the collapsed stacks & the JSON summary, logging instead of failing the request on errors
+        """
+        origin = sampler.started_at or 0.0
+        breakdown = [
+            {"name": s["name"], "start_ms": round((s["start"] - origin) * 1000, 2), "duration_ms": round(s["seconds"] * 1000, 2)}
+            for s in sorted(spans, key=lambda s: s["start"])
+        ]
+        summary = {
+            "id": profile_id,
+            "method": scope.get("method"),
+            "path": scope.get("path"),
+            "status": status,
+            "duration_ms": round(sampler.elapsed * 1000, 2),
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": sampler.samples,
+            "spans": breakdown,
+        }
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            (self.output_dir / f"{profile_id}.collapsed").write_text(sampler.collapsed(), encoding="utf-8")
+            (self.output_dir / f"{profile_id}.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Couldn't write profile {profile_id}: {e}")
+            return
+
+        nodes = ", ".join(f"{s['name'].removeprefix('persona.node.')}={s['duration_ms']:.0f}ms"
+                          for s in breakdown if s["name"].startswith("persona.node."))
+        logger.info(
+            f"Profiled {summary['method']} {summary['path']} in {summary['duration_ms']:.0f}ms "
+            f"({sampler.samples} samples) -> {self.output_dir / profile_id}.collapsed [{nodes}]"
+        )
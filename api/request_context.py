@@ -0,0 +1,40 @@
+import re
+import uuid
+
+from logs.logging_config import request_context
+
+# Incoming ids are only trusted when they look like ids, so they can't inject anything into the logs
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{1,64}$")
+
+
+class RequestIdMiddleware:
+    """
+    Gives every HTTP request an id & tags all of its log records with it (plain ASGI middleware)
+
+    The caller's X-Request-ID header is reused when present & well-formed, otherwise a new id is generated.
+    Either way it's echoed back in the response's X-Request-ID header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _VALID_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", request_id.encode())]}
+            await send(message)
+
+        with request_context(request_id):
+            await self.app(scope, receive, _send)
@@ -0,0 +1,49 @@
+import asyncio
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from core.rate_governor import RateGovernor
+
+router = APIRouter()
+
+
+@router.get("/health")
+async def health():
+    """
+    Liveness probe - answers as long as the process is serving requests
+    """
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready(request: Request):
+    """
+    Readiness probe - reports whether the shared workflow & its clients are built
+
+    Returns:
+        JSONResponse: 200 once the workflow is warm, 503 otherwise - 'warming_up' while it's being built,
+                      or with the build error, if any
+    """
+    state = request.app.state
+    is_ready = getattr(state, "workflow", None) is not None
+    build = getattr(state, "workflow_build", None)
+    warming_up = not is_ready and build is not None and not build.done()
+    body = {
+        "status": "ready" if is_ready else "warming_up" if warming_up else "not_ready",
+        "workflow": is_ready,
+        "build_seconds": getattr(state, "workflow_build_seconds", None),
+        "error": getattr(state, "workflow_error", None),
+    }
+    return JSONResponse(status_code=200 if is_ready else 503, content=body)
+
+
+@router.get("/rate-limits")
+async def rate_limits():
+    """
+    Reports the Reddit & Groq rate governors: current budget, queued callers, queue wait & 429 counts
+
+    Returns:
+        dict: Metrics per upstream (buckets appear once they've been used)
+    """
+    return await asyncio.to_thread(RateGovernor.stats)
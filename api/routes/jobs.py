@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel
+from api.dependencies import get_job_queue, username_from_url
+from services.job_queue import JobQueue
+
+router = APIRouter()
+
+
+class PersonaJobRequest(BaseModel):
+    reddit_url: str
+
+
+@router.post("/personas/jobs", status_code=202)
+async def create_persona_job(data: PersonaJobRequest, request: Request, queue: JobQueue = Depends(get_job_queue)):
+    """
+    Enqueues persona generation for a Reddit user & returns immediately
+
+    Args:
+        data (PersonaJobRequest): Contains the Reddit URL of the user
+        queue (JobQueue): Durable job queue opened at app startup
+
+    Returns:
+        dict: The queued job, poll '/api/personas/jobs/{id}' for its result
+    """
+    username = username_from_url(data.reddit_url)
+    job = await asyncio.to_thread(queue.enqueue, username)
+
+    workers = getattr(request.app.state, "job_workers", None)
+    if workers is not None:
+        workers.notify()
+
+    return {"id": job["id"], "username": job["username"], "status": job["status"]}
+
+
+@router.get("/personas/jobs/stats")
+async def persona_job_stats(queue: JobQueue = Depends(get_job_queue)):
+    """
+    Reports queue depth, running jobs & average wait/run time of recent jobs
+    """
+    return await asyncio.to_thread(queue.stats)
+
+
+@router.get("/personas/jobs/{job_id}")
+async def get_persona_job(job_id: str, queue: JobQueue = Depends(get_job_queue)):
+    """
+    Returns the status of a persona job, with the persona once it's done
+
+    Raises:
+        HTTPException: 404 if the job id is unknown
+    """
+    job = await asyncio.to_thread(queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,45 @@
+import asyncio
+from typing import Iterator, List, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.metrics import REGISTRY, Sample
+from core.rate_governor import RateGovernor
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _rate_governor_gauges() -> Iterator[Tuple[str, str, List[Sample]]]:
+    """
+    Reports the Reddit & Groq token buckets as gauges, read at scrape time
+    """
+    stats = RateGovernor.stats()
+    gauges = (
+        ("budget", "rate_governor_budget", "Tokens left in the bucket (negative while callers are queued)"),
+        ("queued", "rate_governor_queued", "Callers waiting for a token"),
+        ("avg_wait_seconds", "rate_governor_avg_wait_seconds", "Average time callers waited for a token"),
+        ("max_wait_seconds", "rate_governor_max_wait_seconds", "Longest time a caller waited for a token"),
+        ("throttled", "rate_governor_throttled", "Rate-limited (429) responses seen so far"),
+    )
+    for key, name, documentation in gauges:
+        yield name, documentation, [({"upstream": upstream}, float(bucket[key])) for upstream, bucket in sorted(stats.items())]
+
+
+REGISTRY.register_collector(_rate_governor_gauges)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint - node, Reddit, LLM & HTTP latency histograms, token & error counters,
+    & rate governor gauges in the text exposition format
+
+    Returns:
+        PlainTextResponse: 'text/plain; version=0.0.4' metrics
+    """
+    # Collectors read the rate governor, which hits SQLite when its buckets are shared
+    body = await asyncio.to_thread(REGISTRY.render)
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,33 +1,226 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import re
+from typing import TYPE_CHECKING, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from workflows.workflow import PersonaWorkflow
+from api.dependencies import get_persona_store, get_workflow, username_from_url
+from configs.app_config import AppConfig
+from core.persona_store import PersonaStore
+from document_processing.utils import TextCleaner
+
+# The workflow & LLM modules are imported on first use - with LangGraph & the HTTP client behind them
+if TYPE_CHECKING:
+    from workflows.workflow import PersonaWorkflow
 
 router = APIRouter()
 
 class PersonaRequest(BaseModel):
     reddit_url: str
 
+
+class BulkPersonaRequest(BaseModel):
+    users: List[str]
+    max_concurrency: Optional[int] = None
+
+
+_USERNAME_PATTERN = re.compile(r"^[\w-]{3,20}$")
+
+
 @router.post("/generate-persona")
-async def generate_persona(data: PersonaRequest):
+async def generate_persona(data: PersonaRequest, workflow: "PersonaWorkflow" = Depends(get_workflow)):
     """
     Endpoint to generate a persona based on a user's Reddit activity
     Extracts the username from the given Reddit profile URL, then runs the persona workflow using LangGraph.
 
     Args:
         data (PersonaRequest): Contains the Reddit URL of the user
+        workflow (PersonaWorkflow): Shared workflow built once at app startup
 
     Returns:
-        dict: A dictionary with the generated persona under the key 'persona'
+        dict: A dictionary with the generated persona under the key 'persona',
+              the citation check results under 'citations' & the near-duplicates collapsed under 'dedup'
     """
-    try:
-        username = data.reddit_url.strip().split("/")[-2]
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid Reddit URL")
+    username = username_from_url(data.reddit_url)
 
-    workflow = PersonaWorkflow()
     result = await workflow.run(username=username)
 
     if result and result.get("response"):
-        return {"persona": result["response"]}
+        return {
+            "persona": result["response"],
+            "citations": result.get("citations", []),
+            "dedup": result.get("dedup", {}),
+        }
 
     raise HTTPException(status_code=500, detail=result.get("error", "Persona generation failed"))
+
+
+@router.post("/generate-persona/stream")
+async def generate_persona_stream(data: PersonaRequest, workflow: "PersonaWorkflow" = Depends(get_workflow)):
+    """
+    Server-sent-events variant of '/generate-persona'
+
+    Streams 'node' events as each graph node (scraper, analyzer, formatter) finishes, 'token' events
+    while the LLM writes the persona, then a single 'done' (with the full persona) or 'error' event.
+
+    Args:
+        data (PersonaRequest): Contains the Reddit URL of the user
+        workflow (PersonaWorkflow): Shared workflow built once at app startup
+
+    Returns:
+        StreamingResponse: 'text/event-stream' response
+    """
+    username = username_from_url(data.reddit_url)
+
+    async def event_source():
+        async for event in workflow.astream(username=username):
+            yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/generate-persona/bulk")
+async def generate_persona_bulk(data: BulkPersonaRequest, workflow: "PersonaWorkflow" = Depends(get_workflow)):
+    """
+    Endpoint to generate personas for many Reddit users in one call
+
+    Accepts profile URLs or bare usernames (optionally prefixed with 'u/'), drops duplicates & runs
+    the workflows concurrently. Results are streamed as NDJSON - one line per user, in completion order.
+
+    Args:
+        data (BulkPersonaRequest): Users to analyze & an optional concurrency override
+            (capped at BULK_MAX_CONCURRENCY, default: 8)
+        workflow (PersonaWorkflow): Shared workflow built once at app startup
+
+    Returns:
+        StreamingResponse: 'application/x-ndjson' response with {"username", "status", "persona"|"error"} lines
+    """
+    config = AppConfig.get_config_instance()
+    max_users = config.get_int("BULK_MAX_USERS", 1000)
+    if len(data.users) > max_users:
+        raise HTTPException(status_code=400, detail=f"At most {max_users} users per bulk request")
+
+    max_concurrency = config.get_int("BULK_MAX_CONCURRENCY", 8)
+    if data.max_concurrency:
+        max_concurrency = max(1, min(data.max_concurrency, max_concurrency))
+
+    usernames = []
+    invalid = []
+    for target in data.users:
+        username = TextCleaner.extract_username_from_url(target) or target.strip().removeprefix("u/").strip("/")
+        if _USERNAME_PATTERN.match(username):
+            usernames.append(username)
+        else:
+            invalid.append(target)
+
+    async def ndjson_lines():
+        for target in invalid:
+            yield json.dumps({"username": target, "status": "error", "error": "Invalid Reddit username or URL"}) + "\n"
+        async for result in workflow.run_many(usernames, max_concurrency=max_concurrency):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/persona-cache/stats")
+async def persona_cache_stats(workflow: "PersonaWorkflow" = Depends(get_workflow)):
+    """
+    Reports hit/miss counters of the persona result cache
+
+    Returns:
+        dict: Cache statistics, or {"enabled": False} when PERSONA_CACHE_ENABLED is off
+    """
+    cache = workflow.analyzer_node.cache
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/llm-connections/stats")
+async def llm_connection_stats():
+    """
+    Reports how many memoized LLM clients exist & how often their shared HTTP pool reused a connection
+
+    Returns:
+        dict: Client count, requests, new/reused connections & reuse ratio
+    """
+    from core.llm import LLMManager
+
+    return LLMManager.connection_stats()
+
+
+@router.get("/llm-backends/stats")
+async def llm_backend_stats():
+    """
+    Reports hedging/failover counters & per-backend circuit state and latency of the LLM router
+
+    Returns:
+        dict: Router statistics, or {"enabled": False} unless LLM_BACKENDS is set
+    """
+    from core.llm import LLMManager
+
+    stats = LLMManager.router_stats()
+    if stats is None:
+        return {"enabled": False}
+    return {"enabled": True, **stats}
+
+
+@router.get("/llm-cache/stats")
+async def llm_cache_stats():
+    """
+    Reports hit/miss counters, evictions & size of the exact-match LLM response cache
+
+    Returns:
+        dict: Cache statistics, or {"enabled": False} unless LLM_CACHE_ENABLED is on
+    """
+    from core.llm import LLMManager
+
+    cache = LLMManager.get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/personas/search")
+async def search_personas(q: str = Query(..., min_length=1),
+                          label: Optional[str] = None,
+                          limit: int = Query(20, ge=1, le=200),
+                          store: PersonaStore = Depends(get_persona_store)):
+    """
+    Full-text search over the attribute values & citations of every stored persona
+
+    Args:
+        q (str): Words that must all appear, eg - "fintech"
+        label (Optional[str]): Restrict to one attribute, eg - "Occupation"
+        limit (int): Max results (default: 20)
+
+    Returns:
+        dict: Matching attributes under 'results', most recently stored first
+    """
+    results = await asyncio.to_thread(store.search, q, label=label, limit=limit)
+    return {"query": q, "label": label, "results": results}
+
+
+@router.get("/personas/{username}")
+async def get_stored_persona(username: str, store: PersonaStore = Depends(get_persona_store)):
+    """
+    Returns a stored persona as structured attributes, along with its card text
+
+    Raises:
+        HTTPException: 404 if no persona is stored for the user
+    """
+    record = await asyncio.to_thread(store.get, username)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"No stored persona for '{username}'")
+    return {
+        "username": record["persona"].username,
+        "attributes": [attribute.model_dump() for attribute in record["persona"].attributes],
+        "persona": record["persona_text"],
+        "updated_at": record["updated_at"],
+    }
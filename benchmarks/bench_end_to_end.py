@@ -0,0 +1,171 @@
+"""
+Benchmark: end-to-end persona generation, offline, at several concurrency levels
+
+Drives 'PersonaWorkflow.run' directly & the FastAPI app ('POST /api/generate-persona', in-process over
+httpx's ASGI transport) with Reddit & the LLM replaced by the record/replay fakes in benchmarks/fakes.py,
+so no credentials or network are needed & runs are comparable. Each level reports throughput,
+latency percentiles & errors; '--json' also writes them to a file to diff against a baseline.
+
+Stores & output files go to a temporary directory; the persona & corpus caches are off so every
+request does the full work.
+
+Run with:
+    python -m benchmarks.bench_end_to_end --requests 100 --concurrency 1,8,32
+    python -m benchmarks.bench_end_to_end --cassette cassette.json --target api
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("GROQ_MODEL_NAME", "meta-llama/llama-4-scout-17b-16e-instruct")
+os.environ.setdefault("REDDIT_CLIENT_ID", "bench-client")
+os.environ.setdefault("REDDIT_CLIENT_SECRET", "bench-secret")
+os.environ.setdefault("REDDIT_USER_AGENT", "bench-agent")
+os.environ.setdefault("WORKFLOW_WARMUP", "startup")
+os.environ.setdefault("PERSONA_CACHE_ENABLED", "false")
+os.environ.setdefault("CORPUS_STORE_ENABLED", "false")
+
+from benchmarks.fakes import Cassette, build_offline_workflow
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def _summarize(target: str, concurrency: int, samples: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """
+    Prints one result line & returns it as a dict (latencies in milliseconds)
+    """
+    ordered = sorted(samples) or [0.0]
+    result = {
+        "target": target,
+        "concurrency": concurrency,
+        "requests": len(samples) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(samples) / elapsed, 3) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p90_ms": round(_percentile(ordered, 0.90) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 0.99) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+    print(
+        f"{target:<9} c={concurrency:<4} {result['throughput_rps']:8.2f} req/s  p50={result['p50_ms']:9.2f}ms "
+        f"p90={result['p90_ms']:9.2f}ms  p99={result['p99_ms']:9.2f}ms  errors={errors}"
+    )
+    return result
+
+
+async def _drive(call: Callable[[str], Awaitable[bool]], usernames: List[str], requests: int, concurrency: int):
+    """
+    Sends 'requests' calls, cycling through 'usernames', with at most 'concurrency' in flight
+
+    Returns:
+        tuple: (latencies of successful calls, error count, wall-clock seconds)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[float] = []
+    errors = 0
+
+    async def _one(i: int):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                ok = await call(usernames[i % len(usernames)])
+            except Exception:
+                ok = False
+            if ok:
+                samples.append(time.perf_counter() - start)
+            else:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_one(i) for i in range(requests)))
+    return samples, errors, time.perf_counter() - start
+
+
+async def bench_workflow(workflow, usernames: List[str], requests: int, levels: List[int]) -> List[Dict[str, Any]]:
+    async def _call(username: str) -> bool:
+        result = await workflow.run(username)
+        return bool(result.get("response")) and not result.get("error")
+
+    results = []
+    for concurrency in levels:
+        samples, errors, elapsed = await _drive(_call, usernames, requests, concurrency)
+        results.append(_summarize("workflow", concurrency, samples, errors, elapsed))
+    return results
+
+
+async def bench_api(workflow, usernames: List[str], requests: int, levels: List[int]) -> List[Dict[str, Any]]:
+    import httpx
+    from api.main import app, lifespan
+
+    app.state.workflow_factory = lambda: workflow
+    results = []
+    async with lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            async def _call(username: str) -> bool:
+                response = await client.post(
+                    "/api/generate-persona", json={"reddit_url": f"https://www.reddit.com/user/{username}/"}
+                )
+                return response.status_code == 200
+
+            for concurrency in levels:
+                samples, errors, elapsed = await _drive(_call, usernames, requests, concurrency)
+                results.append(_summarize("api", concurrency, samples, errors, elapsed))
+    return results
+
+
+async def main(args):
+    cassette = Cassette.load(args.cassette) if args.cassette else Cassette.synthetic(users=args.users, items=args.items)
+    usernames = cassette.usernames()
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    with tempfile.TemporaryDirectory(prefix="bench-e2e-") as workdir:
+        os.chdir(workdir)
+        workflow = build_offline_workflow(
+            cassette, reddit_latency=args.reddit_latency, llm_latency=args.llm_latency, jitter=args.jitter
+        )
+        print(
+            f"{len(usernames)} users, {args.requests} requests per level, "
+            f"reddit latency={args.reddit_latency}s, llm latency={args.llm_latency}s, jitter={args.jitter}s"
+        )
+
+        results = []
+        if args.target in ("workflow", "both"):
+            results += await bench_workflow(workflow, usernames, args.requests, levels)
+        if args.target in ("api", "both"):
+            results += await bench_api(workflow, usernames, args.requests, levels)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline end-to-end persona generation benchmark")
+    parser.add_argument("--cassette", default=None, help="Recorded cassette (default: synthetic users)")
+    parser.add_argument("--users", type=int, default=20, help="Synthetic users")
+    parser.add_argument("--items", type=int, default=25, help="Synthetic posts & comments per user (each)")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--reddit-latency", type=float, default=0.15)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--target", choices=("workflow", "api", "both"), default="both")
+    parser.add_argument("--json", default=None, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.json:
+        args.json = os.path.abspath(args.json)
+    if args.cassette:
+        args.cassette = os.path.abspath(args.cassette)
+    asyncio.run(main(args))
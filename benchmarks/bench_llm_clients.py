@@ -0,0 +1,78 @@
+"""
+Benchmark: memoized LLM clients on a shared HTTP pool vs. a fresh ChatGroq per call
+
+Runs against a local stand-in of the Groq API (benchmarks/standin.py), so no API key or network is needed.
+'before' builds a new ChatGroq - with its own connection pool - for every call, like 'LLM.get_llm' used to;
+'after' goes through 'LLMManager.get_llm', which memoizes clients & shares one keep-alive pool.
+Both the client-side counters (LLMManager.connection_stats) & the server's connection count are reported.
+
+Run with:
+    python -m benchmarks.bench_llm_clients --calls 200 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.standin import StandInLLMServer
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("GROQ_MODEL_NAME", "meta-llama/llama-4-scout-17b-16e-instruct")
+os.environ.setdefault("REDDIT_CLIENT_ID", "bench-client")
+os.environ.setdefault("REDDIT_CLIENT_SECRET", "bench-secret")
+os.environ.setdefault("REDDIT_USER_AGENT", "bench-agent")
+
+
+def _summarize(label: str, samples: list[float], elapsed: float, connections: int):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<34} {len(samples) / elapsed:8.1f} calls/s  p50={statistics.median(samples) * 1000:7.2f}ms "
+        f"p95={p95 * 1000:7.2f}ms  server connections={connections}"
+    )
+
+
+async def _run(get_llm, calls: int, concurrency: int) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def _call(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await get_llm().ainvoke(f"benchmark prompt {i}")
+            samples.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_call(i) for i in range(calls)))
+    return samples, time.perf_counter() - start
+
+
+async def main(calls: int, concurrency: int, latency: float):
+    with StandInLLMServer(latency=latency) as server:
+        os.environ["GROQ_API_BASE"] = server.url
+
+        from langchain_groq import ChatGroq
+        from core.llm import LLMManager
+
+        def fresh_client():
+            return ChatGroq(model=os.environ["GROQ_MODEL_NAME"], api_key=os.environ["GROQ_API_KEY"], temperature=0.3)
+
+        before = server.connections
+        samples, elapsed = await _run(fresh_client, calls, concurrency)
+        _summarize("before (new ChatGroq per call)", samples, elapsed, server.connections - before)
+
+        before = server.connections
+        samples, elapsed = await _run(lambda: LLMManager.get_llm(temperature=0.3), calls, concurrency)
+        _summarize("after (memoized, shared pool)", samples, elapsed, server.connections - before)
+        print(f"client-side: {LLMManager.connection_stats()}")
+        await LLMManager.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM client reuse against a local stand-in server")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="Stand-in server latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.latency))
@@ -0,0 +1,79 @@
+"""
+Benchmark: tail latency of LLM calls with & without hedging
+
+Two local stand-in backends (benchmarks/standin.py) answer in ~20ms, except for a small share of
+requests that stall for seconds - the kind of tail Groq shows occasionally. The same sequence of
+calls goes through LLMRouter with hedging off, then on; p50/p99 & the extra requests hedging cost are reported.
+
+Run with:
+    python -m benchmarks.bench_llm_hedging --calls 500 --tail-share 0.03 --tail-seconds 2
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("REDDIT_CLIENT_ID", "bench-client")
+os.environ.setdefault("REDDIT_CLIENT_SECRET", "bench-secret")
+os.environ.setdefault("REDDIT_USER_AGENT", "bench-agent")
+
+from benchmarks.standin import StandInLLMServer
+from core.http_client import SharedHTTPClient
+from core.llm_router import Backend, LLMRouter
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _run(router: LLMRouter, calls: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: list[float] = []
+
+    async def _call(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await router.acomplete(f"benchmark prompt {i}")
+            samples.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(_call(i) for i in range(calls)))
+    return sorted(samples)
+
+
+async def main(calls: int, concurrency: int, tail_share: float, tail_seconds: float):
+    rng = random.Random(11)
+
+    def latency() -> float:
+        return tail_seconds if rng.random() < tail_share else 0.02 + rng.random() * 0.01
+
+    with StandInLLMServer(latency_fn=latency) as first, StandInLLMServer(latency_fn=latency) as second:
+        for hedge in (False, True):
+            http = SharedHTTPClient()
+            backends = [
+                Backend("standin-a", f"{first.url}/v1", model="stand-in"),
+                Backend("standin-b", f"{second.url}/v1", model="stand-in"),
+            ]
+            router = LLMRouter(backends, http, hedge_enabled=hedge, hedge_min_samples=20, hedge_default_seconds=1.0)
+            served_before = first.requests + second.requests
+
+            samples = await _run(router, calls, concurrency)
+            sent = first.requests + second.requests - served_before
+            stats = router.stats()
+            print(
+                f"hedging={'on ' if hedge else 'off'}  p50={_quantile(samples, 0.5) * 1000:8.2f}ms "
+                f"p95={_quantile(samples, 0.95) * 1000:8.2f}ms p99={_quantile(samples, 0.99) * 1000:8.2f}ms "
+                f"requests sent={sent} (+{(sent - calls) / calls:.1%})  hedge wins={stats['hedge_wins']}"
+            )
+            await http.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM tail latency with & without hedging")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--tail-share", type=float, default=0.03, help="Share of requests that stall")
+    parser.add_argument("--tail-seconds", type=float, default=2.0, help="How long a stalled request takes")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency, args.tail_share, args.tail_seconds))
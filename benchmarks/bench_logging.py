@@ -0,0 +1,108 @@
+"""
+Benchmark: logging overhead per request, old synchronous sinks vs. the background-thread JSON pipeline
+
+A "request" emits '--lines' log records (about what one persona workflow run logs) inside a request context.
+What's timed is the caller's side - the time the request, & so the event loop, spends in logging calls.
+'before' is the old setup: plain-text file sink written synchronously by the caller. 'after' is
+'define_log_level': JSON file sink with rotation & compression, written from a background thread.
+
+'--disk-delay-ms' adds a sink that waits that long on every write, to simulate a slow or contended disk:
+the synchronous one stalls the request for it, the background one doesn't.
+
+Console sinks are set to WARNING so nothing is printed; logs go to a temporary directory.
+
+Run with:
+    python -m benchmarks.bench_logging --requests 2000 --lines 30
+    python -m benchmarks.bench_logging --requests 200 --disk-delay-ms 2
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="bench-logging-")
+os.environ["LOG_DIR"] = _workdir
+os.environ["LOG_LEVEL"] = "WARNING"
+
+from loguru import logger as _logger
+from logs.logging_config import BackgroundSink, define_log_level, json_format, request_context
+
+
+class SlowFile:
+    """
+    File-like sink that waits 'delay' seconds per write, to simulate a slow disk
+    """
+
+    def __init__(self, path: str, delay: float):
+        self._file = open(path, "a", encoding="utf-8")
+        self.delay = delay
+
+    def write(self, message: str):
+        self._file.write(message)
+        if self.delay:
+            time.sleep(self.delay)
+
+    def flush(self):
+        self._file.flush()
+
+
+def configure_before(delay: float):
+    """
+    The old pipeline: synchronous plain-text file sink, no rotation
+    """
+    _logger.remove()
+    path = os.path.join(_workdir, "before.txt")
+    _logger.add(SlowFile(path, delay) if delay else path, level="DEBUG")
+
+
+def configure_after(delay: float):
+    """
+    The new pipeline, as set up at import by 'define_log_level' (plus a slow JSON sink, written in the background, when 'delay' is set)
+    """
+    define_log_level()
+    if delay:
+        slow = BackgroundSink(SlowFile(os.path.join(_workdir, "slow.jsonl"), delay), "log-slow")
+        _logger.add(slow, level="DEBUG", format=json_format, colorize=False)
+
+
+def run(requests: int, lines: int) -> list[float]:
+    samples = []
+    for i in range(requests):
+        with request_context(f"bench-{i}"):
+            start = time.perf_counter()
+            for j in range(lines):
+                _logger.info(f"Benchmark request {i} step {j}: scraped 42 documents for user bench_user_{i % 50}")
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _summarize(label: str, samples: list[float], drain: float):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<38} per request: mean={statistics.mean(samples) * 1e6:9.1f}us "
+        f"p50={statistics.median(samples) * 1e6:9.1f}us p99={p99 * 1e6:9.1f}us  (drain {drain * 1000:.0f}ms)"
+    )
+
+
+def bench(label: str, configure, requests: int, lines: int, delay: float):
+    configure(delay)
+    run(min(requests, 50), lines)  # warm-up
+    samples = run(requests, lines)
+    start = time.perf_counter()
+    _logger.remove()  # drains the background sinks
+    _summarize(label, samples, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Logging overhead per request")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=30, help="Log records per request")
+    parser.add_argument("--disk-delay-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    delay = args.disk_delay_ms / 1000.0
+    print(f"{args.requests} requests x {args.lines} log lines, disk delay {args.disk_delay_ms}ms per write")
+    bench("before (sync text file sink)", configure_before, args.requests, args.lines, delay)
+    bench("after (background JSON, rotating sink)", configure_after, args.requests, args.lines, delay)
@@ -0,0 +1,82 @@
+"""
+Benchmark: full-text search latency of the PersonaStore
+
+Fills a scratch SQLite store with synthetic personas (9 attributes each, a rare 'fintech' occupation
+for ~0.1% of them) & times typical searches against it.
+
+Run with:
+    python -m benchmarks.bench_persona_store --personas 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("REDDIT_CLIENT_ID", "bench-client")
+os.environ.setdefault("REDDIT_CLIENT_SECRET", "bench-secret")
+os.environ.setdefault("REDDIT_USER_AGENT", "bench-agent")
+
+from core.persona_store import PersonaStore
+from models.persona_model import PersonaAttribute, UserPersona
+
+_OCCUPATIONS = ["software engineer", "nurse", "teacher", "student", "barista", "data analyst", "electrician", "lawyer"]
+_LOCATIONS = ["New York City", "Berlin", "Toronto", "São Paulo", "rural Ohio", "London", "Melbourne", "Seoul"]
+_TRAITS = ["curious", "sarcastic", "helpful", "anxious", "competitive", "patient", "outspoken", "reserved"]
+_TOPICS = ["mechanical keyboards", "sourdough", "marathon training", "indie games", "houseplants", "personal finance"]
+
+QUERIES = [("fintech", None), ("software engineer", "Occupation"), ("berlin", "Location"), ("sourdough", None)]
+
+
+def _persona(rng: random.Random, index: int) -> UserPersona:
+    occupation = "works in fintech as a product manager" if rng.random() < 0.001 else rng.choice(_OCCUPATIONS)
+    topic = rng.choice(_TOPICS)
+    values = [
+        ("Name", f"user{index}", None),
+        ("Age", f"Mid {rng.randint(2, 6)}0s", None),
+        ("Occupation", occupation, f"I've been a {occupation} for {rng.randint(1, 20)} years"),
+        ("Location", rng.choice(_LOCATIONS), "the weather here is awful this week"),
+        ("Traits", rng.choice(_TRAITS), f"honestly I just love {topic}"),
+        ("Behaviors", f"posts about {topic}", f"another update on my {topic} journey"),
+        ("Motivations", f"getting better at {topic}", "I want to get better at this"),
+        ("Frustrations", "slow moderators", "why does every post get removed"),
+        ("Goals", f"share {topic} tips", "hope this helps someone"),
+    ]
+    return UserPersona(
+        username=f"user{index}",
+        attributes=[PersonaAttribute(label=label, value=value, citation=citation) for label, value, citation in values],
+    )
+
+
+def populate(store: PersonaStore, personas: int, batch: int = 20000, seed: int = 7):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    for offset in range(0, personas, batch):
+        store.save_many(
+            (_persona(rng, i), "") for i in range(offset, min(personas, offset + batch))
+        )
+    print(f"stored {personas} personas in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PersonaStore search latency")
+    parser.add_argument("--personas", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        store = PersonaStore(os.path.join(scratch, "personas.db"))
+        populate(store, args.personas)
+
+        for query, label in QUERIES:
+            samples, results = [], []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                results = store.search(query, label=label, limit=20)
+                samples.append(time.perf_counter() - start)
+            print(
+                f"{query!r:<22} label={str(label):<11} results={len(results):<3} "
+                f"p50={statistics.median(samples) * 1000:8.3f}ms max={max(samples) * 1000:8.3f}ms"
+            )
@@ -0,0 +1,240 @@
+"""
+Benchmark: cold start of the persona API - import time & time to first response, against a budget
+
+Two measurements, each in fresh interpreters so nothing is cached in-process:
+    > import - 'python -X importtime -c "import api.main"', median of '--runs'. The last run's report is
+      broken down by top-level package & by module, & any heavy dependency (LangGraph, LangChain, the Groq
+      SDK, PRAW) that got imported eagerly is flagged - those must only load when the workflow is built
+    > serve - spawns uvicorn & polls it: time until /api/health answers (the replica can take traffic)
+      & until /api/ready does (the workflow is built, see WORKFLOW_WARMUP)
+
+The process exits with status 1 when a measurement is over its budget or a heavy dependency is imported
+eagerly, so it can run as a check. Budgets (milliseconds, medians):
+    > --import-budget-ms (default: 800)
+    > --first-response-budget-ms (default: 1500)
+    > --ready-budget-ms (default: 6000)
+
+Needs no credentials or network: dummy values are set & logs go to a temporary directory.
+Bytecode is compiled by a warm-up run first, as it is in the Docker image.
+
+Run with:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --top 30 --json startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_BUDGET_MS = 800.0
+FIRST_RESPONSE_BUDGET_MS = 1500.0
+READY_BUDGET_MS = 6000.0
+
+# Top-level packages that may only be imported when the workflow is built
+HEAVY_PACKAGES = ("langgraph", "langchain", "langchain_core", "langchain_groq", "langchain_community",
+                  "langsmith", "groq", "praw", "prawcore")
+
+
+def _environment(workdir: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "bench-key")
+    env.setdefault("GROQ_MODEL_NAME", "meta-llama/llama-4-scout-17b-16e-instruct")
+    env.setdefault("REDDIT_CLIENT_ID", "bench-client")
+    env.setdefault("REDDIT_CLIENT_SECRET", "bench-secret")
+    env.setdefault("REDDIT_USER_AGENT", "bench-agent")
+    env["LOG_DIR"] = workdir
+    env["LOG_LEVEL"] = "WARNING"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+def parse_importtime(report: str) -> List[Tuple[str, int, float, float]]:
+    """
+    Parses the stderr of 'python -X importtime'
+
+    Returns:
+        List[Tuple[str, int, float, float]]: (module, nesting depth, self ms, cumulative ms) per imported module
+    """
+    modules = []
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        modules.append((name.strip(), depth, int(self_us) / 1000.0, int(cumulative_us) / 1000.0))
+    return modules
+
+
+def measure_import(env: Dict[str, str], workdir: str, module: str) -> Tuple[float, List[Tuple[str, int, float, float]]]:
+    """
+    Imports 'module' in a fresh interpreter
+
+    Returns:
+        Tuple[float, List[...]]: Wall-clock milliseconds of the import, & the parsed importtime report
+    """
+    code = f"import time; start = time.perf_counter(); import {module}; print((time.perf_counter() - start) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env, cwd=workdir, capture_output=True, text=True, check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return float(result.stdout.strip().splitlines()[-1]), parse_importtime(result.stderr)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _answers(url: str) -> bool:
+    try:
+        with urllib.request.urlopen(url, timeout=1.0) as response:
+            return response.status == 200
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return False
+
+
+def measure_serve(env: Dict[str, str], workdir: str, timeout: float) -> Tuple[float, Optional[float]]:
+    """
+    Starts uvicorn on the app & polls it
+
+    Returns:
+        Tuple[float, Optional[float]]: Milliseconds from spawn until /api/health answered, & until /api/ready
+                                       did (None if it didn't within 'timeout')
+    """
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    try:
+        first_response = ready = None
+        while time.perf_counter() - start < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {server.returncode}:\n{server.stderr.read().decode()[-2000:]}")
+            if first_response is None and _answers(f"{base}/api/health"):
+                first_response = (time.perf_counter() - start) * 1000
+            if first_response is not None and _answers(f"{base}/api/ready"):
+                ready = (time.perf_counter() - start) * 1000
+                break
+            time.sleep(0.005)
+        if first_response is None:
+            raise RuntimeError(f"The API didn't answer within {timeout:.0f}s")
+        return first_response, ready
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def breakdown(modules: List[Tuple[str, int, float, float]], top: int) -> Dict[str, Any]:
+    """
+    Summarizes one importtime report: self time per top-level package, slowest modules (cumulative),
+    & the heavy packages that were imported
+    """
+    packages: Dict[str, float] = defaultdict(float)
+    for name, _, self_ms, _ in modules:
+        packages[name.split(".")[0]] += self_ms
+    heavy = sorted({name.split(".")[0] for name, *_ in modules} & set(HEAVY_PACKAGES))
+    return {
+        "packages": dict(sorted(packages.items(), key=lambda item: -item[1])[:top]),
+        "modules": [
+            {"module": name, "depth": depth, "self_ms": round(self_ms, 2), "cumulative_ms": round(cumulative_ms, 2)}
+            for name, depth, self_ms, cumulative_ms in sorted(modules, key=lambda m: -m[3])[:top]
+        ],
+        "heavy_imports": heavy,
+    }
+
+
+def _check(label: str, value: Optional[float], budget: float) -> bool:
+    within = value is not None and value <= budget
+    shown = "timed out" if value is None else f"{value:8.1f}ms"
+    print(f"{label:<28} {shown}  budget {budget:.0f}ms  {'ok' if within else 'OVER BUDGET'}")
+    return within
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cold start of the persona API against a budget")
+    parser.add_argument("--module", default="api.main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="Packages & modules listed in the breakdown")
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--first-response-budget-ms", type=float, default=FIRST_RESPONSE_BUDGET_MS)
+    parser.add_argument("--ready-budget-ms", type=float, default=READY_BUDGET_MS)
+    parser.add_argument("--skip-serve", action="store_true", help="Only measure the import")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for the API")
+    parser.add_argument("--json", default=None, help="Write the full report to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as workdir:
+        env = _environment(workdir)
+        measure_import(env, workdir, args.module)  # compiles bytecode
+
+        import_runs = []
+        modules: List[Tuple[str, int, float, float]] = []
+        for _ in range(args.runs):
+            elapsed, modules = measure_import(env, workdir, args.module)
+            import_runs.append(elapsed)
+
+        serve_runs: List[Tuple[float, Optional[float]]] = []
+        if not args.skip_serve:
+            serve_runs = [measure_serve(env, workdir, args.timeout) for _ in range(args.runs)]
+
+    report = breakdown(modules, args.top)
+    print(f"import {args.module}: median of {args.runs} runs in fresh interpreters\n")
+    print("Self time by top-level package:")
+    for package, self_ms in report["packages"].items():
+        print(f"  {package:<32} {self_ms:8.1f}ms")
+    print("\nSlowest modules (cumulative):")
+    for module in report["modules"]:
+        print(f"  {'  ' * module['depth']}{module['module']:<{60 - 2 * module['depth']}} {module['cumulative_ms']:8.1f}ms")
+    print()
+
+    import_ms = statistics.median(import_runs)
+    ok = _check("import", import_ms, args.import_budget_ms)
+    first_response_ms = ready_ms = None
+    if serve_runs:
+        first_response_ms = statistics.median(first for first, _ in serve_runs)
+        ready_values = [ready for _, ready in serve_runs]
+        ready_ms = None if None in ready_values else statistics.median(ready_values)
+        ok &= _check("first response (/api/health)", first_response_ms, args.first_response_budget_ms)
+        ok &= _check("ready (/api/ready)", ready_ms, args.ready_budget_ms)
+    if report["heavy_imports"]:
+        ok = False
+        print(f"Imported eagerly by {args.module}: {', '.join(report['heavy_imports'])}")
+
+    if args.json:
+        result = {
+            "module": args.module,
+            "python": sys.version.split()[0],
+            "runs": args.runs,
+            "import_ms": {"median": import_ms, "runs": import_runs},
+            "first_response_ms": first_response_ms,
+            "ready_ms": ready_ms,
+            "budgets_ms": {
+                "import": args.import_budget_ms,
+                "first_response": args.first_response_budget_ms,
+                "ready": args.ready_budget_ms,
+            },
+            "within_budget": bool(ok),
+            **report,
+        }
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+        print(f"Report written to {args.json}")
+
+    sys.exit(0 if ok else 1)
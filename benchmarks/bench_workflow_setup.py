@@ -0,0 +1,79 @@
+"""
+Benchmark: per-request setup overhead of the persona workflow
+
+Compares the old request path (build a fresh PersonaWorkflow - Reddit client, Groq client,
+PersonaWriter & compiled LangGraph - on every call) with the shared workflow built once in the
+app lifespan & handed out by 'api.dependencies.get_workflow'.
+
+No network calls are made: only client construction & graph compilation are timed.
+
+Run with:
+    python -m benchmarks.bench_workflow_setup --iterations 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+# Dummy credentials so AppConfig doesn't go looking for a .env file
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("GROQ_MODEL_NAME", "meta-llama/llama-4-scout-17b-16e-instruct")
+os.environ.setdefault("REDDIT_CLIENT_ID", "bench-client")
+os.environ.setdefault("REDDIT_CLIENT_SECRET", "bench-secret")
+os.environ.setdefault("REDDIT_USER_AGENT", "bench-agent")
+
+from api.dependencies import get_workflow
+from workflows.workflow import PersonaWorkflow
+
+
+def _summarize(label: str, samples: list[float]) -> None:
+    """
+    Prints mean/p50/p95 of the timing samples in milliseconds
+    """
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{label:<28} mean={statistics.mean(samples) * 1000:9.3f}ms "
+        f"p50={statistics.median(samples) * 1000:9.3f}ms p95={p95 * 1000:9.3f}ms"
+    )
+
+
+def bench_per_request_build(iterations: int) -> list[float]:
+    """
+    Old behaviour: one PersonaWorkflow per request
+    """
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        PersonaWorkflow()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_shared_workflow(iterations: int) -> list[float]:
+    """
+    New behaviour: the workflow is built once & fetched from app state per request
+    """
+    workflow = PersonaWorkflow()
+    request = SimpleNamespace(app=SimpleNamespace(state=SimpleNamespace(workflow=workflow)))
+
+    async def fetch() -> list[float]:
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await get_workflow(request)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return asyncio.run(fetch())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-request workflow setup overhead")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    _summarize("before (build per request)", bench_per_request_build(args.iterations))
+    _summarize("after (shared workflow)", bench_shared_workflow(args.iterations))
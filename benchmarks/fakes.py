@@ -0,0 +1,428 @@
+"""
+Offline record/replay stand-ins for Reddit (PRAW) & the chat model, for benchmarks
+
+A Cassette holds the PRAW listings & LLM replies of a set of users. It can be recorded once against
+the live services, or generated synthetically, then replayed with configurable synthetic latency
+so the whole persona workflow runs without credentials or network.
+
+    ReplayReddit / RecordingReddit - plug into RedditScraper(reddit_factory=...)
+    ReplayChatModel / RecordingChatModel - plug into PersonaAnalyzer(llm=...)
+
+Usage:
+    cassette = Cassette.synthetic(users=20)
+    workflow = build_offline_workflow(cassette, reddit_latency=0.2, llm_latency=1.0)
+    await workflow.run("bench_user_0")
+
+Record a cassette (needs real Reddit & Groq credentials in .env):
+    python -m benchmarks.fakes record --users kojied,spez --out cassette.json
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from benchmarks.standin import DEFAULT_REPLY
+
+SUBMISSION = "submission"
+COMMENT = "comment"
+
+# Fields PRAW exposes on submissions & comments that RedditScraper reads
+_THING_FIELDS = ("fullname", "created_utc", "permalink", "title", "selftext", "body")
+
+_WORDS = (
+    "work job engineer nurse teacher student college city apartment weekend hiking gaming guitar coffee "
+    "dog cat family kids partner budget saving investing stocks rent commute remote office manager team "
+    "project deadline python linux keyboard movie book series anime football gym running diet sleep "
+    "anxiety therapy travel japan europe camping cooking recipe bread garden music concert vinyl reddit"
+).split()
+
+
+class Cassette:
+    """
+    Recorded PRAW listings & LLM replies
+
+    Attributes:
+        reddit (dict): {username (lowercase): {"submission": [thing dicts], "comment": [thing dicts]}}, newest first
+        llm (dict): {prompt hash: reply text}
+    """
+
+    def __init__(self,
+                 reddit: Optional[Dict[str, Dict[str, List[Dict[str, Any]]]]] = None,
+                 llm: Optional[Dict[str, str]] = None):
+        self.reddit = reddit or {}
+        self.llm = llm or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(reddit=data.get("reddit"), llm=data.get("llm"))
+
+    def save(self, path: str):
+        out = Path(path)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            out.write_text(json.dumps({"reddit": self.reddit, "llm": self.llm}, indent=1), encoding="utf-8")
+
+    def usernames(self) -> List[str]:
+        return sorted(self.reddit)
+
+    def listing(self, username: str, kind: str) -> List[Dict[str, Any]]:
+        return self.reddit.get(username.lower(), {}).get(kind, [])
+
+    def record_listing(self, username: str, kind: str, things: List[Dict[str, Any]]):
+        with self._lock:
+            self.reddit.setdefault(username.lower(), {})[kind] = things
+
+    @classmethod
+    def synthetic(cls, users: int = 20, items: int = 25, words: int = 60, seed: int = 7) -> "Cassette":
+        """
+        Builds a cassette of made-up users, for benchmarks that don't need real data
+
+        Args:
+            users (int): Number of users, named bench_user_0 .. bench_user_{users - 1}
+            items (int): Submissions & comments per user (each)
+            words (int): Average words per item
+            seed (int): Random seed, so runs are comparable
+        """
+        rng = random.Random(seed)
+        reddit: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        now = 1_750_000_000.0
+
+        def _text() -> str:
+            sentences = []
+            for _ in range(max(1, rng.randint(words // 2, words * 3 // 2) // 12)):
+                sentence = " ".join(rng.choice(_WORDS) for _ in range(12))
+                sentences.append(sentence.capitalize() + ".")
+            return " ".join(sentences)
+
+        for u in range(users):
+            username = f"bench_user_{u}"
+            listings: Dict[str, List[Dict[str, Any]]] = {SUBMISSION: [], COMMENT: []}
+            for i in range(items):
+                created = now - (u * 10_000) - i * 3600
+                listings[SUBMISSION].append({
+                    "fullname": f"t3_{u:04d}{i:04d}",
+                    "created_utc": created,
+                    "permalink": f"/r/bench/comments/{u:04d}{i:04d}/",
+                    "title": " ".join(rng.choice(_WORDS) for _ in range(8)).capitalize(),
+                    "selftext": _text(),
+                })
+                listings[COMMENT].append({
+                    "fullname": f"t1_{u:04d}{i:04d}",
+                    "created_utc": created - 60,
+                    "permalink": f"/r/bench/comments/{u:04d}{i:04d}/c/",
+                    "body": _text(),
+                })
+            reddit[username] = listings
+        return cls(reddit=reddit)
+
+
+def prompt_key(prompt: Any) -> str:
+    """
+    Hashes a prompt (a string, or anything LangChain accepts) into the cassette's LLM key
+    """
+    if not isinstance(prompt, str):
+        messages = prompt if isinstance(prompt, list) else [prompt]
+        prompt = "\n".join(str(getattr(m, "content", m)) for m in messages)
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class SyntheticLatency:
+    """
+    Fixed latency plus uniform jitter, or any 'latency_fn' (eg - to simulate a heavy tail)
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, latency_fn: Optional[Callable[[], float]] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.latency_fn = latency_fn
+
+    def delay(self) -> float:
+        if self.latency_fn is not None:
+            return self.latency_fn()
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def sleep(self):
+        delay = self.delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def asleep(self):
+        delay = self.delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _ReplayListing:
+    def __init__(self, reddit: "ReplayReddit", username: str, kind: str):
+        self._reddit = reddit
+        self._username = username
+        self._kind = kind
+
+    def new(self, limit: Optional[int] = None, params: Optional[Dict[str, Any]] = None) -> Iterator[SimpleNamespace]:
+        """
+        Mirrors 'ListingGenerator.new' - newest first, honouring 'limit' & the 'before' fullname cursor
+        the way Reddit does: the 'limit' items right after the cursor, none if it's gone
+        """
+        self._reddit.latency.sleep()
+        self._reddit.calls += 1
+
+        things = self._reddit.cassette.listing(self._username, self._kind)
+        before = (params or {}).get("before")
+        if before:
+            ids = [thing["fullname"] for thing in things]
+            things = things[:ids.index(before)] if before in ids else []
+            if limit is not None:
+                things = things[-limit:] if limit else []
+        return iter([SimpleNamespace(**thing) for thing in things[:limit]])
+
+
+class ReplayReddit:
+    """
+    Stand-in for praw.Reddit serving a cassette's listings after a synthetic latency
+    (one latency per listing call, as PRAW fetches up to 100 items per request)
+
+    Usage:
+        RedditScraper(reddit_factory=ReplayReddit.factory(cassette, latency=0.2))
+    """
+
+    def __init__(self, cassette: Cassette, latency: Optional[SyntheticLatency] = None, **credentials):
+        self.cassette = cassette
+        self.latency = latency or SyntheticLatency()
+        self.calls = 0
+
+    @classmethod
+    def factory(cls, cassette: Cassette, latency: float = 0.0, jitter: float = 0.0,
+                latency_fn: Optional[Callable[[], float]] = None) -> Callable[..., "ReplayReddit"]:
+        delay = SyntheticLatency(latency, jitter, latency_fn)
+        return lambda **credentials: cls(cassette, delay)
+
+    def redditor(self, name: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            submissions=_ReplayListing(self, name, SUBMISSION),
+            comments=_ReplayListing(self, name, COMMENT),
+        )
+
+
+class _RecordingListing:
+    def __init__(self, listing: Any, cassette: Cassette, username: str, kind: str):
+        self._listing = listing
+        self._cassette = cassette
+        self._username = username
+        self._kind = kind
+
+    def new(self, limit: Optional[int] = None, params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        things = list(self._listing.new(limit=limit, params=params))
+        if not params:
+            self._cassette.record_listing(self._username, self._kind, [
+                {field: getattr(thing, field) for field in _THING_FIELDS if hasattr(thing, field)}
+                for thing in things
+            ])
+        return iter(things)
+
+
+class RecordingReddit:
+    """
+    Wraps a real praw.Reddit & copies every full (non-incremental) listing it serves into a cassette
+
+    Usage:
+        RedditScraper(reddit_factory=RecordingReddit.factory(cassette))
+    """
+
+    def __init__(self, reddit: Any, cassette: Cassette):
+        self._reddit = reddit
+        self.cassette = cassette
+
+    @classmethod
+    def factory(cls, cassette: Cassette) -> Callable[..., "RecordingReddit"]:
+        import praw
+
+        return lambda **credentials: cls(praw.Reddit(**credentials), cassette)
+
+    def redditor(self, name: str) -> SimpleNamespace:
+        redditor = self._reddit.redditor(name)
+        return SimpleNamespace(
+            submissions=_RecordingListing(redditor.submissions, self.cassette, name, SUBMISSION),
+            comments=_RecordingListing(redditor.comments, self.cassette, name, COMMENT),
+        )
+
+
+class ReplayChatModel:
+    """
+    Stand-in chat model replaying a cassette's replies after a synthetic latency
+
+    Covers what the analyzers use: 'invoke' / 'ainvoke' return an AIMessage, 'stream' / 'astream' yield
+    the reply word by word, with the latency spent before the first token. Prompts missing from the
+    cassette get 'default_reply' (unless 'strict', which raises KeyError instead).
+    """
+
+    def __init__(self,
+                 cassette: Cassette,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 latency_fn: Optional[Callable[[], float]] = None,
+                 default_reply: str = DEFAULT_REPLY,
+                 strict: bool = False):
+        self.cassette = cassette
+        self.latency = SyntheticLatency(latency, jitter, latency_fn)
+        self.default_reply = default_reply
+        self.strict = strict
+        self.calls = 0
+        self.misses = 0
+
+    def _reply(self, prompt: Any) -> str:
+        self.calls += 1
+        reply = self.cassette.llm.get(prompt_key(prompt))
+        if reply is None:
+            if self.strict:
+                raise KeyError("Prompt not found in cassette")
+            self.misses += 1
+            reply = self.default_reply
+        return reply
+
+    @staticmethod
+    def _chunks(reply: str) -> List[str]:
+        words = reply.split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        self.latency.sleep()
+        return AIMessage(content=self._reply(prompt))
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        await self.latency.asleep()
+        return AIMessage(content=self._reply(prompt))
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator[Any]:
+        from langchain_core.messages import AIMessageChunk
+
+        self.latency.sleep()
+        for chunk in self._chunks(self._reply(prompt)):
+            yield AIMessageChunk(content=chunk)
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        from langchain_core.messages import AIMessageChunk
+
+        await self.latency.asleep()
+        for chunk in self._chunks(self._reply(prompt)):
+            yield AIMessageChunk(content=chunk)
+
+
+class RecordingChatModel:
+    """
+    Wraps a real chat model & stores every reply in a cassette, keyed by prompt
+    """
+
+    def __init__(self, llm: Any, cassette: Cassette):
+        self._llm = llm
+        self.cassette = cassette
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._llm, name)
+
+    def _record(self, prompt: Any, reply: str):
+        with self.cassette._lock:
+            self.cassette.llm[prompt_key(prompt)] = reply
+
+    def invoke(self, prompt: Any, *args, **kwargs):
+        result = self._llm.invoke(prompt, *args, **kwargs)
+        self._record(prompt, result.content)
+        return result
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs):
+        result = await self._llm.ainvoke(prompt, *args, **kwargs)
+        self._record(prompt, result.content)
+        return result
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator[Any]:
+        parts = []
+        for chunk in self._llm.stream(prompt, *args, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self._record(prompt, "".join(parts))
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        parts = []
+        async for chunk in self._llm.astream(prompt, *args, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self._record(prompt, "".join(parts))
+
+
+def build_offline_workflow(cassette: Cassette,
+                           reddit_latency: float = 0.0,
+                           llm_latency: float = 0.0,
+                           jitter: float = 0.0):
+    """
+    Builds a PersonaWorkflow whose Reddit client & chat model replay 'cassette'
+
+    Args:
+        cassette (Cassette): Listings & replies to serve
+        reddit_latency (float): Seconds per PRAW listing call
+        llm_latency (float): Seconds per LLM call (before the first token when streaming)
+        jitter (float): Extra uniform random wait added to both, in seconds
+
+    Returns:
+        PersonaWorkflow: The compiled workflow, making no network calls
+    """
+    from core.reddit_scraper import RedditScraper
+    from document_processing.analyzer import PersonaAnalyzer
+    from workflows.workflow import PersonaWorkflow
+
+    scraper = RedditScraper(reddit_factory=ReplayReddit.factory(cassette, reddit_latency, jitter))
+    analyzer = PersonaAnalyzer(llm=ReplayChatModel(cassette, latency=llm_latency, jitter=jitter))
+    return PersonaWorkflow(scraper=scraper, analyzer=analyzer)
+
+
+async def record(usernames: List[str], out: str):
+    """
+    Runs the real workflow for 'usernames' & saves what Reddit & the LLM returned as a cassette
+    """
+    from core.llm import LLMManager
+    from core.reddit_scraper import RedditScraper
+    from document_processing.analyzer import PersonaAnalyzer
+    from workflows.workflow import PersonaWorkflow
+
+    cassette = Cassette()
+    scraper = RedditScraper(reddit_factory=RecordingReddit.factory(cassette))
+    analyzer = PersonaAnalyzer(llm=RecordingChatModel(LLMManager.get_llm(temperature=0.3), cassette))
+    workflow = PersonaWorkflow(scraper=scraper, analyzer=analyzer)
+
+    for username in usernames:
+        result = await workflow.run(username)
+        print(f"{username}: {'ok' if result.get('response') else result.get('error', 'no persona')}")
+
+    cassette.save(out)
+    print(f"Saved {len(cassette.reddit)} users & {len(cassette.llm)} LLM replies to {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record or generate a record/replay cassette")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record live Reddit listings & LLM replies")
+    rec.add_argument("--users", required=True, help="Comma-separated Reddit usernames")
+    rec.add_argument("--out", required=True)
+
+    syn = sub.add_parser("synthetic", help="Write a synthetic cassette")
+    syn.add_argument("--users", type=int, default=20)
+    syn.add_argument("--items", type=int, default=25)
+    syn.add_argument("--out", required=True)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        asyncio.run(record([name.strip() for name in args.users.split(",") if name.strip()], args.out))
+    else:
+        Cassette.synthetic(users=args.users, items=args.items).save(args.out)
+        print(f"Saved {args.users} synthetic users to {args.out}")
@@ -0,0 +1,519 @@
+"""
+Load generator for the persona API
+
+Drives '/api/generate-persona' (or the '/stream' & '/bulk' variants) in steps of increasing load & reports,
+per step, HDR-style latency histograms, throughput, error rates & whether the service kept up - so the
+step where it saturates can be read off, & runs can be compared over time from the JSON output.
+
+Load models:
+    > closed - a fixed number of virtual users, each sending its next request when the last one finished
+               (plus '--think' seconds); steps are user counts, eg - '--levels 1,8,32'
+    > open   - Poisson arrivals at a fixed rate regardless of how fast the service answers; steps are
+               requests/second, eg - '--levels 0.5,1,2,4'. At most '--max-in-flight' requests are
+               outstanding, arrivals beyond that are counted as dropped
+
+Usernames are drawn from a population of '--population' users with a Zipf distribution ('--zipf 1.1' =
+a few hot users & a long tail, '--zipf 0' = uniform), so caches see realistic repeat traffic.
+
+Targets:
+    > default - api.main:app is served by uvicorn in a background thread, with Reddit replayed from a
+                synthetic cassette (benchmarks/fakes.py) & the LLM either replayed in-process ('--llm replay')
+                or answered over HTTP by a local Groq stand-in ('--llm standin', benchmarks/standin.py).
+                No credentials or network needed; stores & outputs go to a temporary directory
+    > --url   - an already running deployment, used as-is
+
+Run with:
+    python -m benchmarks.loadgen --model closed --levels 1,8,32 --duration 30
+    python -m benchmarks.loadgen --model open --levels 1,2,4,8 --llm standin --route stream
+    python -m benchmarks.loadgen --url http://localhost:8000 --model open --levels 0.2,0.5
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import os
+import random
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+os.environ.setdefault("GROQ_API_KEY", "bench-key")
+os.environ.setdefault("GROQ_MODEL_NAME", "meta-llama/llama-4-scout-17b-16e-instruct")
+os.environ.setdefault("REDDIT_CLIENT_ID", "bench-client")
+os.environ.setdefault("REDDIT_CLIENT_SECRET", "bench-secret")
+os.environ.setdefault("REDDIT_USER_AGENT", "bench-agent")
+os.environ.setdefault("WORKFLOW_WARMUP", "startup")
+
+PERCENTILES = (50.0, 75.0, 90.0, 95.0, 99.0, 99.9, 99.99)
+
+
+class LatencyHistogram:
+    """
+    HDR-style log-linear histogram of latencies, recorded in microseconds
+
+    Every power-of-two range is split into 'sub_buckets' linear buckets, so any recorded value is
+    reported within 1 / (sub_buckets / 2) of its true value (< 1% with the default 256) while the
+    whole range from 1us to hours costs a few thousand counters at most.
+    """
+
+    def __init__(self, significant_digits: int = 2):
+        """
+        Args:
+            significant_digits (int): Decimal digits of precision to keep (1-4)
+        """
+        self.significant_digits = significant_digits
+        self.sub_buckets = 1 << math.ceil(math.log2(2 * 10 ** significant_digits))
+        self._sub_bits = self.sub_buckets.bit_length() - 1
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.min_us: Optional[int] = None
+        self.max_us = 0
+        self._sum_us = 0
+
+    def _index(self, value_us: int) -> Tuple[int, int]:
+        shift = max(0, value_us.bit_length() - self._sub_bits)
+        return shift, value_us >> shift
+
+    @staticmethod
+    def _bounds(index: Tuple[int, int]) -> Tuple[int, int]:
+        shift, sub = index
+        return sub << shift, ((sub + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        value_us = max(1, int(seconds * 1_000_000))
+        self.counts[self._index(value_us)] += 1
+        self.total += 1
+        self._sum_us += value_us
+        self.max_us = max(self.max_us, value_us)
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+
+    def merge(self, other: "LatencyHistogram"):
+        if other.sub_buckets != self.sub_buckets:
+            raise ValueError("Can't merge histograms of different precision")
+        self.counts.update(other.counts)
+        self.total += other.total
+        self._sum_us += other._sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+
+    def value_at_percentile(self, percentile: float) -> int:
+        """
+        Returns the highest value (in microseconds) equivalent to the given percentile, as HdrHistogram does
+        """
+        if not self.total:
+            return 0
+        target = max(1, math.ceil(self.total * percentile / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._bounds(index)[1], self.max_us)
+        return self.max_us
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: Count, min/mean/max, a percentile table (all in milliseconds) & the non-empty buckets
+                  as [lower_ms, upper_ms, count], so histograms of different runs can be merged or re-plotted
+        """
+        ms = lambda us: round(us / 1000.0, 3)
+        return {
+            "count": self.total,
+            "min_ms": ms(self.min_us or 0),
+            "mean_ms": ms(self._sum_us / self.total) if self.total else 0.0,
+            "max_ms": ms(self.max_us),
+            "percentiles_ms": {f"p{p:g}": ms(self.value_at_percentile(p)) for p in PERCENTILES},
+            "significant_digits": self.significant_digits,
+            "buckets": [
+                [ms(low), ms(high), self.counts[index]]
+                for index in sorted(self.counts)
+                for low, high in [self._bounds(index)]
+            ],
+        }
+
+
+class ZipfSampler:
+    """
+    Draws usernames so that the k-th most popular one is picked with probability proportional to 1 / k^s
+    """
+
+    def __init__(self, usernames: List[str], s: float = 1.1, seed: int = 7):
+        """
+        Args:
+            usernames (List[str]): Population, most popular first
+            s (float): Skew exponent - 0 is uniform, ~1 is typical of real traffic, larger is hotter
+            seed (int): Random seed, so runs draw the same sequence
+        """
+        self.usernames = usernames
+        self._rng = random.Random(seed)
+        self._cumulative = []
+        total = 0.0
+        for rank in range(1, len(usernames) + 1):
+            total += 1.0 / rank ** s
+            self._cumulative.append(total)
+
+    def next(self) -> str:
+        point = self._rng.random() * self._cumulative[-1]
+        return self.usernames[min(bisect.bisect_left(self._cumulative, point), len(self.usernames) - 1)]
+
+    def batch(self, size: int) -> List[str]:
+        return [self.next() for _ in range(size)]
+
+
+class StepStats:
+    """
+    Results of one load step
+    """
+
+    def __init__(self, model: str, level: float, duration: float):
+        self.model = model
+        self.level = level
+        self.duration = duration
+        self.latency = LatencyHistogram()
+        self.first_event = LatencyHistogram()
+        self.outcomes: Counter = Counter()
+        self.sent = 0
+        self.dropped = 0
+        self.elapsed = 0.0
+
+    def record(self, outcome: str, seconds: float, first_event: Optional[float] = None):
+        self.outcomes[outcome] += 1
+        if outcome == "ok":
+            self.latency.record(seconds)
+            if first_event is not None:
+                self.first_event.record(first_event)
+
+    @property
+    def completed(self) -> int:
+        return sum(self.outcomes.values())
+
+    @property
+    def errors(self) -> int:
+        return self.completed - self.outcomes["ok"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed = self.completed
+        result = {
+            "model": self.model,
+            "level": self.level,
+            "offered_rps": self.level if self.model == "open" else None,
+            "duration_s": round(self.elapsed, 3),
+            "sent": self.sent,
+            "completed": completed,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "error_rate": round(self.errors / completed, 4) if completed else 0.0,
+            "outcomes": dict(self.outcomes),
+            "throughput_rps": round(self.outcomes["ok"] / self.elapsed, 3) if self.elapsed else 0.0,
+            "latency": self.latency.to_dict(),
+        }
+        if self.first_event.total:
+            result["first_event"] = self.first_event.to_dict()
+        return result
+
+
+Sender = Callable[[Any, ZipfSampler], Awaitable[Tuple[str, Optional[float]]]]
+
+
+async def _send_generate(client, sampler: ZipfSampler) -> Tuple[str, Optional[float]]:
+    response = await client.post(
+        "/api/generate-persona", json={"reddit_url": f"https://www.reddit.com/user/{sampler.next()}/"}
+    )
+    return ("ok" if response.status_code == 200 else f"http_{response.status_code}"), None
+
+
+async def _send_stream(client, sampler: ZipfSampler) -> Tuple[str, Optional[float]]:
+    start = time.perf_counter()
+    first_event = None
+    outcome = "no_done_event"
+    async with client.stream(
+        "POST", "/api/generate-persona/stream", json={"reddit_url": f"https://www.reddit.com/user/{sampler.next()}/"}
+    ) as response:
+        if response.status_code != 200:
+            return f"http_{response.status_code}", None
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                if first_event is None:
+                    first_event = time.perf_counter() - start
+                event = line.split(":", 1)[1].strip()
+                if event in ("done", "error"):
+                    outcome = "ok" if event == "done" else "stream_error"
+    return outcome, first_event
+
+
+def _bulk_sender(size: int) -> Sender:
+    async def _send_bulk(client, sampler: ZipfSampler) -> Tuple[str, Optional[float]]:
+        start = time.perf_counter()
+        first_event = None
+        statuses: Counter = Counter()
+        async with client.stream("POST", "/api/generate-persona/bulk", json={"users": sampler.batch(size)}) as response:
+            if response.status_code != 200:
+                return f"http_{response.status_code}", None
+            async for line in response.aiter_lines():
+                if line.strip():
+                    if first_event is None:
+                        first_event = time.perf_counter() - start
+                    statuses[json.loads(line).get("status")] += 1
+        return ("ok" if set(statuses) == {"ok"} else "bulk_partial"), first_event
+    return _send_bulk
+
+
+async def _timed(send: Sender, client, sampler: ZipfSampler, stats: StepStats):
+    start = time.perf_counter()
+    try:
+        outcome, first_event = await send(client, sampler)
+    except Exception as e:
+        outcome, first_event = type(e).__name__, None
+    stats.record(outcome, time.perf_counter() - start, first_event)
+
+
+async def run_closed(send: Sender, client, sampler: ZipfSampler, users: int, duration: float, think: float) -> StepStats:
+    """
+    Closed loop: 'users' virtual users send back-to-back requests (with 'think' seconds between them) for 'duration'
+    """
+    stats = StepStats("closed", users, duration)
+    deadline = time.perf_counter() + duration
+
+    async def _user():
+        while time.perf_counter() < deadline:
+            stats.sent += 1
+            await _timed(send, client, sampler, stats)
+            if think:
+                await asyncio.sleep(random.expovariate(1.0 / think))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_user() for _ in range(int(users))))
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+async def run_open(send: Sender, client, sampler: ZipfSampler, rate: float, duration: float,
+                   max_in_flight: int, seed: int = 7) -> StepStats:
+    """
+    Open loop: Poisson arrivals at 'rate' per second for 'duration', then waits for outstanding requests
+    """
+    stats = StepStats("open", rate, duration)
+    rng = random.Random(seed)
+    tasks = set()
+
+    start = time.perf_counter()
+    next_arrival = start
+    while True:
+        next_arrival += rng.expovariate(rate)
+        if next_arrival - start >= duration:
+            break
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        if len(tasks) >= max_in_flight:
+            stats.dropped += 1
+            continue
+        stats.sent += 1
+        task = asyncio.create_task(_timed(send, client, sampler, stats))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def find_saturation(steps: List[Dict[str, Any]],
+                    max_error_rate: float = 0.01,
+                    slo_p99_ms: Optional[float] = None,
+                    min_gain: float = 0.1) -> Dict[str, Any]:
+    """
+    Finds the first step at which the service stopped keeping up
+
+    A step is saturated when its error rate exceeds 'max_error_rate', its p99 exceeds 'slo_p99_ms', arrivals were
+    dropped or it completed < 90% of the offered rate (open loop), or more users bought < 'min_gain' extra
+    throughput (closed loop).
+
+    Returns:
+        dict: {"saturated": bool, "level", "reason", "max_sustained_rps"} - the last figure is the best
+              throughput seen before saturation
+    """
+    best = 0.0
+    previous = None
+    for step in steps:
+        reasons = []
+        if step["error_rate"] > max_error_rate:
+            reasons.append(f"error rate {step['error_rate']:.2%}")
+        p99 = step["latency"]["percentiles_ms"]["p99"]
+        if slo_p99_ms is not None and p99 > slo_p99_ms:
+            reasons.append(f"p99 {p99:.0f}ms > {slo_p99_ms:.0f}ms")
+        if step["model"] == "open":
+            if step["dropped"]:
+                reasons.append(f"{step['dropped']} arrivals dropped")
+            if step["throughput_rps"] < 0.9 * step["level"]:
+                reasons.append(f"served {step['throughput_rps']:.2f} of {step['level']:g} req/s offered")
+        elif previous is not None and step["level"] > previous["level"]:
+            if step["throughput_rps"] < previous["throughput_rps"] * (1 + min_gain):
+                reasons.append(
+                    f"{step['level']:g} users gave {step['throughput_rps']:.2f} req/s vs "
+                    f"{previous['throughput_rps']:.2f} at {previous['level']:g}"
+                )
+        if reasons:
+            return {"saturated": True, "level": step["level"], "reason": "; ".join(reasons), "max_sustained_rps": best}
+        best = max(best, step["throughput_rps"])
+        previous = step
+    return {"saturated": False, "level": None, "reason": None, "max_sustained_rps": best}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def local_service(args) -> Iterator[str]:
+    """
+    Serves api.main:app on 127.0.0.1 from a background thread, on replayed Reddit & a stand-in LLM
+
+    Yields:
+        str: Base URL of the running app
+    """
+    import uvicorn
+    from benchmarks.fakes import Cassette, ReplayChatModel, ReplayReddit
+    from benchmarks.standin import StandInLLMServer
+
+    standin = None
+    if args.llm == "standin":
+        standin = StandInLLMServer(latency=args.llm_latency, jitter=args.jitter).__enter__()
+        os.environ["GROQ_API_BASE"] = standin.url
+        os.environ.setdefault("GROQ_RATE_PER_MINUTE", "1000000")
+        os.environ.setdefault("GROQ_RATE_BURST", "1000")
+
+    from api.main import app
+    from core.reddit_scraper import RedditScraper
+    from document_processing.analyzer import PersonaAnalyzer
+    from workflows.workflow import PersonaWorkflow
+
+    cassette = Cassette.synthetic(users=args.population, items=args.items)
+
+    def workflow_factory() -> PersonaWorkflow:
+        scraper = RedditScraper(reddit_factory=ReplayReddit.factory(cassette, args.reddit_latency, args.jitter))
+        analyzer = None
+        if args.llm == "replay":
+            analyzer = PersonaAnalyzer(llm=ReplayChatModel(cassette, latency=args.llm_latency, jitter=args.jitter))
+        return PersonaWorkflow(scraper=scraper, analyzer=analyzer)
+
+    app.state.workflow_factory = workflow_factory
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    server.install_signal_handlers = lambda: None
+    thread = threading.Thread(target=server.run, name="loadgen-app", daemon=True)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="loadgen-") as workdir:
+        os.chdir(workdir)
+        thread.start()
+        try:
+            while not server.started:
+                if not thread.is_alive():
+                    raise RuntimeError("The app failed to start")
+                time.sleep(0.05)
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            server.should_exit = True
+            thread.join(timeout=30)
+            if standin is not None:
+                standin.__exit__(None, None, None)
+            os.chdir(cwd)
+
+
+async def run(args, base_url: str) -> Dict[str, Any]:
+    import httpx
+
+    if args.url:
+        usernames = [name.strip() for name in args.usernames.split(",")] if args.usernames else []
+        if not usernames:
+            raise SystemExit("--usernames is required with --url")
+    else:
+        usernames = [f"bench_user_{i}" for i in range(args.population)]
+    sampler = ZipfSampler(usernames, s=args.zipf, seed=args.seed)
+
+    send = {"generate": _send_generate, "stream": _send_stream, "bulk": _bulk_sender(args.bulk_size)}[args.route]
+    levels = [float(level) for level in args.levels.split(",") if level.strip()]
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+
+    steps = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        for level in levels:
+            if args.model == "closed":
+                stats = await run_closed(send, client, sampler, int(level), args.duration, args.think)
+            else:
+                stats = await run_open(send, client, sampler, level, args.duration, args.max_in_flight, args.seed)
+            step = stats.to_dict()
+            steps.append(step)
+            p = step["latency"]["percentiles_ms"]
+            print(
+                f"{args.model:<6} level={level:<7g} {step['throughput_rps']:8.2f} req/s  p50={p['p50']:9.1f}ms "
+                f"p99={p['p99']:9.1f}ms  p99.9={p['p99.9']:9.1f}ms  errors={step['error_rate']:.2%}  dropped={step['dropped']}"
+            )
+
+    saturation = find_saturation(steps, args.max_error_rate, args.slo_p99_ms)
+    if saturation["saturated"]:
+        print(f"Saturated at level {saturation['level']:g}: {saturation['reason']} "
+              f"(max sustained {saturation['max_sustained_rps']:.2f} req/s)")
+    else:
+        print(f"No saturation up to level {levels[-1]:g} ({saturation['max_sustained_rps']:.2f} req/s)")
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "target": args.url or f"local ({args.llm} LLM)",
+        "config": {key: value for key, value in vars(args).items() if key != "out"},
+        "steps": steps,
+        "saturation": saturation,
+    }
+
+
+def main(args):
+    if args.url:
+        report = asyncio.run(run(args, args.url.rstrip("/")))
+    else:
+        with local_service(args) as base_url:
+            report = asyncio.run(run(args, base_url))
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator for the persona API")
+    parser.add_argument("--url", default=None, help="Base URL of a running deployment (default: serve the app locally on stand-ins)")
+    parser.add_argument("--route", choices=("generate", "stream", "bulk"), default="generate")
+    parser.add_argument("--model", choices=("closed", "open"), default="closed")
+    parser.add_argument("--levels", default="1,4,16", help="Virtual users (closed) or requests/second (open) per step")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per step")
+    parser.add_argument("--think", type=float, default=0.0, help="Mean think time between a virtual user's requests")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--population", type=int, default=200, help="Distinct users to draw from")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf skew of username popularity (0 = uniform)")
+    parser.add_argument("--usernames", default=None, help="Comma-separated usernames, most popular first (with --url)")
+    parser.add_argument("--bulk-size", type=int, default=10, help="Users per request for --route bulk")
+    parser.add_argument("--items", type=int, default=25, help="Posts & comments per stand-in user (each)")
+    parser.add_argument("--llm", choices=("replay", "standin"), default="replay")
+    parser.add_argument("--reddit-latency", type=float, default=0.15)
+    parser.add_argument("--llm-latency", type=float, default=0.8)
+    parser.add_argument("--jitter", type=float, default=0.05)
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--slo-p99-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default=None, help="JSON report path (default: outputs/loadgen/<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.out is None:
+        args.out = os.path.join("outputs", "loadgen", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    args.out = os.path.abspath(args.out)
+    main(args)
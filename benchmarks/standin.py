@@ -0,0 +1,124 @@
+"""
+Local stand-in for an OpenAI-compatible chat completions API (Groq included), for benchmarks
+
+Serves POST '/openai/v1/chat/completions' (Groq's path) & '/v1/chat/completions' with a canned reply
+after a configurable synthetic latency, over HTTP/1.1 keep-alive. It counts the TCP connections &
+requests it sees, so client-side connection reuse can be checked from the server's side too.
+
+Usage:
+    with StandInLLMServer(latency=0.05) as server:
+        os.environ["GROQ_API_BASE"] = server.url
+        ...
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+DEFAULT_REPLY = "</> Name: Stand-in\nCited from: \"stand-in reply\""
+
+
+class StandInLLMServer:
+    """
+    Threaded HTTP server answering chat completion requests with a canned reply
+
+    Attributes:
+        connections (int): TCP connections accepted so far
+        requests (int): Chat completion requests served so far
+    """
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 reply: str = DEFAULT_REPLY,
+                 latency_fn: Optional[Callable[[], float]] = None,
+                 port: int = 0):
+        """
+        Args:
+            latency (float): Seconds to wait before answering
+            jitter (float): Extra uniform random wait, in seconds
+            reply (str): Assistant message returned for every request
+            latency_fn (Optional[Callable[[], float]]): Overrides latency/jitter, eg - to simulate a heavy tail
+            port (int): Port to bind on 127.0.0.1 (0 = any free port)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.reply = reply
+        self.latency_fn = latency_fn
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _delay(self) -> float:
+        if self.latency_fn is not None:
+            return self.latency_fn()
+        return self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with server._lock:
+                    server.requests += 1
+
+                delay = server._delay()
+                if delay > 0:
+                    time.sleep(delay)
+
+                payload = json.dumps({
+                    "id": f"chatcmpl-standin-{server.requests}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stand-in"),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.reply},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self) -> "StandInLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,8 +1,9 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 from typing import Optional
 
+from logs.logging_config import add_redactions, find_project_root, logger, reload_log_settings, secret_values
+
 
 # class AppConfig:
 #     """
@@ -116,8 +117,11 @@ class AppConfig:
     """
      Singleton config class to load environment variables and define global settings
 
+     Values are looked up in the process environment when asked for, nothing is copied up front.
+     Outside Docker, the .env file at the project root (or the one ENV_FILE points to) is loaded into it first.
+
      Attributes:
-         configs (dict): A dictionary of loaded environment variables
+         configs (dict): Values set at runtime with 'set', taking precedence over the environment
          GROQ_API_KEY (str): Loaded Groq API key for LLM integration
          GROQ_MODEL_NAME (str): Default model name used by Groq
     """
@@ -134,31 +138,30 @@ class AppConfig:
 
         # Skipping .env loading if all needed variables are already set in environment
         if os.getenv("GROQ_API_KEY") and os.getenv("REDDIT_CLIENT_ID") and os.getenv("REDDIT_CLIENT_SECRET"):
-            print("[DEBUG] Using existing environment variables (Docker mode)")
+            logger.debug("Using existing environment variables (Docker mode)")
         else:
-            # Fallback to searching for .env only in dev mode
-            env_path = None
-            curr_path = Path(__file__).resolve()
-            for parent in curr_path.parents:
-                candidate = parent / ".env"
-                if candidate.exists():
-                    env_path = candidate
-                    break
-
-            if not env_path:
-                raise FileNotFoundError(".env file not found and required variables not set in environment.")
+            # Fallback to the .env file only in dev mode
+            env_path = Path(os.getenv("ENV_FILE") or Path(find_project_root()) / ".env")
+            if not env_path.is_file():
+                raise FileNotFoundError(f".env file not found at {env_path} and required variables not set in environment.")
+
+            from dotenv import load_dotenv
 
             load_dotenv(env_path, override=True)
-            print(f"[DEBUG] Loaded .env from: {env_path}")
+            # Logging was set up at import, from the environment alone - apply the LOG_* values from .env
+            reload_log_settings()
+            logger.debug(f"Loaded .env from: {env_path}")
+            # Credentials loaded from .env are masked in the logs, like those already in the environment
+            add_redactions(secret_values(os.environ))
 
         self._load_configs()
         AppConfig._instance = self
 
     def _load_configs(self):
         """
-         helper to load all environment variables into a dictionary
+         helper to set up the runtime overrides & the Groq settings read on every LLM client build
         """
-        self.configs = dict(os.environ)
+        self.configs = {}
         self.GROQ_API_KEY = os.getenv("GROQ_API_KEY")
         self.GROQ_MODEL_NAME = os.getenv("GROQ_MODEL_NAME")
 
@@ -183,7 +186,9 @@ class AppConfig:
          Returns:
              Optional[str]: The corresponding environment value or default
         """
-        return self.configs.get(key, default)
+        if key in self.configs:
+            return self.configs[key]
+        return os.environ.get(key, default)
 
     def set(self, key: str, value: str):
         """
@@ -193,4 +198,52 @@ class AppConfig:
               key (str): Configuration key to set
               value (str): Value to assign to the key
         """
-        self.configs[key] = value
\ No newline at end of file
+        self.configs[key] = value
+
+    def get_int(self, key: str, default: int) -> int:
+        """
+         Retrieves a configuration value as an integer
+
+         Args:
+             key (str): The environment variable name
+             default (int): Value used when the key is missing or not a valid integer
+
+         Returns:
+             int: The parsed value or default
+        """
+        try:
+            return int(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_float(self, key: str, default: float) -> float:
+        """
+         Retrieves a configuration value as a float
+
+         Args:
+             key (str): The environment variable name
+             default (float): Value used when the key is missing or not a valid number
+
+         Returns:
+             float: The parsed value or default
+        """
+        try:
+            return float(self.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def get_bool(self, key: str, default: bool) -> bool:
+        """
+         Retrieves a configuration value as a boolean ("1", "true", "yes" & "on" count as True)
+
+         Args:
+             key (str): The environment variable name
+             default (bool): Value used when the key is missing
+
+         Returns:
+             bool: The parsed value or default
+        """
+        value = self.get(key)
+        if value is None:
+            return default
+        return str(value).strip().lower() in ("1", "true", "yes", "on")
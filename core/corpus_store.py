@@ -0,0 +1,162 @@
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from configs.app_config import AppConfig
+
+SUBMISSION = "submission"
+COMMENT = "comment"
+
+
+class CorpusStore:
+    """
+    Local, SQLite-backed store of every Reddit submission/comment scraped per user
+
+    Items are stored with their fullname (eg - t3_abc123), creation time & permalink, which lets the
+    scraper ask Reddit only for items newer than the newest one it already holds (the cursor).
+
+    Configuration values are retrieved from AppConfig:
+        > CORPUS_STORE_ENABLED (default: true)
+        > CORPUS_STORE_PATH (default: outputs/corpus.db)
+        > CORPUS_FULL_REFRESH_SECONDS (default: 86400) - how often a user's cursor is rebuilt from scratch,
+          which also picks up edits & recovers from a deleted cursor item
+    """
+
+    def __init__(self, db_path: str = "outputs/corpus.db", full_refresh_seconds: int = 86400):
+        """
+        Args:
+            db_path (str): SQLite database file, created if missing
+            full_refresh_seconds (int): Max age of a cursor before a full re-fetch is forced
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.full_refresh_seconds = full_refresh_seconds
+        self._init_schema()
+
+    @classmethod
+    def from_config(cls) -> Optional["CorpusStore"]:
+        """
+        Returns:
+            Optional[CorpusStore]: The store, or None if CORPUS_STORE_ENABLED is off
+        """
+        config = AppConfig.get_config_instance()
+        if not config.get_bool("CORPUS_STORE_ENABLED", True):
+            return None
+        return cls(
+            db_path=config.get("CORPUS_STORE_PATH", "outputs/corpus.db"),
+            full_refresh_seconds=config.get_int("CORPUS_FULL_REFRESH_SECONDS", 86400),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a short-lived connection - the store is used from several scraper threads
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS items (
+                    fullname TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    created_utc REAL NOT NULL,
+                    permalink TEXT,
+                    text TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_items_user_kind_created
+                    ON items (username, kind, created_utc DESC);
+                CREATE TABLE IF NOT EXISTS cursors (
+                    username TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    last_full_fetch REAL NOT NULL,
+                    PRIMARY KEY (username, kind)
+                );
+                """
+            )
+
+    def get_cursor(self, username: str, kind: str) -> Optional[str]:
+        """
+        Returns the fullname of the newest stored item, if an incremental fetch is allowed
+
+        Args:
+            username (str): Reddit handle
+            kind (str): SUBMISSION or COMMENT
+
+        Returns:
+            Optional[str]: The cursor fullname, or None when a full fetch is due
+        """
+        username = username.lower()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT last_full_fetch FROM cursors WHERE username = ? AND kind = ?", (username, kind)
+            ).fetchone()
+            if row is None or time.time() - row["last_full_fetch"] > self.full_refresh_seconds:
+                return None
+
+            newest = conn.execute(
+                "SELECT fullname FROM items WHERE username = ? AND kind = ? ORDER BY created_utc DESC LIMIT 1",
+                (username, kind),
+            ).fetchone()
+        return newest["fullname"] if newest else None
+
+    def add_items(self, username: str, kind: str, items: List[Dict[str, Any]], full_refresh: bool = False):
+        """
+        Upserts fetched items, or - for a full refresh - replaces the user's stored items of that kind,
+        so items deleted on Reddit drop out of the store
+
+        Args:
+            username (str): Reddit handle
+            kind (str): SUBMISSION or COMMENT
+            items (List[Dict[str, Any]]): Items with 'id', 'created_utc', 'permalink' & 'text'
+            full_refresh (bool): Whether the items came from a non-incremental fetch
+        """
+        username = username.lower()
+        with closing(self._connect()) as conn, conn:
+            if full_refresh:
+                conn.execute("DELETE FROM items WHERE username = ? AND kind = ?", (username, kind))
+            conn.executemany(
+                "INSERT OR REPLACE INTO items (fullname, username, kind, created_utc, permalink, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(i["id"], username, kind, i["created_utc"], i.get("permalink"), i["text"]) for i in items],
+            )
+            if full_refresh:
+                conn.execute(
+                    "INSERT OR REPLACE INTO cursors (username, kind, last_full_fetch) VALUES (?, ?, ?)",
+                    (username, kind, time.time()),
+                )
+
+    def recent_items(self, username: str, kind: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Returns the user's newest stored items, newest first
+
+        Args:
+            username (str): Reddit handle
+            kind (str): SUBMISSION or COMMENT
+            limit (int): Max number of items
+
+        Returns:
+            List[Dict[str, Any]]: Items shaped like the scraper's ('id', 'kind', 'created_utc', 'permalink', 'text')
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT fullname, kind, created_utc, permalink, text FROM items "
+                "WHERE username = ? AND kind = ? ORDER BY created_utc DESC LIMIT ?",
+                (username.lower(), kind, limit),
+            ).fetchall()
+        return [
+            {"id": r["fullname"], "kind": r["kind"], "created_utc": r["created_utc"], "permalink": r["permalink"], "text": r["text"]}
+            for r in rows
+        ]
+
+    def all_items(self, username: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Returns every stored submission & comment of a user, newest first
+        """
+        return self.recent_items(username, SUBMISSION, -1), self.recent_items(username, COMMENT, -1)
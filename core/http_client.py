@@ -0,0 +1,184 @@
+from threading import Lock
+from typing import Any, Dict, Optional
+
+import httpx
+
+from configs.app_config import AppConfig
+from core.rate_governor import RateGovernor, TokenBucket
+from logs.logging_config import logger
+
+# Hosts whose requests draw from a RateGovernor bucket, by host suffix
+_GOVERNED_HOSTS = {"groq.com": "groq"}
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters of HTTP requests vs. newly opened TCP connections
+
+    Every request that didn't open a connection was served over a pooled keep-alive one.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.errors = 0
+
+    def on_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def on_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def on_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Request & connection counters & the share of requests that reused a connection
+        """
+        with self._lock:
+            reused = max(0, self.requests - self.new_connections)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": (reused / self.requests) if self.requests else 0.0,
+                "errors": self.errors,
+            }
+
+
+class SharedHTTPClient:
+    """
+    One tuned pair of httpx clients (sync & async) shared by every LLM client in the process
+
+    All ChatGroq instances get the same connection pool, so keep-alive connections to the API are
+    reused across analyzers & requests instead of each client opening its own.
+    New TCP connections are counted through httpcore's trace extension, requests through event hooks.
+    Requests to rate-limited upstreams (Groq) wait for a RateGovernor token first, & their responses'
+    rate-limit headers are fed back into the bucket - every retry included.
+
+    Configuration values are retrieved from AppConfig:
+        > LLM_HTTP_MAX_CONNECTIONS (default: 20)
+        > LLM_HTTP_MAX_KEEPALIVE (default: 10) - idle connections kept open
+        > LLM_HTTP_KEEPALIVE_EXPIRY (default: 60) - seconds an idle connection is kept
+        > LLM_HTTP_TIMEOUT (default: 120) - read/write/pool timeout in seconds
+        > LLM_HTTP_CONNECT_TIMEOUT (default: 5)
+    """
+
+    def __init__(self,
+                 max_connections: int = 20,
+                 max_keepalive: int = 10,
+                 keepalive_expiry: float = 60.0,
+                 timeout: float = 120.0,
+                 connect_timeout: float = 5.0):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.stats = ConnectionStats()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._lock = Lock()
+
+    @classmethod
+    def from_config(cls) -> "SharedHTTPClient":
+        config = AppConfig.get_config_instance()
+        return cls(
+            max_connections=config.get_int("LLM_HTTP_MAX_CONNECTIONS", 20),
+            max_keepalive=config.get_int("LLM_HTTP_MAX_KEEPALIVE", 10),
+            keepalive_expiry=config.get_float("LLM_HTTP_KEEPALIVE_EXPIRY", 60.0),
+            timeout=config.get_float("LLM_HTTP_TIMEOUT", 120.0),
+            connect_timeout=config.get_float("LLM_HTTP_CONNECT_TIMEOUT", 5.0),
+        )
+
+    def _trace(self, event: str, info: Dict[str, Any]):
+        if event == "connection.connect_tcp.complete":
+            self.stats.on_connection()
+        elif event == "connection.connect_tcp.failed":
+            self.stats.on_error()
+
+    async def _atrace(self, event: str, info: Dict[str, Any]):
+        self._trace(event, info)
+
+    @staticmethod
+    def _bucket(request: httpx.Request) -> Optional[TokenBucket]:
+        host = request.url.host or ""
+        for suffix, name in _GOVERNED_HOSTS.items():
+            if host == suffix or host.endswith("." + suffix):
+                return RateGovernor.get(name)
+        return None
+
+    def _on_request(self, request: httpx.Request):
+        bucket = self._bucket(request)
+        if bucket is not None:
+            bucket.acquire()
+        self.stats.on_request()
+        request.extensions["trace"] = self._trace
+
+    async def _on_async_request(self, request: httpx.Request):
+        bucket = self._bucket(request)
+        if bucket is not None:
+            await bucket.acquire_async()
+        self.stats.on_request()
+        request.extensions["trace"] = self._atrace
+
+    def _on_response(self, response: httpx.Response):
+        bucket = self._bucket(response.request)
+        if bucket is not None:
+            bucket.update_from_headers(response.headers)
+
+    async def _on_async_response(self, response: httpx.Response):
+        bucket = self._bucket(response.request)
+        if bucket is not None:
+            await bucket.run_async(bucket.update_from_headers, response.headers)
+
+    @property
+    def client(self) -> httpx.Client:
+        """
+        The shared sync client, created on first use
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        limits=self.limits,
+                        timeout=self.timeout,
+                        event_hooks={"request": [self._on_request], "response": [self._on_response]},
+                    )
+                    logger.info(f"Created shared HTTP client for LLM calls ({self.limits})")
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        The shared async client, created on first use
+        """
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    self._async_client = httpx.AsyncClient(
+                        limits=self.limits,
+                        timeout=self.timeout,
+                        event_hooks={"request": [self._on_async_request], "response": [self._on_async_response]},
+                    )
+                    logger.info(f"Created shared async HTTP client for LLM calls ({self.limits})")
+        return self._async_client
+
+    async def aclose(self):
+        """
+        Closes both clients & their pooled connections
+        """
+        with self._lock:
+            client, async_client = self._client, self._async_client
+            self._client = self._async_client = None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.aclose()
@@ -1,12 +1,237 @@
-from typing import Any, Optional, Dict
+import asyncio
+import json
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, AsyncIterator, Iterator, Optional, Dict, Tuple
 from threading import Lock
 
-from langchain_core.language_models import BaseLanguageModel
-from langchain_groq import ChatGroq
-
 from configs.app_config import AppConfig
+from core.http_client import SharedHTTPClient
+from core.llm_cache import LLMResponseCache
+from core.llm_router import LLMRouter, RoutedChatModel
+from core.metrics import REGISTRY, span
+from core.token_budget import TokenCounter
 from logs.logging_config import logger
 
+# LangChain & the Groq SDK are imported on first use: they take longer to import than the rest of the API
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseLanguageModel
+
+_LLM_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds", "Time taken by LLM calls (cache hits excluded)", ["model", "operation"]
+)
+_LLM_FIRST_TOKEN_SECONDS = REGISTRY.histogram(
+    "llm_time_to_first_token_seconds", "Time until a streamed LLM call yields its first chunk", ["model"]
+)
+_LLM_PROMPT_TOKENS = REGISTRY.counter("llm_prompt_tokens_total", "Prompt tokens sent to the LLM", ["model"])
+_LLM_COMPLETION_TOKENS = REGISTRY.counter("llm_completion_tokens_total", "Completion tokens received from the LLM", ["model"])
+_LLM_ERRORS = REGISTRY.counter("llm_errors_total", "LLM calls that raised, by exception type", ["model", "error"])
+
+
+class InstrumentedLLM:
+    """
+    Wraps a chat model so every call feeds the LLM metrics (latency, time to first token, tokens & errors)
+    & runs inside an 'llm.<operation>' trace span
+
+    Token counts are taken from the usage the backend reports, or estimated with TokenCounter when it doesn't.
+    Anything else is passed through to the wrapped model.
+    """
+
+    def __init__(self, llm: Any, model: str):
+        self.llm = llm
+        self.model = model
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    @staticmethod
+    def _prompt_text(prompt: Any) -> str:
+        if isinstance(prompt, str):
+            return prompt
+        return "\n".join(str(getattr(message, "content", message)) for message in prompt)
+
+    @staticmethod
+    def _usage(message: Any) -> Optional[Tuple[int, int]]:
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            return usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage")
+        if token_usage:
+            return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+        return None
+
+    def _count_tokens(self, prompt: Any, completion: str, usage: Optional[Tuple[int, int]]):
+        if usage is None:
+            usage = TokenCounter.count(self._prompt_text(prompt)), TokenCounter.count(completion)
+        _LLM_PROMPT_TOKENS.inc(usage[0], model=self.model)
+        _LLM_COMPLETION_TOKENS.inc(usage[1], model=self.model)
+
+    def _record(self, operation: str, start: float, error: Optional[BaseException] = None):
+        _LLM_SECONDS.observe(time.perf_counter() - start, model=self.model, operation=operation)
+        if error is not None:
+            _LLM_ERRORS.inc(model=self.model, error=type(error).__name__)
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        with span("llm.invoke", **{"llm.model": self.model}):
+            try:
+                result = self.llm.invoke(prompt, *args, **kwargs)
+            except Exception as e:
+                self._record("invoke", start, e)
+                raise
+        self._record("invoke", start)
+        self._count_tokens(prompt, str(getattr(result, "content", "")), self._usage(result))
+        return result
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> Any:
+        start = time.perf_counter()
+        with span("llm.ainvoke", **{"llm.model": self.model}):
+            try:
+                result = await self.llm.ainvoke(prompt, *args, **kwargs)
+            except Exception as e:
+                self._record("ainvoke", start, e)
+                raise
+        self._record("ainvoke", start)
+        self._count_tokens(prompt, str(getattr(result, "content", "")), self._usage(result))
+        return result
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator[Any]:
+        start = time.perf_counter()
+        parts, usage = [], None
+        with span("llm.stream", attach=False, **{"llm.model": self.model}):
+            try:
+                for chunk in self.llm.stream(prompt, *args, **kwargs):
+                    if not parts:
+                        _LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start, model=self.model)
+                    parts.append(str(chunk.content))
+                    usage = self._usage(chunk) or usage
+                    yield chunk
+            except Exception as e:
+                self._record("stream", start, e)
+                raise
+        self._record("stream", start)
+        self._count_tokens(prompt, "".join(parts), usage)
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        start = time.perf_counter()
+        parts, usage = [], None
+        with span("llm.astream", attach=False, **{"llm.model": self.model}):
+            try:
+                async for chunk in self.llm.astream(prompt, *args, **kwargs):
+                    if not parts:
+                        _LLM_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start, model=self.model)
+                    parts.append(str(chunk.content))
+                    usage = self._usage(chunk) or usage
+                    yield chunk
+            except Exception as e:
+                self._record("astream", start, e)
+                raise
+        self._record("astream", start)
+        self._count_tokens(prompt, "".join(parts), usage)
+
+
+class CachedLLM:
+    """
+    Wraps what 'LLM.get_llm' returns with the exact-match LLMResponseCache
+
+    'invoke', 'ainvoke', 'stream' & 'astream' first look the prompt up in the cache; a hit is returned
+    (or streamed as a single chunk) without calling the model, a miss calls it & stores the response.
+    The async variants read & write the cache (SQLite) in a worker thread, off the event loop.
+    Plain chat responses are cached as their text, structured outputs as their JSON.
+    Anything else is passed through to the wrapped model.
+    """
+
+    def __init__(self,
+                 llm: Any,
+                 cache: LLMResponseCache,
+                 model: Optional[str],
+                 temperature: float,
+                 model_kwargs: Optional[Dict[str, Any]] = None,
+                 structured_output: Optional[Any] = None):
+        self.llm = llm
+        self.cache = cache
+        self.model = model
+        self.temperature = temperature
+        self.model_kwargs = model_kwargs or {}
+        self.structured_output = structured_output
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.llm, name)
+
+    def _key(self, prompt: Any) -> str:
+        return self.cache.make_key(self.model, self.temperature, prompt, self.structured_output, self.model_kwargs)
+
+    def _dump(self, result: Any) -> str:
+        if self.structured_output is None:
+            return json.dumps({"content": result.content})
+        if hasattr(result, "model_dump"):
+            return json.dumps({"model": result.model_dump()})
+        return json.dumps({"data": result})
+
+    def _load(self, value: str) -> Any:
+        record = json.loads(value)
+        if "content" in record:
+            from langchain_core.messages import AIMessage
+
+            return AIMessage(content=record["content"])
+        if "model" in record and hasattr(self.structured_output, "model_validate"):
+            return self.structured_output.model_validate(record["model"])
+        return record.get("data")
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> Any:
+        key = self._key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self._load(cached)
+        result = self.llm.invoke(prompt, *args, **kwargs)
+        self.cache.set(key, self._dump(result))
+        return result
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> Any:
+        key = self._key(prompt)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            return self._load(cached)
+        result = await self.llm.ainvoke(prompt, *args, **kwargs)
+        await asyncio.to_thread(self.cache.set, key, self._dump(result))
+        return result
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator[Any]:
+        if self.structured_output is not None:
+            yield from self.llm.stream(prompt, *args, **kwargs)
+            return
+        key = self._key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            from langchain_core.messages import AIMessageChunk
+
+            yield AIMessageChunk(content=self._load(cached).content)
+            return
+        parts = []
+        for chunk in self.llm.stream(prompt, *args, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        self.cache.set(key, json.dumps({"content": "".join(parts)}))
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator[Any]:
+        if self.structured_output is not None:
+            async for chunk in self.llm.astream(prompt, *args, **kwargs):
+                yield chunk
+            return
+        key = self._key(prompt)
+        cached = await asyncio.to_thread(self.cache.get, key)
+        if cached is not None:
+            from langchain_core.messages import AIMessageChunk
+
+            yield AIMessageChunk(content=self._load(cached).content)
+            return
+        parts = []
+        async for chunk in self.llm.astream(prompt, *args, **kwargs):
+            parts.append(chunk.content)
+            yield chunk
+        # Only a stream that ran to completion is cached
+        await asyncio.to_thread(self.cache.set, key, json.dumps({"content": "".join(parts)}))
+
 
 class LLM:
     """
@@ -17,8 +242,19 @@ class LLM:
     This class uses LangChain's 'ChatGroq' wrapper & supports structured output formats if specified
     Reads model configuration and API keys from app_config.py
 
+    Clients are memoized per (temperature, model_kwargs, structured_output), & all of them share one
+    pooled HTTP client, so keep-alive connections to Groq are reused across analyzers & requests.
+
+    When LLM_BACKENDS is set, plain chat clients go through the LLMRouter instead (hedging, failover &
+    circuit breaking over several OpenAI-compatible backends); structured-output clients stay on ChatGroq.
+
+    Every client is wrapped in InstrumentedLLM (inside the response cache, so only real calls are measured).
+
     Attributes:
         config (AppConfig): Application configuration instance to access credentils like API keys and model names
+        cache (Optional[LLMResponseCache]): Exact-match response cache, when LLM_CACHE_ENABLED is on
+        http (SharedHTTPClient): Connection pool shared by every client
+        router (Optional[LLMRouter]): Multi-backend router, when LLM_BACKENDS is set
     """
 
     def __init__(self, config: AppConfig):
@@ -29,13 +265,33 @@ class LLM:
             config (AppConfig): Loaded config with Groq credentials and model name
         """
         self.config = config
+        self.cache = LLMResponseCache.from_config()
+        self.http = SharedHTTPClient.from_config()
+        self.router = LLMRouter.from_config(self.http)
+        self._clients: Dict[Tuple[Any, ...], Any] = {}
+        self._clients_lock = Lock()
+
+    @staticmethod
+    def _client_key(temperature: float,
+                    model_kwargs: Dict[str, Any],
+                    structured_output: Optional[Any]) -> Tuple[Any, ...]:
+        """
+        Hashable memoization key - schemas that aren't hashable (eg - JSON schema dicts) are keyed by their JSON
+        """
+        try:
+            hash(structured_output)
+            schema_key = structured_output
+        except TypeError:
+            schema_key = json.dumps(structured_output, sort_keys=True, default=str)
+        return temperature, json.dumps(model_kwargs, sort_keys=True, default=str), schema_key
 
     def get_llm(self,
                 temperature: float = 0.3,
                 model_kwargs: Optional[Dict[str, Any]] = None, 
-                structured_output: Optional[Any] = None) -> BaseLanguageModel:
+                structured_output: Optional[Any] = None) -> "BaseLanguageModel":
          """
             Returns a Groq LLM instance with optional structured output and config overrides
+            The same instance is handed out for the same arguments
 
             Args:
                 temperature (float): Sampling temperature for text generation
@@ -47,28 +303,62 @@ class LLM:
          """
          
          model_kwargs = model_kwargs or {}
+         key = self._client_key(temperature, model_kwargs, structured_output)
 
-         llm = ChatGroq(
-            model=self.config.GROQ_MODEL_NAME,
-            api_key=self.config.get("GROQ_API_KEY"),
-            temperature=temperature,
-            **model_kwargs
-            )
+         with self._clients_lock:
+             if key in self._clients:
+                 return self._clients[key]
 
-         if structured_output:
-             return llm.with_structured_output(structured_output)
-         
-         return llm
+             if self.router and not structured_output:
+                 llm = RoutedChatModel(self.router, temperature=temperature, model_kwargs=model_kwargs)
+             else:
+                 from langchain_groq import ChatGroq
+
+                 llm = ChatGroq(
+                    model=self.config.GROQ_MODEL_NAME,
+                    api_key=self.config.get("GROQ_API_KEY"),
+                    temperature=temperature,
+                    http_client=self.http.client,
+                    http_async_client=self.http.async_client,
+                    # 429s & transient errors are retried by RateGovernor (see PersonaAnalyzer), SDK retries would multiply the attempts
+                    max_retries=0,
+                    **model_kwargs
+                    )
+
+             if structured_output:
+                 llm = llm.with_structured_output(structured_output)
+
+             llm = InstrumentedLLM(llm, "router" if self.router and not structured_output else self.config.GROQ_MODEL_NAME)
+
+             if self.cache:
+                 llm = CachedLLM(llm, self.cache, self.config.GROQ_MODEL_NAME, temperature, model_kwargs, structured_output)
+
+             self._clients[key] = llm
+             logger.info(f"Created LLM client #{len(self._clients)} (temperature={temperature})")
+             return llm
+
+    async def aclose(self):
+        """
+        Forgets the memoized clients, which hold the shared HTTP clients, & closes the pool
+
+        The next 'get_llm' builds fresh clients on a new pool, eg - after an in-process app restart
+        """
+        with self._clients_lock:
+            self._clients.clear()
+        await self.http.aclose()
 
 
 class LLMManager:
     """
     Singleton manager for Groq LLM instance
     Ensures that the LLM is instantiated only once and reused across the app
+
+    Also owns the semaphore that bounds in-flight LLM calls (LLM_MAX_CONCURRENCY), one per event loop
     """
     _instance = None
     _llm = None
     _lock = Lock()
+    _semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
 
     def __new__(cls):
         """
@@ -86,7 +376,7 @@ class LLMManager:
     def get_llm(cls,
                 temperature: float = 0.3,
                 model_kwargs: Optional[Dict[str, Any]] = None,
-                structured_output: Optional[Any] = None) -> BaseLanguageModel:
+                structured_output: Optional[Any] = None) -> "BaseLanguageModel":
         """
         Innterface to retrieve the shared Groq LLM instance
 
@@ -103,3 +393,56 @@ class LLMManager:
                                   model_kwargs=model_kwargs,
                                   structured_output=structured_output
                                 )
+
+    @classmethod
+    def connection_stats(cls) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Request/connection counters of the shared HTTP pool & the number of memoized clients
+        """
+        llm = cls()._llm
+        return {"clients": len(llm._clients), **llm.http.stats.snapshot()}
+
+    @classmethod
+    def router_stats(cls) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Optional[Dict[str, Any]]: Hedge/failover counters & per-backend health, or None unless LLM_BACKENDS is set
+        """
+        router = cls()._llm.router
+        return router.stats() if router else None
+
+    @classmethod
+    async def aclose(cls):
+        """
+        Closes the shared HTTP pool & drops the clients bound to it, if the manager was ever used
+        """
+        if cls._instance is not None:
+            await cls._instance._llm.aclose()
+
+    @classmethod
+    def get_cache(cls) -> Optional[LLMResponseCache]:
+        """
+        Returns:
+            Optional[LLMResponseCache]: The shared LLM response cache, or None unless LLM_CACHE_ENABLED is on
+        """
+        return cls()._llm.cache
+
+    @classmethod
+    def get_semaphore(cls) -> asyncio.Semaphore:
+        """
+        Returns the semaphore every async LLM call should hold while in flight
+
+        The limit comes from LLM_MAX_CONCURRENCY (default: 4). A semaphore binds to the loop that first waits on it,
+        so there's one per running event loop - the app's single loop, or each 'asyncio.run' of the CLI, tests & benchmarks
+
+        Returns:
+            asyncio.Semaphore: The semaphore of the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = cls._semaphores.get(loop)
+        if semaphore is None:
+            limit = max(1, AppConfig.get_config_instance().get_int("LLM_MAX_CONCURRENCY", 4))
+            with cls._lock:
+                semaphore = cls._semaphores.setdefault(loop, asyncio.Semaphore(limit))
+        return semaphore
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from configs.app_config import AppConfig
+from logs.logging_config import logger
+
+
+class LLMResponseCache:
+    """
+    Exact-match, two-tier cache of LLM responses
+
+    A response is only reused for the very same request: same model, temperature, model kwargs,
+    structured-output schema & prompt (see 'make_key'). Hot entries live in a bounded in-memory LRU,
+    every entry is also written to a SQLite file, which survives restarts & is promoted back into memory on a hit.
+    The SQLite tier is bounded by size: once it grows past 'max_bytes', least recently used entries are evicted.
+
+    Opt-in - configuration values are retrieved from AppConfig:
+        > LLM_CACHE_ENABLED (default: false)
+        > LLM_CACHE_MAX_ENTRIES (default: 512) - in-memory LRU size
+        > LLM_CACHE_MAX_MB (default: 256) - size bound of the SQLite tier
+        > LLM_CACHE_PATH (default: outputs/.cache/llm.db) - empty for memory only
+
+    Attributes:
+        hits (int): Lookups served from memory or disk
+        misses (int): Lookups that required an LLM call
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 256 * 1024 * 1024,
+                 db_path: Optional[str] = "outputs/.cache/llm.db"):
+        """
+        Args:
+            max_entries (int): Maximum number of responses held in memory
+            max_bytes (int): Maximum total size of the responses held in SQLite
+            db_path (Optional[str]): SQLite database file for the disk tier, None for memory only
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max_bytes
+        self.db_path = Path(db_path) if db_path else None
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = Lock()
+        self._disk_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.db_path:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._init_schema()
+
+    @classmethod
+    def from_config(cls) -> Optional["LLMResponseCache"]:
+        """
+        Returns:
+            Optional[LLMResponseCache]: The cache, or None unless LLM_CACHE_ENABLED is on
+        """
+        config = AppConfig.get_config_instance()
+        if not config.get_bool("LLM_CACHE_ENABLED", False):
+            return None
+        logger.info("LLM response cache enabled")
+        return cls(
+            max_entries=config.get_int("LLM_CACHE_MAX_ENTRIES", 512),
+            max_bytes=config.get_int("LLM_CACHE_MAX_MB", 256) * 1024 * 1024,
+            db_path=config.get("LLM_CACHE_PATH", "outputs/.cache/llm.db") or None,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _init_schema(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at);
+                """
+            )
+            self._disk_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: Optional[str], temperature: float, prompt: Any,
+                 schema: Any = None, model_kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Hashes everything that determines an LLM response into the cache key
+
+        Args:
+            model (Optional[str]): Model name
+            temperature (float): Sampling temperature
+            prompt (Any): Prompt string or message list
+            schema (Any): Structured-output schema (pydantic model, JSON schema dict, ...), if any
+            model_kwargs (Optional[Dict[str, Any]]): Extra model arguments
+
+        Returns:
+            str: Hex sha256 digest
+        """
+        if hasattr(schema, "model_json_schema"):
+            schema = schema.model_json_schema()
+        digest = hashlib.sha256(json.dumps(
+            {"model": model, "temperature": temperature, "schema": schema, "kwargs": model_kwargs or {}},
+            sort_keys=True, default=str,
+        ).encode("utf-8"))
+        digest.update(b"\x1e")
+        if isinstance(prompt, str):
+            digest.update(prompt.encode("utf-8"))
+        else:
+            for message in prompt:
+                digest.update(f"{getattr(message, 'type', '')}\x1f{getattr(message, 'content', message)}\x1f".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns:
+            Optional[str]: The cached (serialized) response, or None on a miss
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.db_path:
+            try:
+                with closing(self._connect()) as conn, conn:
+                    row = conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                if row is not None:
+                    with self._lock:
+                        self._remember(key, row[0])
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return row[0]
+            except sqlite3.Error as e:
+                logger.warning(f"Ignoring unreadable LLM cache entry {key}: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        """
+        Stores a response in both tiers, evicting least recently used disk entries past 'max_bytes'
+        """
+        with self._lock:
+            self._remember(key, value)
+
+        if not self.db_path:
+            return
+        size = len(value.encode("utf-8"))
+        try:
+            with closing(self._connect()) as conn, conn:
+                previous = conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, size, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, size, time.time()),
+                )
+                with self._lock:
+                    self._disk_bytes += size - (previous[0] if previous else 0)
+                    over = self._disk_bytes - self.max_bytes
+
+                if over > 0:
+                    freed = evicted = 0
+                    for old_key, old_size in conn.execute(
+                        "SELECT key, size FROM responses WHERE key != ? ORDER BY accessed_at", (key,)
+                    ).fetchall():
+                        if freed >= over:
+                            break
+                        conn.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                        freed += old_size
+                        evicted += 1
+                    with self._lock:
+                        self._disk_bytes -= freed
+                        self.evictions += evicted
+        except sqlite3.Error as e:
+            logger.warning(f"Couldn't write LLM cache entry {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Hit/miss counters, hit rate, evictions & current size of both tiers
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+            }
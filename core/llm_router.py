@@ -0,0 +1,434 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from threading import Lock
+from typing import TYPE_CHECKING, Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+import httpx
+
+from configs.app_config import AppConfig
+from core.http_client import SharedHTTPClient
+from core.rate_governor import status_code_of
+from logs.logging_config import logger
+
+if TYPE_CHECKING:
+    from langchain_core.messages import AIMessage, AIMessageChunk
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class BackendError(Exception):
+    """Raised when a backend answers with an error or an unusable response"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """
+    Whether an error speaks against the backend (timeouts, connection errors, malformed answers, 408 & 5xx)
+    rather than against the request - a 400, 401 or 429 would get the same answer from every backend
+    """
+    status = status_code_of(error)
+    return status is None or status >= 500 or status == 408
+
+
+class Backend:
+    """
+    One OpenAI-compatible chat completions endpoint, with its latency window & circuit breaker
+
+    The breaker opens after 'failure_threshold' consecutive failures; once 'reset_seconds' have passed,
+    one trial request is let through (half-open) & its outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self,
+                 name: str,
+                 base_url: str,
+                 model: str,
+                 api_key: Optional[str] = None,
+                 failure_threshold: int = 5,
+                 reset_seconds: float = 30.0,
+                 window: int = 200):
+        """
+        Args:
+            name (str): Label used in logs & stats
+            base_url (str): API root, eg - https://api.groq.com/openai/v1 ('/chat/completions' is appended)
+            model (str): Model name sent with every request
+            api_key (Optional[str]): Bearer token, if the endpoint needs one
+            failure_threshold (int): Consecutive failures that open the breaker
+            reset_seconds (float): Time an open breaker waits before a trial request
+            window (int): Number of recent latencies kept for the quantile estimates
+        """
+        self.name = name
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.model = model
+        self.api_key = api_key
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = Lock()
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.requests = 0
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def available(self) -> bool:
+        """
+        Whether a request may be sent now - an open breaker lets one trial through after 'reset_seconds'
+        """
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+            if self.state != CLOSED:
+                logger.info(f"LLM backend '{self.name}' recovered, closing its circuit")
+            self.state = CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.requests += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"Opening circuit of LLM backend '{self.name}' after {self.consecutive_failures} failures")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def record_rejected(self):
+        """
+        The backend answered, but turned the request down (4xx) - it's up, so the breaker isn't touched
+        """
+        with self._lock:
+            self.requests += 1
+            self._trial_in_flight = False
+
+    def record_cancelled(self, elapsed: float):
+        """
+        A request lost a hedge race - its elapsed time is a lower bound of its latency, & still counts
+        """
+        with self._lock:
+            self._latencies.append(elapsed)
+            self._trial_in_flight = False
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if not self._latencies:
+                return None
+            ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+    def samples(self) -> int:
+        return len(self._latencies)
+
+    def stats(self) -> Dict[str, Any]:
+        p50, p95, p99 = self.quantile(0.5), self.quantile(0.95), self.quantile(0.99)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "requests": self.requests,
+            "failures": self.failures,
+            "p50_ms": p50 * 1000 if p50 is not None else None,
+            "p95_ms": p95 * 1000 if p95 is not None else None,
+            "p99_ms": p99 * 1000 if p99 is not None else None,
+        }
+
+
+class LLMRouter:
+    """
+    Routes chat completions over several OpenAI-compatible backends (Groq, other providers, a local stand-in)
+
+    - Latency-aware routing: healthy backends are tried fastest (by median latency) first
+    - Hedging: if the first request hasn't answered after its backend's p95 latency, a second one goes to
+      the next backend (or the same one, if it's the only one); the first answer wins & the other is cancelled.
+      Only ~5% of requests get hedged, so p99 drops without doubling cost.
+    - Circuit breaking: a backend failing repeatedly is skipped until its breaker lets a trial request through
+    - Failover: a failed request (timeout, connection error, 5xx) is retried on the next available backend;
+      other 4xx responses are raised as they are, they'd be the same on every backend
+
+    Configuration values are retrieved from AppConfig:
+        > LLM_BACKENDS - JSON list of {"name", "base_url", "model", "api_key" or "api_key_env"}; routing is off when unset
+        > LLM_HEDGE_ENABLED (default: true)
+        > LLM_HEDGE_QUANTILE (default: 0.95) - latency quantile after which a hedge is sent
+        > LLM_HEDGE_MIN_SAMPLES (default: 20) - below this, LLM_HEDGE_DEFAULT_SECONDS is used instead
+        > LLM_HEDGE_DEFAULT_SECONDS (default: 10)
+        > LLM_BREAKER_FAILURES (default: 5)
+        > LLM_BREAKER_RESET_SECONDS (default: 30)
+    """
+
+    def __init__(self,
+                 backends: List[Backend],
+                 http: SharedHTTPClient,
+                 hedge_enabled: bool = True,
+                 hedge_quantile: float = 0.95,
+                 hedge_min_samples: int = 20,
+                 hedge_default_seconds: float = 10.0):
+        if not backends:
+            raise ValueError("LLMRouter needs at least one backend")
+        self.backends = backends
+        self.http = http
+        self.hedge_enabled = hedge_enabled
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_default_seconds = hedge_default_seconds
+        self._lock = Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @classmethod
+    def from_config(cls, http: SharedHTTPClient) -> Optional["LLMRouter"]:
+        """
+        Returns:
+            Optional[LLMRouter]: The router, or None when LLM_BACKENDS isn't set
+        """
+        config = AppConfig.get_config_instance()
+        raw = config.get("LLM_BACKENDS")
+        if not raw:
+            return None
+
+        failures = config.get_int("LLM_BREAKER_FAILURES", 5)
+        reset_seconds = config.get_float("LLM_BREAKER_RESET_SECONDS", 30.0)
+        backends = []
+        for index, spec in enumerate(json.loads(raw)):
+            api_key = spec.get("api_key") or (os.getenv(spec["api_key_env"]) if spec.get("api_key_env") else None)
+            backends.append(Backend(
+                name=spec.get("name") or f"backend-{index}",
+                base_url=spec["base_url"],
+                model=spec.get("model") or config.GROQ_MODEL_NAME,
+                api_key=api_key,
+                failure_threshold=failures,
+                reset_seconds=reset_seconds,
+            ))
+        logger.info(f"Routing LLM calls over {len(backends)} backends: {', '.join(b.name for b in backends)}")
+        return cls(
+            backends,
+            http,
+            hedge_enabled=config.get_bool("LLM_HEDGE_ENABLED", True),
+            hedge_quantile=config.get_float("LLM_HEDGE_QUANTILE", 0.95),
+            hedge_min_samples=config.get_int("LLM_HEDGE_MIN_SAMPLES", 20),
+            hedge_default_seconds=config.get_float("LLM_HEDGE_DEFAULT_SECONDS", 10.0),
+        )
+
+    def _ranked(self) -> List[Backend]:
+        """
+        Backends ordered by median latency, unmeasured ones first so they get measured
+        """
+        return sorted(self.backends, key=lambda b: b.quantile(0.5) if b.samples() else -1.0)
+
+    def _next_backend(self, exclude: Optional[List[Backend]] = None) -> Optional[Backend]:
+        """
+        Returns the fastest available backend that isn't in 'exclude'
+        """
+        exclude = exclude or []
+        for backend in self._ranked():
+            if backend not in exclude and backend.available():
+                return backend
+        return None
+
+    def _hedge_backend(self, primary: Backend) -> Optional[Backend]:
+        """
+        Returns the backend a hedge goes to - a single healthy backend can still hedge against itself
+        """
+        backend = self._next_backend(exclude=[primary])
+        if backend is None and primary.available():
+            backend = primary
+        return backend
+
+    def _hedge_delay(self, backend: Backend) -> float:
+        if backend.samples() < self.hedge_min_samples:
+            return self.hedge_default_seconds
+        return backend.quantile(self.hedge_quantile) or self.hedge_default_seconds
+
+    @staticmethod
+    def _messages(prompt: Any) -> List[Dict[str, str]]:
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        roles = {"human": "user", "ai": "assistant", "system": "system"}
+        return [
+            {"role": roles.get(getattr(m, "type", "human"), "user"), "content": getattr(m, "content", str(m))}
+            for m in prompt
+        ]
+
+    def _request(self, backend: Backend, prompt: Any, temperature: float, model_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        headers = {"Authorization": f"Bearer {backend.api_key}"} if backend.api_key else {}
+        body = {"model": backend.model, "messages": self._messages(prompt), "temperature": temperature, **model_kwargs}
+        return {"url": backend.url, "json": body, "headers": headers}
+
+    @staticmethod
+    def _content(response: httpx.Response) -> str:
+        if response.status_code >= 400:
+            raise BackendError(f"HTTP {response.status_code}: {response.text[:200]}", status_code=response.status_code)
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError) as e:
+            raise BackendError(f"Malformed completion: {e}")
+
+    async def _attempt(self, backend: Backend, prompt: Any, temperature: float, model_kwargs: Dict[str, Any]) -> str:
+        start = time.monotonic()
+        try:
+            response = await self.http.async_client.post(**self._request(backend, prompt, temperature, model_kwargs))
+            content = self._content(response)
+        except asyncio.CancelledError:
+            backend.record_cancelled(time.monotonic() - start)
+            raise
+        except Exception as e:
+            if is_backend_failure(e):
+                backend.record_failure()
+            else:
+                backend.record_rejected()
+            raise
+        backend.record_success(time.monotonic() - start)
+        return content
+
+    async def acomplete(self, prompt: Any, temperature: float = 0.3, model_kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Sends one chat completion, hedged & with failover
+
+        Args:
+            prompt (Any): Prompt string or message list
+            temperature (float): Sampling temperature
+            model_kwargs (Optional[Dict[str, Any]]): Extra request fields (eg - max_tokens)
+
+        Returns:
+            str: The completion text
+
+        Raises:
+            BackendError: When every available backend failed, or at once (with its 'status_code') when a backend
+                rejected the request itself - eg - 400, 401, or 429 for the RateGovernor to retry
+        """
+        model_kwargs = model_kwargs or {}
+        with self._lock:
+            self.calls += 1
+
+        tried: List[Backend] = []
+        last_error: Optional[BaseException] = None
+        while True:
+            primary = self._next_backend(exclude=tried)
+            if primary is None:
+                raise BackendError(f"No LLM backend available (last error: {last_error})")
+            tried.append(primary)
+
+            tasks = {asyncio.create_task(self._attempt(primary, prompt, temperature, model_kwargs)): primary}
+            try:
+                done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary) if self.hedge_enabled else None)
+                if not done:
+                    secondary = self._hedge_backend(primary)
+                    if secondary is not None:
+                        tried.append(secondary)
+                        with self._lock:
+                            self.hedges += 1
+                        tasks[asyncio.create_task(self._attempt(secondary, prompt, temperature, model_kwargs))] = secondary
+
+                pending = set(tasks)
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None:
+                            if tasks[task] is not primary:
+                                with self._lock:
+                                    self.hedge_wins += 1
+                            return task.result()
+                        last_error = task.exception()
+                        if not is_backend_failure(last_error):
+                            raise last_error
+                        logger.warning(f"LLM backend '{tasks[task].name}' failed: {last_error}")
+            finally:
+                for task in tasks:
+                    if not task.done():
+                        task.cancel()
+
+            with self._lock:
+                self.failovers += 1
+
+    def complete(self, prompt: Any, temperature: float = 0.3, model_kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Blocking variant of 'acomplete' - failover & circuit breaking, but no hedging
+        """
+        model_kwargs = model_kwargs or {}
+        tried: List[Backend] = []
+        last_error: Optional[BaseException] = None
+        while True:
+            backend = self._next_backend(exclude=tried)
+            if backend is None:
+                break
+            tried.append(backend)
+            start = time.monotonic()
+            try:
+                content = self._content(self.http.client.post(**self._request(backend, prompt, temperature, model_kwargs)))
+            except Exception as e:
+                if not is_backend_failure(e):
+                    backend.record_rejected()
+                    raise
+                backend.record_failure()
+                last_error = e
+                logger.warning(f"LLM backend '{backend.name}' failed: {e}")
+                continue
+            backend.record_success(time.monotonic() - start)
+            return content
+        raise BackendError(f"No LLM backend available (last error: {last_error})")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Hedge/failover counters & per-backend state and latency quantiles
+        """
+        with self._lock:
+            counters = {"calls": self.calls, "hedges": self.hedges, "hedge_wins": self.hedge_wins, "failovers": self.failovers}
+        counters["hedge_rate"] = (counters["hedges"] / counters["calls"]) if counters["calls"] else 0.0
+        return {**counters, "backends": [b.stats() for b in self.backends]}
+
+
+class RoutedChatModel:
+    """
+    Minimal chat model facade over LLMRouter, covering what the analyzers use:
+    'invoke' / 'ainvoke' return an AIMessage, 'stream' / 'astream' yield the whole completion as one chunk
+    (hedged requests aren't streamed - the winner is only known once it answers)
+    """
+
+    def __init__(self, router: LLMRouter, temperature: float = 0.3, model_kwargs: Optional[Dict[str, Any]] = None):
+        self.router = router
+        self.temperature = temperature
+        self.model_kwargs = model_kwargs or {}
+
+    def invoke(self, prompt: Any, *args, **kwargs) -> "AIMessage":
+        from langchain_core.messages import AIMessage
+
+        return AIMessage(content=self.router.complete(prompt, self.temperature, self.model_kwargs))
+
+    async def ainvoke(self, prompt: Any, *args, **kwargs) -> "AIMessage":
+        from langchain_core.messages import AIMessage
+
+        return AIMessage(content=await self.router.acomplete(prompt, self.temperature, self.model_kwargs))
+
+    def stream(self, prompt: Any, *args, **kwargs) -> Iterator["AIMessageChunk"]:
+        from langchain_core.messages import AIMessageChunk
+
+        yield AIMessageChunk(content=self.router.complete(prompt, self.temperature, self.model_kwargs))
+
+    async def astream(self, prompt: Any, *args, **kwargs) -> AsyncIterator["AIMessageChunk"]:
+        from langchain_core.messages import AIMessageChunk
+
+        yield AIMessageChunk(content=await self.router.acomplete(prompt, self.temperature, self.model_kwargs))
@@ -0,0 +1,319 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from configs.app_config import AppConfig
+from logs.logging_config import logger
+
+# Seconds - spans sub-millisecond node steps up to multi-minute map-reduce runs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# (labels, value) pairs of one metric family, as handed to the exposition format
+Sample = Tuple[Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """
+    Base of the in-house Prometheus metric types - one family, with a child per label combination
+    """
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, eg - errors or items fetched
+    """
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in values]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values (latencies, in seconds) over fixed, cumulative buckets
+    """
+    type_name = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # per label key: [bucket counts..., sum, count]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """
+        Observes how long the block took, whether or not it raised
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> float:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[-1] if state else 0.0
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            values = sorted((key, list(state)) for key, state in self._values.items())
+        samples = []
+        for key, state in values:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, state[-2]))
+            samples.append((f"{self.name}_count", labels, state[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Process-wide set of metrics, rendered in the Prometheus text exposition format (0.0.4)
+
+    Besides the counters & histograms updated as work happens, collectors can be registered to report
+    gauges computed at scrape time (eg - rate governor budgets) as (name, documentation, samples) tuples.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, List[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Iterable[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def histogram(self,
+                  name: str,
+                  documentation: str,
+                  labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, List[Sample]]]]):
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Returns:
+            str: Every metric in the Prometheus text format, ready to serve from /metrics
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+            collectors = list(self._collectors)
+
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, documentation, samples in families:
+                lines.append(f"# HELP {name} {_escape_help(documentation)}")
+                lines.append(f"# TYPE {name} gauge")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Tracing:
+    """
+    Optional OpenTelemetry trace spans, off unless OTEL_TRACES_ENABLED is on & 'opentelemetry-api' is installed
+
+    Spans go to whatever tracer provider is configured process-wide - eg - run the app under
+    'opentelemetry-instrument' with the OTLP exporter installed & OTEL_EXPORTER_OTLP_ENDPOINT set.
+    """
+    _tracer: Any = None
+    _resolved = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def tracer(cls) -> Any:
+        if cls._resolved:
+            return cls._tracer
+        with cls._lock:
+            if not cls._resolved:
+                if AppConfig.get_config_instance().get_bool("OTEL_TRACES_ENABLED", False):
+                    try:
+                        from opentelemetry import trace
+
+                        cls._tracer = trace.get_tracer("beyond_chats.persona")
+                        logger.info("OpenTelemetry trace spans enabled")
+                    except ImportError:
+                        logger.warning("OTEL_TRACES_ENABLED is on but opentelemetry-api isn't installed, spans are off")
+                cls._resolved = True
+        return cls._tracer
+
+
+# Spans finished while a 'collect_spans' block is active - per request, as the profiling middleware uses it
+_span_log: ContextVar[Optional[List[Dict[str, Any]]]] = ContextVar("span_log", default=None)
+
+
+@contextmanager
+def collect_spans() -> Iterator[List[Dict[str, Any]]]:
+    """
+    Records every span finished inside the block (& in tasks it starts) as {"name", "start", "seconds"},
+    'start' being a time.perf_counter() reading
+
+    Yields:
+        List[Dict[str, Any]]: The span log, filled in as spans finish
+    """
+    log: List[Dict[str, Any]] = []
+    token = _span_log.set(log)
+    try:
+        yield log
+    finally:
+        _span_log.reset(token)
+
+
+@contextmanager
+def span(name: str, attach: bool = True, **attributes) -> Iterator[Optional[Any]]:
+    """
+    Wraps a block in an OpenTelemetry span when tracing is enabled (a no-op otherwise),
+    & times it into the active 'collect_spans' log, if any
+
+    Exceptions are recorded on the span & re-raised.
+
+    Args:
+        name (str): Span name, eg - "persona.node.scraper" or "llm.ainvoke"
+        attach (bool): Make it the current span, so spans started inside become its children.
+                       Generators that yield inside the block should pass False, as the context can't be
+                       detached from another task
+        **attributes: Span attributes (None values are skipped)
+
+    Yields:
+        Optional[Any]: The span, or None when tracing is off
+    """
+    log = _span_log.get()
+    if log is None:
+        with _otel_span(name, attach, attributes) as current:
+            yield current
+        return
+
+    start = time.perf_counter()
+    try:
+        with _otel_span(name, attach, attributes) as current:
+            yield current
+    finally:
+        log.append({"name": name, "start": start, "seconds": time.perf_counter() - start})
+
+
+@contextmanager
+def _otel_span(name: str, attach: bool, attributes: Dict[str, Any]) -> Iterator[Optional[Any]]:
+    tracer = Tracing.tracer()
+    if tracer is None:
+        yield None
+        return
+
+    attributes = {key: value for key, value in attributes.items() if value is not None}
+    if attach:
+        with tracer.start_as_current_span(name, attributes=attributes) as current:
+            yield current
+        return
+
+    current = tracer.start_span(name, attributes=attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        current.end()
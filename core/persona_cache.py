@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from configs.app_config import AppConfig
+from logs.logging_config import logger
+
+# Disk entries are named after their sha256 key - other files in the directory (eg - the LLM cache) are left alone
+_ENTRY_NAME = re.compile(r"^[0-9a-f]{64}\.json$")
+
+
+class PersonaCache:
+    """
+    Two-tier cache of generated personas, so unchanged profiles skip the LLM call
+
+    Entries are keyed by username + a fingerprint of the scraped posts/comments, so a user
+    who posted something new always misses. Hot entries live in a bounded in-memory LRU,
+    & every entry is also written to a JSON file on disk, which survives restarts & is
+    promoted back into memory on a hit. Every write also prunes the disk tier: expired entries are
+    deleted, & past its cap the oldest ones are too.
+
+    Configuration values are retrieved from AppConfig:
+        > PERSONA_CACHE_ENABLED (default: true)
+        > PERSONA_CACHE_MAX_ENTRIES (default: 256) - in-memory LRU size
+        > PERSONA_CACHE_TTL_SECONDS (default: 86400) - 0 disables expiry
+        > PERSONA_CACHE_DIR (default: outputs/.cache)
+        > PERSONA_CACHE_DISK_MAX_ENTRIES (default: 10000) - disk tier size, 0 for no cap
+
+    Attributes:
+        hits (int): Lookups served from memory or disk
+        misses (int): Lookups that required an LLM call
+    """
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl_seconds: int = 86400,
+                 cache_dir: Optional[str] = "outputs/.cache",
+                 max_disk_entries: int = 10000):
+        """
+        Args:
+            max_entries (int): Maximum number of personas held in memory
+            ttl_seconds (int): Entry lifetime in seconds (0 = never expire)
+            cache_dir (Optional[str]): Directory for the disk tier, None for memory only
+            max_disk_entries (int): Maximum number of personas kept on disk (0 = no cap)
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls) -> Optional["PersonaCache"]:
+        """
+        Builds the cache from AppConfig
+
+        Returns:
+            Optional[PersonaCache]: The cache, or None if PERSONA_CACHE_ENABLED is off
+        """
+        config = AppConfig.get_config_instance()
+        if not config.get_bool("PERSONA_CACHE_ENABLED", True):
+            logger.info("Persona cache disabled")
+            return None
+        return cls(
+            max_entries=config.get_int("PERSONA_CACHE_MAX_ENTRIES", 256),
+            ttl_seconds=config.get_int("PERSONA_CACHE_TTL_SECONDS", 86400),
+            cache_dir=config.get("PERSONA_CACHE_DIR", "outputs/.cache"),
+            max_disk_entries=config.get_int("PERSONA_CACHE_DISK_MAX_ENTRIES", 10000),
+        )
+
+    @staticmethod
+    def fingerprint(username: str, posts: List[str], comments: List[str]) -> str:
+        """
+        Hashes the username & scraped content into the cache key
+
+        Args:
+            username (str): Reddit handle
+            posts (List[str]): Scraped posts
+            comments (List[str]): Scraped comments
+
+        Returns:
+            str: Hex sha256 digest
+        """
+        digest = hashlib.sha256(username.lower().encode("utf-8"))
+        for section in (posts, comments):
+            digest.update(b"\x1e")
+            for text in section:
+                digest.update(text.encode("utf-8"))
+                digest.update(b"\x1f")
+        return digest.hexdigest()
+
+    def _is_fresh(self, created_at: float) -> bool:
+        return self.ttl_seconds <= 0 or (time.time() - created_at) < self.ttl_seconds
+
+    def _disk_path(self, key: str) -> Optional[Path]:
+        return self.cache_dir / f"{key}.json" if self.cache_dir else None
+
+    def _remember(self, key: str, created_at: float, persona: str):
+        self._memory[key] = (created_at, persona)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune_disk(self) -> int:
+        """
+        Deletes expired disk entries, then the oldest ones beyond 'max_disk_entries'
+
+        Entries are aged by their file's modification time, ie - when they were written.
+        One directory scan per write - cheap next to the LLM call that produced the persona.
+
+        Returns:
+            int: Number of entries deleted
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if not _ENTRY_NAME.match(entry.name):
+                    continue
+                try:
+                    written_at = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue  # pruned by another worker
+                if not self._is_fresh(written_at):
+                    Path(entry.path).unlink(missing_ok=True)
+                    removed += 1
+                else:
+                    entries.append((written_at, entry.path))
+
+        if self.max_disk_entries > 0 and len(entries) > self.max_disk_entries:
+            entries.sort()
+            for _, path in entries[:len(entries) - self.max_disk_entries]:
+                Path(path).unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def get(self, username: str, posts: List[str], comments: List[str]) -> Optional[str]:
+        """
+        Looks up a persona for this exact user content
+
+        Returns:
+            Optional[str]: The cached persona text, or None on a miss / expired entry
+        """
+        key = self.fingerprint(username, posts, comments)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and self._is_fresh(entry[0]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+        path = self._disk_path(key)
+        if path and path.exists():
+            try:
+                record = json.loads(path.read_text(encoding="utf-8"))
+                if self._is_fresh(record["created_at"]):
+                    with self._lock:
+                        self._remember(key, record["created_at"], record["persona"])
+                        self.hits += 1
+                        self.disk_hits += 1
+                    return record["persona"]
+                path.unlink(missing_ok=True)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable persona cache entry {path}: {e}")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, username: str, posts: List[str], comments: List[str], persona: str):
+        """
+        Stores a freshly generated persona in both tiers
+        """
+        key = self.fingerprint(username, posts, comments)
+        created_at = time.time()
+
+        with self._lock:
+            self._remember(key, created_at, persona)
+
+        path = self._disk_path(key)
+        if path:
+            try:
+                record = {"username": username, "created_at": created_at, "persona": persona}
+                path.write_text(json.dumps(record), encoding="utf-8")
+            except Exception as e:
+                logger.warning(f"Couldn't write persona cache entry for {username}: {e}")
+            try:
+                self._prune_disk()
+            except Exception as e:
+                logger.warning(f"Couldn't prune persona cache directory {self.cache_dir}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Hit/miss counters, hit rate & current in-memory size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "max_disk_entries": self.max_disk_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
@@ -0,0 +1,231 @@
+import re
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from configs.app_config import AppConfig
+from document_processing.persona_parser import PersonaParser
+from logs.logging_config import logger
+from models.persona_model import PersonaAttribute, UserPersona
+
+_TERM = re.compile(r"\w+")
+
+
+class PersonaStore:
+    """
+    Local, SQLite-backed store of generated personas as structured records
+
+    Every persona is kept as its card text plus one row per attribute value (label, value, citation),
+    with an FTS5 index over values & citations, so questions like "which users mention working in fintech"
+    are answered by an index lookup instead of grepping 'outputs/'.
+
+    Configuration values are retrieved from AppConfig:
+        > PERSONA_STORE_ENABLED (default: true)
+        > PERSONA_STORE_PATH (default: outputs/personas.db)
+    """
+
+    def __init__(self, db_path: str = "outputs/personas.db"):
+        """
+        Args:
+            db_path (str): SQLite database file, created if missing
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_schema()
+
+    @classmethod
+    def from_config(cls) -> Optional["PersonaStore"]:
+        """
+        Returns:
+            Optional[PersonaStore]: The store, or None if PERSONA_STORE_ENABLED is off
+        """
+        config = AppConfig.get_config_instance()
+        if not config.get_bool("PERSONA_STORE_ENABLED", True):
+            return None
+        return cls(db_path=config.get("PERSONA_STORE_PATH", "outputs/personas.db"))
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a short-lived connection - the store is written by workflow runs & read by the API
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS personas (
+                    username TEXT PRIMARY KEY,
+                    persona_text TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS attributes (
+                    id INTEGER PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    label TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    citation TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_attributes_username ON attributes (username);
+                CREATE VIRTUAL TABLE IF NOT EXISTS attributes_fts USING fts5 (
+                    value, citation, content='attributes', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                );
+                CREATE TRIGGER IF NOT EXISTS attributes_ai AFTER INSERT ON attributes BEGIN
+                    INSERT INTO attributes_fts (rowid, value, citation) VALUES (new.id, new.value, new.citation);
+                END;
+                CREATE TRIGGER IF NOT EXISTS attributes_ad AFTER DELETE ON attributes BEGIN
+                    INSERT INTO attributes_fts (attributes_fts, rowid, value, citation)
+                    VALUES ('delete', old.id, old.value, old.citation);
+                END;
+                """
+            )
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, persona: UserPersona, persona_text: str):
+        username = persona.username.lower()
+        conn.execute("DELETE FROM attributes WHERE username = ?", (username,))
+        conn.execute(
+            "INSERT OR REPLACE INTO personas (username, persona_text, updated_at) VALUES (?, ?, ?)",
+            (username, persona_text, time.time()),
+        )
+        conn.executemany(
+            "INSERT INTO attributes (username, label, value, citation) VALUES (?, ?, ?, ?)",
+            [(username, a.label, a.value, a.citation) for a in persona.attributes],
+        )
+
+    def save(self, username: str, persona_text: str) -> UserPersona:
+        """
+        Parses a persona card & replaces whatever was stored for the user
+
+        Args:
+            username (str): Reddit handle
+            persona_text (str): Persona card produced by the LLM
+
+        Returns:
+            UserPersona: The parsed persona
+        """
+        persona = PersonaParser.parse(username, persona_text)
+        with closing(self._connect()) as conn, conn:
+            self._write(conn, persona, persona_text)
+        logger.info(f"Stored {len(persona.attributes)} persona attributes for {username}")
+        return persona
+
+    def save_many(self, personas: Iterable[Tuple[UserPersona, str]]) -> int:
+        """
+        Bulk variant of 'save' for already parsed personas, in a single transaction
+
+        Args:
+            personas (Iterable[Tuple[UserPersona, str]]): (persona, card text) pairs
+
+        Returns:
+            int: Number of personas written
+        """
+        count = 0
+        with closing(self._connect()) as conn, conn:
+            for persona, persona_text in personas:
+                self._write(conn, persona, persona_text)
+                count += 1
+        return count
+
+    def get(self, username: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Optional[Dict[str, Any]]: {"persona": UserPersona, "persona_text", "updated_at"}, or None if not stored
+        """
+        username = username.lower()
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT persona_text, updated_at FROM personas WHERE username = ?", (username,)
+            ).fetchone()
+            if row is None:
+                return None
+            attributes = conn.execute(
+                "SELECT label, value, citation FROM attributes WHERE username = ? ORDER BY id", (username,)
+            ).fetchall()
+        return {
+            "persona": UserPersona(
+                username=username,
+                attributes=[PersonaAttribute(label=a["label"], value=a["value"], citation=a["citation"]) for a in attributes],
+            ),
+            "persona_text": row["persona_text"],
+            "updated_at": row["updated_at"],
+        }
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        """
+        Turns free text into an FTS5 expression matching every word in values or citations,
+        so user input never hits FTS5 query syntax
+        """
+        terms = _TERM.findall(query)
+        if not terms:
+            return None
+        return "{value citation} : (" + " ".join(f'"{term}"' for term in terms) + ")"
+
+    def search(self, query: str, label: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Full-text search over stored attribute values & citations, most recently stored first
+
+        Matches are read straight off the FTS index in rowid order & the scan stops after 'limit' rows,
+        so even a term matching a large share of the store stays cheap - which is also why results
+        aren't ranked by relevance (that would score every match).
+
+        Args:
+            query (str): Free text, eg - "fintech" - every word must appear
+            label (Optional[str]): Only search one attribute, eg - "Occupation"
+            limit (int): Max results
+
+        Returns:
+            List[Dict[str, Any]]: {"username", "label", "value", "citation"} per matching attribute
+        """
+        expression = self._match_expression(query)
+        if expression is None:
+            return []
+
+        sql = (
+            "SELECT a.username, a.label, a.value, a.citation "
+            "FROM attributes_fts JOIN attributes a ON a.id = attributes_fts.rowid "
+            "WHERE attributes_fts MATCH ?"
+        )
+        params: List[Any] = [expression]
+        if label:
+            sql += " AND a.label = ? COLLATE NOCASE"
+            params.append(label)
+        sql += " ORDER BY attributes_fts.rowid DESC LIMIT ?"
+        params.append(limit)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM personas").fetchone()[0]
+
+    def import_text_files(self, output_dir: str = "outputs") -> int:
+        """
+        Backfills the store from the '<user>_persona.txt' files written by PersonaWriter
+
+        Returns:
+            int: Number of personas imported
+        """
+        paths = sorted(Path(output_dir).glob("*_persona.txt"))
+        imported = self.save_many(
+            (PersonaParser.parse(path.name[:-len("_persona.txt")], text), text)
+            for path in paths
+            for text in (path.read_text(encoding="utf-8"),)
+        )
+        logger.info(f"Imported {imported} personas from {output_dir} into {self.db_path}")
+        return imported
+
+
+if __name__ == "__main__":
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "outputs"
+    store = PersonaStore.from_config() or PersonaStore()
+    store.import_text_files(output_dir)
@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+# Frames from these files are the sampler itself, not the profiled work
+_OWN_FILES = (os.path.normcase(__file__),)
+
+
+class StackSampler:
+    """
+    Minimal wall-clock sampling profiler: a background thread snapshots every thread's Python stack
+    every 'interval' seconds & counts identical stacks
+
+    Stacks are exported in the collapsed format ('root;caller;callee count' per line), which
+    flamegraph.pl, speedscope & most flamegraph viewers read directly. Each stack starts with its
+    thread name, so event-loop work, Reddit scraper threads & idle waits show up as separate towers.
+
+    Sampling is wall-clock, not CPU: a thread blocked on I/O keeps being counted where it waits,
+    which is what explains a slow request. On the event loop thread, samples cover whatever coroutine
+    was running - including other requests served concurrently.
+    """
+
+    def __init__(self, interval: float = 0.005, max_depth: int = 128):
+        """
+        Args:
+            interval (float): Seconds between samples
+            max_depth (int): Frames kept per stack (innermost ones are kept)
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._labels: Dict[object, str] = {}
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename.replace("\\", "/").split("/")
+            label = self._labels[code] = f"{code.co_name} ({'/'.join(path[-2:])}:{code.co_firstlineno})"
+        return label
+
+    def _collapse(self, frame) -> Optional[str]:
+        labels = []
+        while frame is not None and len(labels) < self.max_depth:
+            code = frame.f_code
+            if os.path.normcase(code.co_filename) in _OWN_FILES:
+                return None
+            labels.append(self._label(code))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+    def _sample(self):
+        own = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            stack = self._collapse(frame)
+            if stack is not None:
+                self.stacks[f"{names.get(ident, ident)};{stack}"] += 1
+        self.samples += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> "StackSampler":
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.started_at is not None:
+            self.elapsed = time.perf_counter() - self.started_at
+        return self
+
+    def collapsed(self) -> str:
+        """
+        Returns:
+            str: The samples in the collapsed-stack format, heaviest stacks first
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def __enter__(self) -> "StackSampler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
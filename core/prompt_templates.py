@@ -1,3 +1,8 @@
+import json
+from typing import Any, Dict, List, Tuple
+
+from configs.app_config import AppConfig
+from core.token_budget import EvidencePacker, PackedEvidence, TokenCounter, context_window
 from logs.logging_config import logger
 from workflows.graphs.persona.prompts import persona_prompt
 
@@ -7,30 +12,170 @@ class PromptBuilder:
 
     It combines user posts and comments into a single prompt with a consistent 
     format, guiding the LLM to output structured persona information
+
+    Posts & comments are packed whole into a token budget, read from AppConfig:
+        > LLM_MAX_COMPLETION_TOKENS (default: 2048) - tokens reserved for the answer
+        > PROMPT_TOKEN_BUDGET (default: the context window of GROQ_MODEL_NAME minus the completion tokens) -
+          a lower cap, eg - to keep requests under a free tier's tokens-per-minute limit
+    The effective budget never exceeds the context window of GROQ_MODEL_NAME
+
+    For the map-reduce mode it also splits large histories into chunks (MAP_REDUCE_CHUNK_TOKENS, default: 3000)
+    & builds the partial-extraction & merge prompts from workflows/graphs/persona/prompts/persona_prompt.py
     """
 
     def __init__(self):
         """
         Initializes the PromptBuilder and logs its creation
         """
-        logger.info("PersonaPromptBuilder initialized")
+        config = AppConfig.get_config_instance()
+        window = context_window(config.GROQ_MODEL_NAME)
+        completion_tokens = config.get_int("LLM_MAX_COMPLETION_TOKENS", 2048)
+        available = max(1, window - completion_tokens)
+        self.prompt_token_budget = min(config.get_int("PROMPT_TOKEN_BUDGET", available), available)
+        self.packer = EvidencePacker()
+        self._instruction_tokens = TokenCounter.count(self._render("", ""))
+        self.chunk_token_budget = min(config.get_int("MAP_REDUCE_CHUNK_TOKENS", 3000), self.prompt_token_budget)
+        self.max_evidence_per_attribute = config.get_int("MAP_REDUCE_MAX_EVIDENCE", 8)
+        logger.info(f"PersonaPromptBuilder initialized with a {self.prompt_token_budget} token prompt budget")
 
     def get_persona_prompt(self, username: str, posts: list[str], comments: list[str]) -> str:
         """
-        Clean a single post or comment by stripping URLs and truncating.
+        Builds the persona prompt for a user from their posts & comments
 
         Args:
-            text (str): Raw Reddit post or comment.
-            max_len (int): Maximum length for individual text entries.
+            username (str): Reddit handle
+            posts (list[str]): Fetched Reddit posts
+            comments (list[str]): Fetched Reddit comments
+
+        Returns:
+            str: The prompt, with as many whole posts/comments as the token budget allows
+        """
+        return self.build_persona_prompt(username, posts, comments)[0]
+
+    def build_persona_prompt(self, username: str, posts: list[str], comments: list[str]) -> Tuple[str, PackedEvidence]:
+        """
+        Same as 'get_persona_prompt', but also returns how the evidence was packed
 
         Returns:
-            str: Cleaned and truncated text.
+            Tuple[str, PackedEvidence]: The prompt & its token accounting
         """
         try:
-            # Truncates combined text to avoid token explosins that free tier can't handle
-            joined_text = "\n".join(posts + comments)[:2000]
+            packed = self.packer.pack(posts, comments, budget=self._evidence_budget(username))
+            logger.info(
+                f"Packed {packed.kept_items} posts/comments ({packed.used_tokens} tokens) into the prompt for {username}, "
+                f"dropped {packed.dropped_items} ({packed.dropped_tokens} tokens)"
+            )
+            return self._render(username, packed.text), packed
+
+        except Exception as e:
+            logger.error(f"Failed to analyze user {username}: {e}")
+            raise
 
-            prompt = f"""
+    def _evidence_budget(self, username: str) -> int:
+        """
+        Tokens left for posts & comments once the instructions (& the username in them) are accounted for
+        """
+        return max(0, self.prompt_token_budget - self._instruction_tokens - TokenCounter.count(username))
+
+    def fits_persona_prompt(self, username: str, posts: list[str], comments: list[str]) -> bool:
+        """
+        Whether the persona prompt would hold every post & comment - counts tokens without building the prompt
+
+        Returns:
+            bool: False when 'build_persona_prompt' would have to drop items
+        """
+        return self.packer.fits(posts, comments, self._evidence_budget(username))
+
+    def chunk_evidence(self, posts: list[str], comments: list[str]) -> List[PackedEvidence]:
+        """
+        Splits a user's whole history into chunks for the map step of the map-reduce mode
+
+        Returns:
+            List[PackedEvidence]: Chunks of whole posts/comments, each within the chunk token budget
+        """
+        instruction_tokens = TokenCounter.count(persona_prompt.PARTIAL_PERSONA_PROMPT)
+        budget = max(1, self.chunk_token_budget - instruction_tokens)
+        return self.packer.chunk(posts, comments, chunk_budget=budget)
+
+    def get_partial_persona_prompt(self, username: str, chunk: PackedEvidence, part: int, parts: int) -> str:
+        """
+        Builds the map-step prompt, asking for cited evidence from one chunk as JSON
+
+        Args:
+            username (str): Reddit handle
+            chunk (PackedEvidence): One chunk from 'chunk_evidence'
+            part (int): 1-based index of the chunk
+            parts (int): Total number of chunks
+        """
+        return persona_prompt.PARTIAL_PERSONA_PROMPT.format(
+            username=username,
+            attributes=", ".join(persona_prompt.PERSONA_ATTRIBUTES),
+            part=part,
+            parts=parts,
+            content=chunk.text,
+        )
+
+    def get_reduce_persona_prompt(self, username: str, evidence: Dict[str, List[Dict[str, str]]], parts: int) -> str:
+        """
+        Builds the reduce-step prompt that merges the evidence of every chunk into the final persona
+
+        Args:
+            username (str): Reddit handle
+            evidence (Dict[str, List[Dict[str, str]]]): Merged {attribute: [{"value", "citation"}]} from the map step
+            parts (int): Number of chunks the evidence came from
+        """
+        lines = []
+        for attribute in persona_prompt.PERSONA_ATTRIBUTES:
+            # Identical findings from several chunks collapse into one line with a support count
+            support: Dict[Tuple[str, str], int] = {}
+            for finding in evidence.get(attribute) or []:
+                key = (finding.get("value", ""), finding.get("citation", ""))
+                support[key] = support.get(key, 0) + 1
+            if not support:
+                continue
+            lines.append(f"{attribute}:")
+            ranked = sorted(support.items(), key=lambda entry: entry[1], reverse=True)
+            for (value, citation), count in ranked[:self.max_evidence_per_attribute]:
+                lines.append(f'- {value} (seen in {count} part(s); Cited from: "{citation}")')
+        return persona_prompt.REDUCE_PERSONA_PROMPT.format(username=username, parts=parts, evidence="\n".join(lines))
+
+    @staticmethod
+    def parse_partial_persona(reply: str) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Parses a map-step reply into {attribute: [{"value", "citation"}]}
+
+        Tolerates prose or code fences around the JSON object & drops malformed findings.
+        Findings repeated across chunks are left in, the reduce step weighs them.
+
+        Returns:
+            Dict[str, List[Dict[str, str]]]: The findings, empty if the reply holds no JSON object
+        """
+        start, end = reply.find("{"), reply.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            raw: Dict[str, Any] = json.loads(reply[start:end + 1])
+        except json.JSONDecodeError:
+            logger.warning("Couldn't parse partial persona JSON, skipping chunk")
+            return {}
+
+        findings = {}
+        for attribute in persona_prompt.PERSONA_ATTRIBUTES:
+            values = raw.get(attribute) or []
+            if isinstance(values, dict):
+                values = [values]
+            findings[attribute] = [
+                {"value": str(v.get("value", "")).strip(), "citation": str(v.get("citation", "")).strip()}
+                for v in values
+                if isinstance(v, dict) and v.get("value")
+            ]
+        return findings
+
+    def _render(self, username: str, joined_text: str) -> str:
+        """
+        Fills the persona prompt template with the packed posts/comments
+        """
+        prompt = f"""
                 From the following Reddit posts/comments, extract a detailed user persona.
                 Based on the following Reddit posts and comments from user `{username}`, create a detailed user persona. 
                 Include: Name, Occupation, Location, Traits, Behaviours, Motivations, Frustrations, and Goals.
@@ -42,6 +187,7 @@ class PromptBuilder:
                 - Write the value in plain language.
                 - Under each value, include: `Cited from: "<exact post or comment excerpt>"`.
                 - For multi-value fields (like Traits, Behaviors, etc.), format as bullet points with their citations below them.
+                - A post or comment ending in "(posted N×)" was posted N times - weigh it accordingly, but don't quote that marker.
                 - Remove those annoying astersiks from the output.
 
                 Use this structure:
@@ -82,8 +228,4 @@ class PromptBuilder:
                 
                 """.strip()
 
-            return prompt
-
-        except Exception as e:
-            logger.error(f"Failed to analyze user {username}: {e}")
-            raise
+        return prompt
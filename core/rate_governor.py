@@ -0,0 +1,444 @@
+import asyncio
+import random
+import re
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+from configs.app_config import AppConfig
+from logs.logging_config import logger
+
+T = TypeVar("T")
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Budget & reset headers, Reddit's first, then Groq's (OpenAI-style) request limits
+_REMAINING_HEADERS = ("x-ratelimit-remaining", "x-ratelimit-remaining-requests")
+_RESET_HEADERS = ("x-ratelimit-reset", "x-ratelimit-reset-requests")
+
+# Default quotas: Reddit's OAuth limit is 100 requests/minute, Groq's free tier 30 requests/minute
+_DEFAULT_LIMITS = {"reddit": (100, 10), "groq": (30, 5)}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a rate-limit reset header - plain seconds ("312", "7.5") or Groq durations ("2m59.56s", "120ms")
+
+    Returns:
+        Optional[float]: Seconds, or None if the value can't be parsed
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SECONDS[unit] for amount, unit in parts)
+
+
+def _header(headers: Mapping[str, str], names: Tuple[str, ...]) -> Optional[str]:
+    lowered = {k.lower(): v for k, v in headers.items()}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    """
+    Digs the HTTP status out of client exceptions (groq, httpx, prawcore, LLMRouter's BackendError)
+    """
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return status_code_of(error) == 429 or type(error).__name__ in ("TooManyRequests", "RateLimitError")
+
+
+# Client errors that mean the request never got a (complete) answer - groq, httpx & builtin names
+_TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"}
+
+
+def is_transient(error: BaseException) -> bool:
+    """
+    Timeouts, dropped connections & 5xx responses - failures worth retrying as-is, unlike other 4xx
+    """
+    status = status_code_of(error)
+    if status is not None:
+        return status >= 500 or status == 408
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+def retry_after_of(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    return parse_duration(_header(headers, ("retry-after",)))
+
+
+class TokenBucket:
+    """
+    Token bucket shared by every coroutine & thread of the process
+
+    Callers reserve a token & get back how long to wait for it - the balance may go negative, which
+    queues later callers behind earlier ones in arrival order instead of failing them.
+    Rate-limit response headers tighten the budget to what the upstream reports as remaining,
+    & an exhausted budget or a 429 pauses the bucket until the reported reset.
+    """
+    # Whether state updates do blocking I/O - if so, coroutines run them in a worker thread
+    blocking = False
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int):
+        """
+        Args:
+            name (str): Bucket name (eg - 'reddit', 'groq')
+            rate_per_minute (float): Sustained rate
+            burst (int): Capacity, i.e. how many requests may go out back to back
+        """
+        self.name = name
+        self.rate = max(rate_per_minute, 0.001) / 60.0
+        self.capacity = max(1, burst)
+        self._lock = Lock()
+        self._state = (float(self.capacity), time.time(), 0.0)  # tokens, updated_at, blocked_until
+
+        self.acquired = 0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    def _transact(self, update: Callable[[Tuple[float, float, float], float], Tuple[Tuple[float, float, float], T]]) -> T:
+        """
+        Applies 'update' to the bucket state atomically - overridden for the cross-process bucket
+        """
+        with self._lock:
+            self._state, result = update(self._state, time.time())
+        return result
+
+    def _refill(self, tokens: float, updated_at: float, now: float) -> float:
+        return min(self.capacity, tokens + max(0.0, now - updated_at) * self.rate)
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        Takes 'tokens' from the bucket
+
+        Returns:
+            float: Seconds the caller has to wait before sending its request
+        """
+        def update(state, now):
+            balance, updated_at, blocked_until = state
+            balance = self._refill(balance, updated_at, now) - tokens
+            wait = max(blocked_until - now, -balance / self.rate if balance < 0 else 0.0)
+            return (balance, now, blocked_until), wait
+
+        return self._transact(update)
+
+    def _record_wait(self, wait: float):
+        with self._lock:
+            self.acquired += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Blocking acquire - sleeps until the reserved tokens are due
+
+        Returns:
+            float: Seconds waited
+        """
+        wait = self.reserve(tokens)
+        self._record_wait(wait)
+        if wait > 0:
+            with self._lock:
+                self.waiting += 1
+            try:
+                time.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return wait
+
+    async def run_async(self, func: Callable[..., T], *args) -> T:
+        """
+        Calls one of the bucket's methods from a coroutine, off the event loop when the bucket does blocking I/O
+        """
+        if self.blocking:
+            return await asyncio.to_thread(func, *args)
+        return func(*args)
+
+    async def acquire_async(self, tokens: int = 1) -> float:
+        """
+        Non-blocking variant of 'acquire' for coroutines
+
+        Returns:
+            float: Seconds waited
+        """
+        wait = await self.run_async(self.reserve, tokens)
+        self._record_wait(wait)
+        if wait > 0:
+            with self._lock:
+                self.waiting += 1
+            try:
+                await asyncio.sleep(wait)
+            finally:
+                with self._lock:
+                    self.waiting -= 1
+        return wait
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Aligns the budget with the upstream's rate-limit headers, pausing until the reset once it's exhausted
+        """
+        remaining = _header(headers, _REMAINING_HEADERS)
+        reset = parse_duration(_header(headers, _RESET_HEADERS))
+        if remaining is None:
+            return
+        try:
+            remaining_value = float(remaining)
+        except ValueError:
+            return
+
+        def update(state, now):
+            balance, updated_at, blocked_until = state
+            balance = min(self._refill(balance, updated_at, now), remaining_value)
+            if remaining_value < 1 and reset:
+                blocked_until = max(blocked_until, now + reset)
+            return (balance, now, blocked_until), None
+
+        self._transact(update)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """
+        Records a 429 - the bucket is emptied & paused for 'retry_after' seconds (one refill interval if unknown)
+        """
+        pause = retry_after if retry_after is not None else 1.0 / self.rate
+
+        def update(state, now):
+            _, _, blocked_until = state
+            return (0.0, now, max(blocked_until, now + pause)), None
+
+        self._transact(update)
+        with self._lock:
+            self.throttled += 1
+        logger.warning(f"Rate limited by {self.name}, pausing for {pause:.1f}s")
+
+    def budget(self) -> float:
+        """
+        Returns:
+            float: Tokens currently available (negative while callers are queued)
+        """
+        def update(state, now):
+            balance, updated_at, blocked_until = state
+            return state, self._refill(balance, updated_at, now)
+
+        return self._transact(update)
+
+    def stats(self) -> Dict[str, Any]:
+        budget = self.budget()
+        with self._lock:
+            return {
+                "rate_per_minute": self.rate * 60.0,
+                "burst": self.capacity,
+                "budget": budget,
+                "queued": self.waiting,
+                "acquired": self.acquired,
+                "avg_wait_seconds": (self.total_wait / self.acquired) if self.acquired else 0.0,
+                "max_wait_seconds": self.max_wait,
+                "throttled": self.throttled,
+                "retries": self.retries,
+            }
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose state lives in a SQLite file, so every worker process on the host draws from one budget
+
+    Each update runs in a BEGIN IMMEDIATE transaction, which serializes concurrent processes & may wait on
+    their locks, so coroutines go through 'run_async' & the transaction runs in a worker thread.
+    """
+    blocking = True
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int, db_path: str):
+        super().__init__(name, rate_per_minute, burst)
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets "
+                "(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, blocked_until REAL NOT NULL)"
+            )
+            conn.execute(
+                "INSERT OR IGNORE INTO buckets (name, tokens, updated_at, blocked_until) VALUES (?, ?, ?, 0)",
+                (name, float(self.capacity), time.time()),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+
+    def _transact(self, update):
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at, blocked_until FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                state, result = update(tuple(row), time.time())
+                conn.execute(
+                    "UPDATE buckets SET tokens = ?, updated_at = ?, blocked_until = ? WHERE name = ?",
+                    (*state, self.name),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+
+class RateGovernor:
+    """
+    Registry of the per-upstream token buckets & the shared retry policy for rate-limited (& optionally transient) calls
+
+    Buckets are drawn from at the transport level - the PRAW requestor (see GovernedRequestor in
+    core/reddit_scraper.py) & the shared LLM HTTP client hooks - so every HTTP request, retries included,
+    takes a token & reports the response's rate-limit headers back.
+
+    Configuration values are retrieved from AppConfig:
+        > REDDIT_RATE_PER_MINUTE (default: 100), REDDIT_RATE_BURST (default: 10)
+        > GROQ_RATE_PER_MINUTE (default: 30), GROQ_RATE_BURST (default: 5)
+        > RATE_GOVERNOR_PATH (default: unset) - SQLite file shared by worker processes; per-process buckets when unset
+        > RATE_RETRY_MAX (default: 4) - retries of a rate-limited or transient failure
+        > RATE_RETRY_BASE_SECONDS (default: 1), RATE_RETRY_CAP_SECONDS (default: 30) - full-jitter exponential backoff
+    """
+    _buckets: Dict[str, TokenBucket] = {}
+    _lock = Lock()
+
+    @classmethod
+    def get(cls, name: str) -> TokenBucket:
+        """
+        Returns the bucket of an upstream ('reddit', 'groq', ...), created from AppConfig on first use
+        """
+        bucket = cls._buckets.get(name)
+        if bucket is not None:
+            return bucket
+
+        with cls._lock:
+            if name not in cls._buckets:
+                config = AppConfig.get_config_instance()
+                default_rate, default_burst = _DEFAULT_LIMITS.get(name, (60, 5))
+                prefix = name.upper()
+                rate = config.get_float(f"{prefix}_RATE_PER_MINUTE", default_rate)
+                burst = config.get_int(f"{prefix}_RATE_BURST", default_burst)
+                path = config.get("RATE_GOVERNOR_PATH")
+                if path:
+                    cls._buckets[name] = SharedTokenBucket(name, rate, burst, path)
+                else:
+                    cls._buckets[name] = TokenBucket(name, rate, burst)
+                logger.info(f"Rate governor for {name}: {rate}/min, burst {burst}{' (shared)' if path else ''}")
+            return cls._buckets[name]
+
+    @staticmethod
+    def _retry_policy() -> Tuple[int, float, float]:
+        config = AppConfig.get_config_instance()
+        return (
+            config.get_int("RATE_RETRY_MAX", 4),
+            config.get_float("RATE_RETRY_BASE_SECONDS", 1.0),
+            config.get_float("RATE_RETRY_CAP_SECONDS", 30.0),
+        )
+
+    @staticmethod
+    def backoff(attempt: int, base: float, cap: float) -> float:
+        """
+        Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]
+        """
+        return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+    @classmethod
+    def _on_rate_limited(cls, bucket: TokenBucket, error: BaseException, attempt: int, base: float, cap: float) -> float:
+        retry_after = retry_after_of(error)
+        bucket.penalize(retry_after)
+        with bucket._lock:
+            bucket.retries += 1
+        return max(retry_after or 0.0, cls.backoff(attempt, base, cap))
+
+    @staticmethod
+    def _retryable(error: BaseException, transient: bool) -> Optional[str]:
+        """
+        Returns why 'error' is worth another attempt ('rate-limited' or 'failed'), or None if it isn't
+        """
+        if is_rate_limited(error):
+            return "rate-limited"
+        if transient and is_transient(error):
+            return "failed"
+        return None
+
+    @classmethod
+    def retry(cls, name: str, func: Callable[..., T], *args, transient: bool = False, **kwargs) -> T:
+        """
+        Runs a blocking call, retrying it with jittered backoff (or the upstream's Retry-After) while it's rate limited
+
+        With 'transient', timeouts, connection errors & 5xx responses are retried with the same backoff too -
+        for clients whose own retries are off (see core/llm.py), PRAW retries those itself.
+        Tokens are taken per HTTP request by the transport hooks, not here, so retried calls are governed too
+        """
+        bucket = cls.get(name)
+        retries, base, cap = cls._retry_policy()
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                reason = cls._retryable(e, transient)
+                if reason is None or attempt == retries:
+                    raise
+                if reason == "rate-limited":
+                    delay = cls._on_rate_limited(bucket, e, attempt, base, cap)
+                else:
+                    delay = cls.backoff(attempt, base, cap)
+                logger.info(f"Retrying {reason} {name} call in {delay:.1f}s (attempt {attempt + 1}/{retries})")
+                time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    @classmethod
+    async def retry_async(cls, name: str, func: Callable[[], Awaitable[T]], transient: bool = False) -> T:
+        """
+        Async variant of 'retry' - 'func' is a coroutine factory, called once per attempt
+        """
+        bucket = cls.get(name)
+        retries, base, cap = cls._retry_policy()
+        for attempt in range(retries + 1):
+            try:
+                return await func()
+            except Exception as e:
+                reason = cls._retryable(e, transient)
+                if reason is None or attempt == retries:
+                    raise
+                if reason == "rate-limited":
+                    delay = await bucket.run_async(cls._on_rate_limited, bucket, e, attempt, base, cap)
+                else:
+                    delay = cls.backoff(attempt, base, cap)
+                logger.info(f"Retrying {reason} {name} call in {delay:.1f}s (attempt {attempt + 1}/{retries})")
+                await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    @classmethod
+    def stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Blocking for shared buckets (the budget is read from SQLite) - call it through 'asyncio.to_thread' from coroutines
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Budget, queue & wait metrics per bucket
+        """
+        with cls._lock:
+            buckets = dict(cls._buckets)
+        return {name: bucket.stats() for name, bucket in buckets.items()}
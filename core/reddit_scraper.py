@@ -1,8 +1,55 @@
-import praw
-from typing import List, Tuple
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 from configs.app_config import AppConfig
+from core.corpus_store import COMMENT, SUBMISSION, CorpusStore
+from core.metrics import REGISTRY, span
+from core.rate_governor import RateGovernor
 from logs.logging_config import logger
 
+_FETCH_SECONDS = REGISTRY.histogram(
+    "reddit_fetch_duration_seconds", "Time to fetch one of a user's listings, retries & corpus store included", ["kind"]
+)
+_ITEMS_FETCHED = REGISTRY.counter("reddit_items_fetched_total", "Items returned by Reddit listing calls", ["kind"])
+_FETCH_ERRORS = REGISTRY.counter("reddit_fetch_errors_total", "Listing fetches that failed", ["kind"])
+
+
+@functools.lru_cache(maxsize=None)
+def governed_requestor() -> type:
+    """
+    Returns the GovernedRequestor class, defined on first use so importing this module doesn't import PRAW
+
+    Returns:
+        type: prawcore.Requestor subclass to pass to praw.Reddit as 'requestor_class'
+    """
+    import prawcore
+
+    class GovernedRequestor(prawcore.Requestor):
+        """
+        PRAW requestor that takes a 'reddit' RateGovernor token before every HTTP request
+        & feeds Reddit's X-Ratelimit-* headers back into the bucket, so all scraper threads share one budget
+        """
+
+        def request(self, *args, **kwargs):
+            bucket = RateGovernor.get("reddit")
+            bucket.acquire()
+            response = super().request(*args, **kwargs)
+            bucket.update_from_headers(response.headers)
+            return response
+
+    return GovernedRequestor
+
+
+def _praw_reddit(**credentials) -> Any:
+    import praw
+
+    return praw.Reddit(**credentials)
+
+
 class RedditScraper:
     """
     RedditScraper handles fetching Reddit posts and comments for a given user
@@ -12,11 +59,30 @@ class RedditScraper:
         > REDDIT_CLIENT_ID
         > REDDIT_CLIENT_SECRET
         > REDDIT_USER_AGENT
+        > REDDIT_MAX_CONCURRENCY (optional, default: 8) - max listing calls in flight per process
+
+    When the CorpusStore is enabled, every fetched item is kept on disk & repeat visits only ask
+    Reddit for items newer than the stored cursor
+
+    PRAW is synchronous & not thread-safe, so the async path runs listing calls on a bounded,
+    process-wide thread pool where every worker thread owns its own praw.Reddit client
+
+    Every client sends its requests through GovernedRequestor, & rate-limited listing calls are
+    retried with jittered backoff by the RateGovernor instead of failing the scrape
+
+    Clients - & PRAW itself - are only loaded by the first scrape, which keeps the API's startup short
     """
-    def __init__(self):
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, reddit_factory: Optional[Callable[..., Any]] = None):
         """
         Initializes the Reddit API client with credentials from AppConfig
         Asserts that all required credentials are present
+
+        Args:
+            reddit_factory (Optional[Callable[..., Any]]): Builds a client from the credentials (default: praw.Reddit),
+                                                          eg - the record/replay fakes in benchmarks/fakes.py
         """
         config = AppConfig.get_config_instance()
 
@@ -28,14 +94,197 @@ class RedditScraper:
         assert client_secret, "Missing REDDIT_CLIENT_SECRET"
         assert user_agent, "Missing REDDIT_USER_AGENT"
 
-        print(f"[DEBUG] Using client_id={client_id}, user_agent={user_agent}")
+        logger.debug(f"Reddit client configured (user_agent={user_agent})")
+
+        self._credentials = {
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "user_agent": user_agent,
+        }
+        self._max_concurrency = max(1, config.get_int("REDDIT_MAX_CONCURRENCY", 8))
+        self._local = threading.local()
+        self.corpus_store = CorpusStore.from_config()
+        self._reddit_factory = reddit_factory or _praw_reddit
+        self._reddit: Optional[Any] = None
+        self._reddit_lock = threading.Lock()
+
+    def _new_client(self) -> Any:
+        return self._reddit_factory(**self._credentials, requestor_class=governed_requestor())
+
+    @property
+    def reddit(self) -> Any:
+        """
+        The main thread's praw.Reddit client, built on first use
+        """
+        if self._reddit is None:
+            with self._reddit_lock:
+                if self._reddit is None:
+                    self._reddit = self._new_client()
+        return self._reddit
+
+    @classmethod
+    def _get_executor(cls, max_workers: int) -> ThreadPoolExecutor:
+        """
+        Returns the process-wide thread pool used to offload PRAW calls from the event loop
+
+        Args:
+            max_workers (int): Pool size, i.e. the per-process cap on concurrent listing calls
+
+        Returns:
+            ThreadPoolExecutor: The shared executor (created on first use)
+        """
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="reddit-scraper")
+        return cls._executor
+
+    def _client(self) -> Any:
+        """
+        Returns the praw.Reddit client owned by the current thread
+
+        The main thread keeps using 'self.reddit', pool threads lazily build their own client
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.reddit
+
+        reddit = getattr(self._local, "reddit", None)
+        if reddit is None:
+            reddit = self._new_client()
+            self._local.reddit = reddit
+        return reddit
+
+    def _fetch_listing(self, username: str, kind: str, limit: int, before: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Fetches one of the user's listings as item dicts (blocking)
+
+        Args:
+            username (str): Reddit handle
+            kind (str): SUBMISSION or COMMENT
+            limit (int): Max number of items
+            before (Optional[str]): Only return items newer than this fullname
+
+        Returns:
+            List[Dict[str, Any]]: Items with 'id' (fullname), 'kind', 'created_utc', 'permalink' & 'text'
+        """
+        redditor = self._client().redditor(username)
+        listing = redditor.submissions if kind == SUBMISSION else redditor.comments
+        params = {"before": before} if before else None
+
+        items = []
+        for thing in listing.new(limit=limit, params=params):
+            if kind == SUBMISSION:
+                text = f"Title: {thing.title}\nBody: {thing.selftext}"
+            else:
+                text = thing.body
+            items.append({
+                "id": thing.fullname,
+                "kind": kind,
+                "created_utc": float(thing.created_utc),
+                "permalink": f"https://www.reddit.com{thing.permalink}",
+                "text": text,
+            })
+        _ITEMS_FETCHED.inc(len(items), kind=kind)
+        return items
+
+    def _fetch_items(self, username: str, kind: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Returns the user's latest 'limit' items of one kind, incrementally when a corpus store is available (blocking)
+
+        With a cursor in the store, Reddit is only asked for items newer than it & the answer
+        is served from the store. Without one (first visit, or the cursor is due a full refresh),
+        or when a whole page of new items came back, the latest items are fetched from scratch
+        & replace the stored ones.
+
+        Every fetch is timed into the reddit_fetch_* metrics & runs inside a 'reddit.fetch' trace span.
+        """
+        start = time.perf_counter()
+        try:
+            with span("reddit.fetch", **{"reddit.kind": kind, "reddit.limit": limit}):
+                return self._load_items(username, kind, limit)
+        except Exception:
+            _FETCH_ERRORS.inc(kind=kind)
+            raise
+        finally:
+            _FETCH_SECONDS.observe(time.perf_counter() - start, kind=kind)
+
+    def _load_items(self, username: str, kind: str, limit: int) -> List[Dict[str, Any]]:
+        if self.corpus_store is None:
+            return RateGovernor.retry("reddit", self._fetch_listing, username, kind, limit)
+
+        cursor = self.corpus_store.get_cursor(username, kind)
+        if cursor:
+            new_items = RateGovernor.retry("reddit", self._fetch_listing, username, kind, limit, before=cursor)
+            if len(new_items) < limit:
+                self.corpus_store.add_items(username, kind, new_items)
+                logger.info(f"Incremental fetch for {username}: {len(new_items)} new {kind}s since {cursor}")
+                return self.corpus_store.recent_items(username, kind, limit)
+            # Reddit answers 'before' with the items right after the cursor - a full page means
+            # newer ones may be missing, so the latest items are fetched from scratch instead
+            logger.info(f"{len(new_items)}+ new {kind}s for {username} since {cursor}, doing a full fetch")
+
+        items = RateGovernor.retry("reddit", self._fetch_listing, username, kind, limit)
+        self.corpus_store.add_items(username, kind, items, full_refresh=True)
+        return items
+
+    def fetch_user_items(self, username: str, limit: int = 10) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Fetches a limited number of recent Reddit posts and comments from a user, with their metadata
+
+        Args:
+            username (str): The Reddit username to fetch data for
+            limit (int): The number of posts and comments to fetch (default: 10)
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Post items & comment items, newest first
+        """
+        posts = []
+        comments = []
+
+        try:
+            posts = self._fetch_items(username, SUBMISSION, limit)
+            comments = self._fetch_items(username, COMMENT, limit)
+
+            logger.info(f"Fetched {len(posts)} posts and {len(comments)} comments for user: {username}")
+
+        except Exception as e:
+            logger.error(f"Error fetching data for user {username}: {str(e)}")
+
+        return posts, comments
+
+    async def fetch_user_items_async(self, username: str, limit: int = 10) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Non-blocking variant of 'fetch_user_items'
+
+        Submissions & comments are fetched concurrently on the shared scraper thread pool,
+        so slow Reddit calls never stall the event loop. A failure in one listing doesn't
+        discard the other.
 
-        self.reddit = praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            user_agent=user_agent
+        Args:
+            username (str): The Reddit username to fetch data for
+            limit (int): The number of posts and comments to fetch (default: 10)
+
+        Returns:
+            Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: Post items & comment items, newest first
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor(self._max_concurrency)
+
+        posts, comments = await asyncio.gather(
+            loop.run_in_executor(executor, self._fetch_items, username, SUBMISSION, limit),
+            loop.run_in_executor(executor, self._fetch_items, username, COMMENT, limit),
+            return_exceptions=True,
         )
 
+        if isinstance(posts, BaseException):
+            logger.error(f"Error fetching posts for user {username}: {str(posts)}")
+            posts = []
+        if isinstance(comments, BaseException):
+            logger.error(f"Error fetching comments for user {username}: {str(comments)}")
+            comments = []
+
+        logger.info(f"Fetched {len(posts)} posts and {len(comments)} comments for user: {username}")
+        return posts, comments
+
     def fetch_user_data(self, username: str, limit: int = 10) -> Tuple[List[str], List[str]]:
         """
         Fetches a limited number of recent Reddit posts and comments from a user
@@ -53,22 +302,19 @@ class RedditScraper:
             Info: On successful fetch of posts/comments
             Error: On exceptions or errors
         """
-        posts = []
-        comments = []
-
-        try:
-            redditor = self.reddit.redditor(username)
-
-            for submission in redditor.submissions.new(limit=limit):
-                content = f"Title: {submission.title}\nBody: {submission.selftext}"
-                posts.append(content)
+        posts, comments = self.fetch_user_items(username, limit)
+        return [p["text"] for p in posts], [c["text"] for c in comments]
 
-            for comment in redditor.comments.new(limit=limit):
-                comments.append(comment.body)
-
-            logger.info(f"Fetched {len(posts)} posts and {len(comments)} comments for user: {username}")
+    async def fetch_user_data_async(self, username: str, limit: int = 10) -> Tuple[List[str], List[str]]:
+        """
+        Non-blocking variant of 'fetch_user_data'
 
-        except Exception as e:
-            logger.error(f"Error fetching data for user {username}: {str(e)}")
+        Args:
+            username (str): The Reddit username to fetch data for
+            limit (int): The number of posts and comments to fetch (default: 10)
 
-        return posts, comments
+        Returns:
+            Tuple[List[str], List[str]]: Post strings & comment bodies, as in 'fetch_user_data'
+        """
+        posts, comments = await self.fetch_user_items_async(username, limit)
+        return [p["text"] for p in posts], [c["text"] for c in comments]
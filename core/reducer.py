@@ -80,3 +80,24 @@ class Reducer:
             current = {}
         current.update(new)
         return current
+
+    @staticmethod
+    def extend_dict_lists(current: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Merges new key-value pairs into existing dictionary, concatenating list values instead of replacing them
+
+        Args:
+            current (Dict[str, Any]): The original dictionary
+            new (Dict[str, Any]): The dictionary containing updates
+
+        Returns:
+            Dict[str, Any]: The merged dictionary
+        """
+        if current is None:
+            current = {}
+        extended = {
+            key: list(current.get(key) or []) + value
+            for key, value in new.items()
+            if isinstance(value, list)
+        }
+        return Reducer.merge_dicts(current, {**new, **extended})
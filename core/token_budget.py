@@ -0,0 +1,163 @@
+import re
+from dataclasses import dataclass
+from itertools import chain, zip_longest
+from typing import Dict, List, Optional
+
+# Context windows of the Groq models we run against, in tokens
+MODEL_CONTEXT_TOKENS: Dict[str, int] = {
+    "meta-llama/llama-4-scout-17b-16e-instruct": 131072,
+    "meta-llama/llama-4-maverick-17b-128e-instruct": 131072,
+    "llama-3.3-70b-versatile": 131072,
+    "llama-3.1-8b-instant": 131072,
+    "llama3-70b-8192": 8192,
+    "llama3-8b-8192": 8192,
+    "gemma2-9b-it": 8192,
+    "mixtral-8x7b-32768": 32768,
+}
+DEFAULT_CONTEXT_TOKENS = 8192
+
+
+class TokenCounter:
+    """
+    Local approximation of a BPE tokenizer, so prompts can be budgeted without a round trip
+
+    Every punctuation mark counts as one token & every word as one token per ~4 characters,
+    which tracks the Llama tokenizers closely enough for English Reddit text
+    """
+    _PIECES = re.compile(r"\w+|[^\w\s]")
+
+    @classmethod
+    def count(cls, text: str) -> int:
+        """
+        Args:
+            text (str): Any text
+
+        Returns:
+            int: Approximate number of tokens
+        """
+        total = 0
+        for piece in cls._PIECES.findall(text):
+            total += (len(piece) + 3) // 4 if len(piece) > 4 else 1
+        return total
+
+
+def context_window(model_name: Optional[str]) -> int:
+    """
+    Returns the context window of a model, or DEFAULT_CONTEXT_TOKENS if it's unknown
+    """
+    return MODEL_CONTEXT_TOKENS.get(model_name or "", DEFAULT_CONTEXT_TOKENS)
+
+
+@dataclass
+class PackedEvidence:
+    """
+    Result of packing posts & comments into a token budget
+
+    Attributes:
+        text (str): The packed items, joined by newlines
+        items (List[str]): The packed items, in prompt order
+        used_tokens (int): Tokens taken by the packed items
+        dropped_tokens (int): Tokens of the items that didn't fit
+        dropped_items (int): Number of items that didn't fit
+        budget (int): The budget the items were packed into
+    """
+    text: str
+    items: List[str]
+    used_tokens: int
+    dropped_tokens: int
+    dropped_items: int
+    budget: int
+
+    @property
+    def kept_items(self) -> int:
+        return len(self.items)
+
+
+class EvidencePacker:
+    """
+    Packs whole posts & comments into a token budget, never cutting an item mid-sentence
+
+    Posts & comments are interleaved (post, comment, post, ...) in the order they were scraped,
+    so neither kind crowds out the other. Items that don't fit are skipped, & smaller ones
+    after them still get a chance.
+    """
+    SEPARATOR = "\n"
+
+    @staticmethod
+    def _interleave(posts: List[str], comments: List[str]) -> List[str]:
+        return [item for item in chain.from_iterable(zip_longest(posts, comments)) if item]
+
+    def fits(self, posts: List[str], comments: List[str], budget: int) -> bool:
+        """
+        Whether every post & comment would fit in 'budget' - counts tokens only, without packing any text
+
+        Stops counting as soon as the budget is exceeded.
+        """
+        used = 0
+        for item in self._interleave(posts, comments):
+            used += TokenCounter.count(item) + 1
+            if used > budget:
+                return False
+        return True
+
+    def pack(self, posts: List[str], comments: List[str], budget: int) -> PackedEvidence:
+        """
+        Args:
+            posts (List[str]): Scraped posts, newest first
+            comments (List[str]): Scraped comments, newest first
+            budget (int): Max tokens the packed items may take
+
+        Returns:
+            PackedEvidence: Packed text & token accounting
+        """
+        interleaved = self._interleave(posts, comments)
+
+        kept: List[str] = []
+        used = dropped_tokens = dropped_items = 0
+        for item in interleaved:
+            cost = TokenCounter.count(item) + 1  # +1 for the separator
+            if used + cost <= budget:
+                kept.append(item)
+                used += cost
+            else:
+                dropped_tokens += cost
+                dropped_items += 1
+
+        return PackedEvidence(
+            text=self.SEPARATOR.join(kept),
+            items=kept,
+            used_tokens=used,
+            dropped_tokens=dropped_tokens,
+            dropped_items=dropped_items,
+            budget=budget,
+        )
+
+    def chunk(self, posts: List[str], comments: List[str], chunk_budget: int) -> List[PackedEvidence]:
+        """
+        Splits every post & comment into consecutive chunks of whole items, each within 'chunk_budget'
+
+        An item larger than the budget on its own gets a chunk to itself.
+
+        Args:
+            posts (List[str]): Scraped posts, newest first
+            comments (List[str]): Scraped comments, newest first
+            chunk_budget (int): Max tokens per chunk
+
+        Returns:
+            List[PackedEvidence]: The chunks, in interleaved order
+        """
+        interleaved = self._interleave(posts, comments)
+
+        chunks: List[PackedEvidence] = []
+        current: List[str] = []
+        used = 0
+        for item in interleaved:
+            cost = TokenCounter.count(item) + 1
+            if current and used + cost > chunk_budget:
+                chunks.append(PackedEvidence(self.SEPARATOR.join(current), current, used, 0, 0, chunk_budget))
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            chunks.append(PackedEvidence(self.SEPARATOR.join(current), current, used, 0, 0, chunk_budget))
+        return chunks
@@ -1,21 +1,44 @@
+import asyncio
+from typing import Any, Optional
+
+from configs.app_config import AppConfig
 from core.prompt_templates import PromptBuilder
 from core.llm import LLMManager
-from logs.logging_config import logger
+from core.rate_governor import RateGovernor
+from core.reducer import Reducer
+from logs.logging_config import log_llm_stream, logger
+
+SINGLE = "single"
+MAP_REDUCE = "map_reduce"
+AUTO = "auto"
 
 
 class PersonaAnalyzer:
     """
     Orchestrates persona generation from Reddit data using LLMs
     Combines posts and comments into a structured prompt and uses a language model to produce a descriptive persona summary
+
+    Histories too large for one prompt go through a map-reduce mode instead: chunks are analyzed
+    in parallel & their partial findings are merged into the final persona in a reduce step.
+
+    Configuration values are retrieved from AppConfig:
+        > PERSONA_MODE (default: auto) - 'single', 'map_reduce', or 'auto' (map-reduce only when one prompt can't hold everything)
+        > MAP_REDUCE_CONCURRENCY (default: 4) - max chunk calls in flight per user, on top of LLM_MAX_CONCURRENCY
     """
 
-    def __init__(self):
+    def __init__(self, llm: Optional[Any] = None):
         """
         Initializes the PersonaAnalyzer with a low-temperature LLM,
         & a prompt builder for constructing structured persona prompts
+
+        Args:
+            llm (Optional[Any]): Chat model to use instead of LLMManager's, eg - a replay fake from benchmarks/fakes.py
         """
-        self.llm = LLMManager.get_llm(temperature=0.3)
+        config = AppConfig.get_config_instance()
+        self.llm = llm or LLMManager.get_llm(temperature=0.3)
         self.prompt_builder = PromptBuilder()
+        self.mode = (config.get("PERSONA_MODE", AUTO) or AUTO).lower()
+        self.map_concurrency = max(1, config.get_int("MAP_REDUCE_CONCURRENCY", 4))
         logger.info("PersonaAnalyzer initialized")
 
     def analyze_user(self, username: str, posts: list[str], comments: list[str]) -> str:
@@ -33,10 +56,133 @@ class PersonaAnalyzer:
         try:
             prompt = self.prompt_builder.get_persona_prompt(username, posts, comments)
             logger.info(f"Sending prompt to LLM for user: {username}")
-            result = self.llm.invoke(prompt).content
+            result = RateGovernor.retry("groq", lambda: self.llm.invoke(prompt).content, transient=True)
+            logger.info(f"Successfully built {username}'s Persona Card")
+            return result
+
+        except Exception as e:
+            logger.error(f"Couldn't analyze user {username}: {e}")
+            raise
+
+    async def _complete(self, prompt: str, stream: bool = False) -> str:
+        """
+        Sends one prompt to the LLM while holding the shared LLMManager semaphore
+
+        With 'stream' enabled, tokens are pulled via the model's streaming API & forwarded to 'log_llm_stream'
+        as they arrive, while the full text is still returned at the end.
+        A rate-limited (429) or transient (timeout, connection error, 5xx) failure is retried through the
+        RateGovernor. The semaphore is taken per attempt, so a call sleeping through its backoff doesn't hold
+        a slot other requests could use.
+        """
+        async def _call() -> str:
+            async with LLMManager.get_semaphore():
+                if not stream:
+                    return (await self.llm.ainvoke(prompt)).content
+
+                parts = []
+                async for chunk in self.llm.astream(prompt):
+                    if chunk.content:
+                        parts.append(chunk.content)
+                        log_llm_stream(chunk.content)
+                return "".join(parts)
+
+        return await RateGovernor.retry_async("groq", _call, transient=True)
+
+    def needs_map_reduce(self, posts: list[str], comments: list[str], username: str = "") -> bool:
+        """
+        Decides whether a user's history goes through the map-reduce mode
+
+        Only counts tokens - the prompt itself is packed once, by the analysis that follows
+
+        Returns:
+            bool: True in 'map_reduce' mode, or in 'auto' mode when a single prompt would have to drop items
+        """
+        if self.mode == MAP_REDUCE:
+            return True
+        if self.mode == SINGLE:
+            return False
+        return not self.prompt_builder.fits_persona_prompt(username, posts, comments)
+
+    async def analyze_user_async(self,
+                                 username: str,
+                                 posts: list[str],
+                                 comments: list[str],
+                                 stream: bool = False) -> str:
+        """
+        Non-blocking variant of 'analyze_user' - awaits the model's async API
+
+        The call holds the shared LLMManager semaphore, so in-flight LLM requests stay bounded per process
+
+        Args:
+            username (str): Reddit handle
+            posts (list[str]): Fetched Reddit posts
+            comments (list[str]): Fetched Reddit comments
+            stream (bool): Stream tokens through 'log_llm_stream' (default: False)
+
+        Returns:
+            str: Description of persona
+        """
+        try:
+            prompt = self.prompt_builder.get_persona_prompt(username, posts, comments)
+            logger.info(f"Sending prompt to LLM for user: {username}")
+            result = await self._complete(prompt, stream=stream)
             logger.info(f"Successfully built {username}'s Persona Card")
             return result
 
         except Exception as e:
             logger.error(f"Couldn't analyze user {username}: {e}")
             raise
+
+    async def analyze_user_map_reduce_async(self,
+                                            username: str,
+                                            posts: list[str],
+                                            comments: list[str],
+                                            stream: bool = False) -> str:
+        """
+        Map-reduce variant of 'analyze_user_async' for users with large histories
+
+        Map: every chunk of the history is sent for partial, cited extraction - in parallel, up to MAP_REDUCE_CONCURRENCY.
+        Reduce: partial findings are merged attribute by attribute & turned into the final persona by one more call.
+        Chunks that fail are skipped, as long as at least one succeeds.
+
+        Args:
+            username (str): Reddit handle
+            posts (list[str]): Fetched Reddit posts
+            comments (list[str]): Fetched Reddit comments
+            stream (bool): Stream the reduce step's tokens through 'log_llm_stream' (default: False)
+
+        Returns:
+            str: Description of persona
+        """
+        try:
+            chunks = self.prompt_builder.chunk_evidence(posts, comments)
+            logger.info(f"Map-reduce persona for {username}: {len(chunks)} chunks")
+            semaphore = asyncio.Semaphore(self.map_concurrency)
+
+            async def _map(index: int, chunk) -> dict:
+                async with semaphore:
+                    prompt = self.prompt_builder.get_partial_persona_prompt(username, chunk, index + 1, len(chunks))
+                    reply = await self._complete(prompt)
+                return self.prompt_builder.parse_partial_persona(reply)
+
+            partials = await asyncio.gather(*(_map(i, c) for i, c in enumerate(chunks)), return_exceptions=True)
+
+            evidence = {}
+            for index, partial in enumerate(partials):
+                if isinstance(partial, BaseException):
+                    logger.warning(f"Map step failed for chunk {index + 1}/{len(chunks)} of {username}: {partial}")
+                    continue
+                evidence = Reducer.extend_dict_lists(evidence, partial)
+
+            if not any(evidence.values()):
+                raise ValueError(f"No chunk of {username}'s history produced any persona evidence")
+
+            prompt = self.prompt_builder.get_reduce_persona_prompt(username, evidence, parts=len(chunks))
+            logger.info(f"Sending reduce prompt to LLM for user: {username}")
+            result = await self._complete(prompt, stream=stream)
+            logger.info(f"Successfully built {username}'s Persona Card from {len(chunks)} chunks")
+            return result
+
+        except Exception as e:
+            logger.error(f"Couldn't analyze user {username}: {e}")
+            raise
@@ -0,0 +1,183 @@
+import json
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from core.corpus_store import CorpusStore
+from logs.logging_config import logger
+
+# Matches `Cited from: "..."` with straight or curly quotes, or an unquoted rest of line
+# (eg - `Cited from: Not explicitly mentioned`, which can never verify)
+_CITATION_PATTERN = re.compile(r'Cited from:[ \t]*(?:["“]([^"”]*)["”]|([^\n]+))', re.IGNORECASE)
+_ELLIPSIS_PATTERN = re.compile(r"\.\.\.|…")
+_NON_WORD = re.compile(r"[\W_]+")
+
+NGRAM = 3
+
+
+def normalize(text: str) -> str:
+    """
+    Case-folds text & collapses punctuation/whitespace runs to single spaces,
+    so a citation still matches when the LLM changed quotes, casing or line breaks
+    """
+    return _NON_WORD.sub(" ", text.casefold()).strip()
+
+
+class CitationIndex:
+    """
+    Word n-gram index over one user's posts & comments, used to check persona citations
+
+    The index is built once per user in a single pass over the corpus. A citation is then
+    checked by intersecting the posting lists of its word trigrams - which narrows it down to the
+    few items that could contain it - & confirming with a substring test on those items only,
+    so the cost is linear in the citation's length rather than in the corpus size.
+    Citations under three words are rare & just get a substring test against every item.
+
+    Citations quoting with an ellipsis ("first part ... second part") match when every
+    fragment is found in the same item.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]]):
+        """
+        Args:
+            items (Iterable[Dict[str, Any]]): Items with 'text' & optionally 'id' & 'permalink'
+        """
+        self._items: List[Dict[str, Any]] = []
+        self._texts: List[str] = []
+        self._postings: Dict[tuple, Set[int]] = defaultdict(set)
+
+        for item in items:
+            text = normalize(item.get("text") or "")
+            if not text:
+                continue
+            index = len(self._texts)
+            self._items.append(item)
+            self._texts.append(f" {text} ")  # padded, so substring tests only match whole words
+            words = text.split(" ")
+            for gram in zip(*(words[i:] for i in range(NGRAM))):
+                self._postings[gram].add(index)
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Any]) -> "CitationIndex":
+        """
+        Builds the index from LangChain Documents carrying 'id'/'permalink' metadata (see ScraperNode)
+        """
+        return cls(
+            {"text": doc.page_content, "id": doc.metadata.get("id"), "permalink": doc.metadata.get("permalink")}
+            for doc in documents
+        )
+
+    def _candidates(self, fragment: str) -> Set[int]:
+        words = fragment.split(" ")
+        if len(words) < NGRAM:
+            # Too short for the n-gram index, fall back to checking every item
+            return set(range(len(self._texts)))
+
+        candidates: Optional[Set[int]] = None
+        for gram in zip(*(words[i:] for i in range(NGRAM))):
+            posting = self._postings.get(gram)
+            if not posting:
+                return set()
+            candidates = set(posting) if candidates is None else candidates & posting
+            if not candidates:
+                return set()
+        return candidates or set()
+
+    def find(self, citation: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up the post/comment a citation was quoted from
+
+        Args:
+            citation (str): The quoted excerpt
+
+        Returns:
+            Optional[Dict[str, Any]]: The source item, or None if no item contains the excerpt
+        """
+        fragments = [normalize(part) for part in _ELLIPSIS_PATTERN.split(citation)]
+        fragments = [f for f in fragments if f]
+        if not fragments:
+            return None
+
+        candidates: Optional[Set[int]] = None
+        for fragment in fragments:
+            matches = self._candidates(fragment)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return None
+
+        for index in sorted(candidates):
+            text = self._texts[index]
+            if all(f" {fragment} " in text for fragment in fragments):
+                return self._items[index]
+        return None
+
+    def verify(self, persona_text: str) -> List[Dict[str, Any]]:
+        """
+        Checks every `Cited from: "..."` line of a persona
+
+        Args:
+            persona_text (str): Persona card produced by the LLM
+
+        Returns:
+            List[Dict[str, Any]]: One {"citation", "verified", "source_id", "permalink"} entry per citation
+        """
+        results = []
+        for quoted, unquoted in _CITATION_PATTERN.findall(persona_text):
+            citation = (quoted or unquoted).strip()
+            source = self.find(citation)
+            results.append({
+                "citation": citation,
+                "verified": source is not None,
+                "source_id": source.get("id") if source else None,
+                "permalink": source.get("permalink") if source else None,
+            })
+        return results
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Counts verified & fabricated citations in a 'CitationIndex.verify' result
+    """
+    verified = sum(1 for r in results if r["verified"])
+    return {"citations": len(results), "verified": verified, "fabricated": len(results) - verified}
+
+
+def verify_stored_personas(output_dir: str = "outputs", corpus_store: Optional[CorpusStore] = None) -> Dict[str, Any]:
+    """
+    Batch-checks every '<user>_persona.txt' in 'output_dir' against the user's items in the CorpusStore
+
+    One index is built per user, then all of that persona's citations are checked against it.
+
+    Args:
+        output_dir (str): Directory written by PersonaWriter
+        corpus_store (Optional[CorpusStore]): Store holding the scraped items (defaults to the configured one)
+
+    Returns:
+        Dict[str, Any]: Per-user summaries & the flagged (unverified) citations
+    """
+    corpus_store = corpus_store or CorpusStore.from_config()
+    if corpus_store is None:
+        raise RuntimeError("Citation batch checks need the CorpusStore (CORPUS_STORE_ENABLED)")
+
+    report = {}
+    for path in sorted(Path(output_dir).glob("*_persona.txt")):
+        username = path.name[:-len("_persona.txt")]
+        posts, comments = corpus_store.all_items(username)
+        if not posts and not comments:
+            report[username] = {"skipped": "no stored posts/comments"}
+            continue
+
+        results = CitationIndex(posts + comments).verify(path.read_text(encoding="utf-8"))
+        report[username] = {
+            **summarize(results),
+            "flagged": [r["citation"] for r in results if not r["verified"]],
+        }
+    return report
+
+
+if __name__ == "__main__":
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else "outputs"
+    logger.info(f"Verifying citations of stored personas in {output_dir}")
+    print(json.dumps(verify_stored_personas(output_dir), indent=2))
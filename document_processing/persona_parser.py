@@ -0,0 +1,59 @@
+import re
+from typing import List, Optional
+
+from models.persona_model import PersonaAttribute, UserPersona
+
+# `</> Label: value` (value optional for multi-value sections)
+_SECTION = re.compile(r"^\s*</>\s*([^:\n]+):[ \t]*(.*)$")
+# `• value`, `- value` or `* value`
+_BULLET = re.compile(r"^\s*[•\-*]\s+(.+)$")
+# `Cited from: "..."` / `↳ Cited from: ...`, with straight or curly quotes or none
+_CITATION = re.compile(r'^\s*(?:↳\s*)?Cited from:[ \t]*(?:["“](.*)["”]|(.+))\s*$', re.IGNORECASE)
+
+
+class PersonaParser:
+    """
+    Parses a persona card, as laid out by the persona prompts, into a UserPersona
+
+    Every `</> Label: value` line & every bullet under a `</> Label:` heading becomes one PersonaAttribute,
+    with the `Cited from:` line that follows it as its citation. Lines outside any section are ignored.
+    """
+
+    @staticmethod
+    def parse(username: str, persona_text: str) -> UserPersona:
+        """
+        Args:
+            username (str): Reddit handle
+            persona_text (str): Persona card produced by the LLM
+
+        Returns:
+            UserPersona: One attribute per value found, in card order
+        """
+        attributes: List[PersonaAttribute] = []
+        label: Optional[str] = None
+        current: Optional[PersonaAttribute] = None
+
+        for line in persona_text.splitlines():
+            section = _SECTION.match(line)
+            if section:
+                label = section.group(1).strip()
+                value = section.group(2).strip()
+                current = PersonaAttribute(label=label, value=value) if value else None
+                if current:
+                    attributes.append(current)
+                continue
+            if label is None:
+                continue
+
+            citation = _CITATION.match(line)
+            if citation:
+                if current is not None and current.citation is None:
+                    current.citation = (citation.group(1) or citation.group(2) or "").strip()
+                continue
+
+            bullet = _BULLET.match(line)
+            if bullet:
+                current = PersonaAttribute(label=label, value=bullet.group(1).strip())
+                attributes.append(current)
+
+        return UserPersona(username=username, attributes=attributes)
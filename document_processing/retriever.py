@@ -0,0 +1,96 @@
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+# Query terms per persona attribute - word variants are listed explicitly since nothing is stemmed
+ATTRIBUTE_QUERIES: Dict[str, str] = {
+    "Name": "name named call called nickname me myself",
+    "Age": "age old years year born birthday kid teen teenager college retired retirement generation 20s 30s 40s",
+    "Occupation": "job work working worked career boss coworker coworkers office company employer salary "
+                  "hired fired shift profession engineer developer student teacher nurse manager business",
+    "Location": "live living lived city country town state moved move home neighborhood local here weather "
+                "apartment rent commute",
+    "Traits": "i'm i am always never personality honestly love hate feel think",
+    "Behaviors": "usually often every day daily weekly routine habit spend play playing watch read",
+    "Motivations": "want because reason why care matters enjoy passion dream hope",
+    "Frustrations": "annoying annoyed frustrating frustrated hate tired sick problem issue worst ugh stupid",
+    "Goals": "goal goals plan planning trying try want hope someday future save learn improve",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.casefold())
+
+
+class BM25Index:
+    """
+    In-process Okapi BM25 index over one user's posts & comments
+
+    Built in a single pass into term -> [(document, term frequency)] posting lists, so a query only
+    touches the documents containing at least one of its terms.
+    """
+
+    def __init__(self, texts: Iterable[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            texts (Iterable[str]): Documents to index, referred to by position
+            k1 (float): Term frequency saturation
+            b (float): Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._lengths: List[int] = []
+
+        for index, text in enumerate(texts):
+            tokens = tokenize(text)
+            self._lengths.append(len(tokens))
+            for term, frequency in Counter(tokens).items():
+                self._postings[term].append((index, frequency))
+
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def _idf(self, term: str) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log(1 + (len(self._lengths) - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Args:
+            query (str): Free-text query
+            k (int): Max results
+
+        Returns:
+            List[Tuple[int, float]]: (document index, score) pairs, best first, only documents matching a term
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for index, frequency in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / (self._avg_length or 1))
+                scores[index] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return heapq.nlargest(k, scores.items(), key=lambda pair: pair[1])
+
+    def search_attributes(self, k: int = 5, queries: Dict[str, str] = None) -> Dict[str, List[int]]:
+        """
+        Runs one query per persona attribute
+
+        Args:
+            k (int): Max documents per attribute
+            queries (Dict[str, str]): Attribute -> query (default: ATTRIBUTE_QUERIES)
+
+        Returns:
+            Dict[str, List[int]]: Attribute -> matching document indices, best first
+        """
+        queries = queries or ATTRIBUTE_QUERIES
+        return {attribute: [index for index, _ in self.search(query, k)] for attribute, query in queries.items()}
@@ -1,46 +1,150 @@
 # document_processing/utils.py
 
 import re
-import logging
-from typing import Optional
+import html
+import unicodedata
+from typing import Iterable, Iterator, Optional
 
-logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+# Patterns are compiled once at import, not on every call
+_MD_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_URL = re.compile(r"(?:https?://|www\.)\S+", re.IGNORECASE)
+_MD_ESCAPE = re.compile(r"\\([\\`*_{}\[\]()#+\-.!>~|])")
+_INVISIBLE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u00ad\u200b-\u200d\u2060\ufeff]")
+_SENTENCE_END = re.compile(r"[.!?。！？…](?:[\"'”’)\]]*)(?=\s|$)")
+_USERNAME = re.compile(r"reddit\.com\/user\/([\w\-_.]+)")
+
+# Emphasis/code markers dropped from markdown
+_MARKDOWN_CHARS = ("*", "`", "~")
+# Leading markers of headings ('#', '##', ...) & quotes ('>', '>>', ...)
+_LINE_MARKER_CHARS = "#>"
+
+
+def _unicode_normalize(text: str) -> str:
+    """
+    NFKC-normalizes text & drops invisible/control characters - a no-op for plain ASCII
+    """
+    if text.isascii():
+        return text
+    if not unicodedata.is_normalized("NFKC", text):
+        text = unicodedata.normalize("NFKC", text)
+    return _INVISIBLE.sub("", text)
 
 
 class TextCleaner:
     """
     For text cleaning and formatting
+
+    'normalize_text' is the full pipeline applied to scraped posts & comments:
+        HTML entities -> NFKC & invisible characters -> markdown links/images & URLs -> markdown markup
+        -> whitespace (line breaks kept) -> optional sentence-safe truncation
+    Every step is skipped when a cheap substring check shows it has nothing to do, & whitespace is
+    handled with str.split/join rather than regex passes, which keeps it ahead of the old regex-only cleaner.
+    'normalize_stream' applies it lazily to an iterable of texts.
+    Non-ASCII text (accents, CJK, emoji) is kept - NFKC only folds compatibility forms (eg - 'ﬁ' -> 'fi', full-width digits).
     """
     @staticmethod
     def clean_text(text: str) -> str:
         """
         Cleans the input text by removing redundant whitespace, newlines, and formatting characters
         """
-        text = re.sub(r"\s+", " ", text)
-        text = re.sub(r"[^\x00-\x7F]+", " ", text)  # Removes non-ASCII characters
-        return text.strip()
+        return " ".join(_unicode_normalize(text).split())
+
+    @staticmethod
+    def normalize_text(text: str,
+                       strip_urls: bool = True,
+                       strip_markdown: bool = True,
+                       max_chars: Optional[int] = None) -> str:
+        """
+        Normalizes one post/comment for analysis
+
+        Args:
+            text (str): Raw Reddit markdown
+            strip_urls (bool): Drop bare URLs & keep only the label of markdown links (default: True)
+            strip_markdown (bool): Drop emphasis/code markers, headings, quotes & backslash escapes (default: True)
+            max_chars (Optional[int]): Truncate at a sentence boundary to at most this many characters (default: no limit)
+
+        Returns:
+            str: Normalized text, with single spaces & single line breaks
+        """
+        if "&" in text:
+            text = html.unescape(text)
+        text = _unicode_normalize(text)
+        if strip_urls:
+            if "](" in text:
+                text = _MD_LINK.sub(r"\1", text)
+            if "://" in text or "www." in text or "WWW." in text:
+                text = _URL.sub("", text)
+        if strip_markdown:
+            if "\\" in text:
+                text = _MD_ESCAPE.sub(r"\1", text)
+            for char in _MARKDOWN_CHARS:
+                if char in text:
+                    text = text.replace(char, "")
+
+        lines = []
+        for line in text.splitlines():
+            words = line.split()
+            if not words:
+                continue
+            if strip_markdown and words[0][0] in _LINE_MARKER_CHARS:
+                marker = words[0].lstrip(_LINE_MARKER_CHARS)
+                if not marker:
+                    del words[0]
+                elif words[0][0] == ">":
+                    words[0] = marker
+            if words:
+                lines.append(" ".join(words))
+        text = "\n".join(lines)
+
+        if max_chars is not None:
+            text = TextCleaner.truncate_text(text, max_chars)
+        return text
+
+    @staticmethod
+    def normalize_stream(texts: Iterable[str], **kwargs) -> Iterator[str]:
+        """
+        Lazily normalizes texts one at a time - nothing is buffered, so it can sit directly on a scraper's output
+
+        Args:
+            texts (Iterable[str]): Raw texts
+            **kwargs: Passed on to 'normalize_text'
+
+        Yields:
+            str: Normalized texts, in input order (empty results included, so positions still line up)
+        """
+        for text in texts:
+            yield TextCleaner.normalize_text(text or "", **kwargs)
 
     @staticmethod
     def truncate_text(text: str, max_chars: int = 3000) -> str:
         """
         Truncates text to the maximum number of characters - to ensure full sentence endings
+
+        Cuts after the last sentence end ('.', '!', '?', ... incl. closing quotes) that fits,
+        else at the last whitespace, so words are never split
         """
         if len(text) <= max_chars:
             return text
 
-        truncated = text[:max_chars]
-        last_period = truncated.rfind(".")
-        if last_period != -1:
-            return truncated[:last_period + 1]
+        truncated = text[:max_chars + 1]
+        last_end = None
+        for last_end in _SENTENCE_END.finditer(truncated):
+            pass
+        if last_end is not None and last_end.end() <= max_chars:
+            return truncated[:last_end.end()]
+
+        truncated = truncated[:max_chars]
+        last_space = truncated.rfind(" ")
+        if last_space > 0:
+            return truncated[:last_space].rstrip()
         return truncated
 
     @staticmethod
-    def safe_join(texts: list[str], separator: str = "\n") -> str:
+    def safe_join(texts: Iterable[str], separator: str = "\n") -> str:
         """
-        Safely joins a list of text elements with a separator
+        Safely joins text elements with a separator
         """
-        return separator.join(TextCleaner.clean_text(t) for t in texts if t and t.strip())
+        return separator.join(cleaned for cleaned in map(TextCleaner.clean_text, texts or ()) if cleaned)
 
     @staticmethod
     def extract_username_from_url(url: str) -> Optional[str]:
@@ -48,6 +152,5 @@ class TextCleaner:
         Extracts the Reddit username from a profile URL
         Example: https://www.reddit.com/user/example_user |  > here, the user_id is: example_user
         """
-        pattern = r"reddit\.com\/user\/([\w\-_.]+)"
-        match = re.search(pattern, url)
+        match = _USERNAME.search(url)
         return match.group(1) if match else None
@@ -1,56 +1,452 @@
+import asyncio
+import bz2
+import gzip
+import json
+import logging
+import lzma
 import os
+import queue
+import re
+import shutil
 import sys
-from datetime import datetime
-from typing import Optional
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
 
 from loguru import logger as _logger
 
 _print_level = "INFO"
 
+# Id of the request (or job) being served in the current context, attached to every log record
+_request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Values masked as '***' in every log message - filled from the environment & by AppConfig
+_redactions: set = set()
+_SECRET_SUFFIXES = ("_KEY", "_SECRET", "_TOKEN", "_PASSWORD", "_CLIENT_ID")
+
+# Compressors for rotated log files, by LOG_COMPRESSION value
+_COMPRESSORS = {"gz": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+_COMPRESSION_ALIASES = {"gzip": "gz", "true": "gz", "1": "gz", "yes": "gz", "on": "gz", "bzip2": "bz2", "lzma": "xz"}
+_COMPRESSION_OFF = ("", "false", "0", "no", "off", "none")
+# Rotated file names after the prefix: '<YYYYmmdd>.<HHMMSS_microseconds>.<ext>[.<compression>]'
+_ROTATED_NAME = re.compile(r"\d{8}\.\d{6}_\d{6}\.")
+
+# LOG_* variables read by 'define_log_level' - a change (eg - once .env is loaded) rebuilds the pipeline
+_LOG_SETTINGS = (
+    "LOG_LEVEL", "LOG_FILE_LEVEL", "LOG_JSON", "LOG_FILE_JSON", "LOG_DIR",
+    "LOG_MAX_MB", "LOG_RETENTION_DAYS", "LOG_COMPRESSION", "LOG_BACKGROUND",
+)
+_applied: Optional[tuple] = None  # arguments & LOG_* values the current pipeline was built from
+
+_CONSOLE_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | {extra[request_id]} | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
 
 def find_project_root():
     """
-    Finds the root directory of the project by looking for the .git folder.
-    Traverses up the directory tree until it finds .git or reaches the system root.
+    Returns the root directory of the project - the parent of this 'logs' package.
+    Derived from this file's location, so it also works where there's no .git folder (eg - the Docker image).
+    """
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def add_redactions(values: Iterable[Optional[str]]):
+    """
+    Registers secret values (API keys, client secrets, ...) to be masked in every log message
+
+    Args:
+        values (Iterable[Optional[str]]): Secrets - empty & very short values are ignored
+    """
+    _redactions.update(value for value in values if value and len(value) >= 6)
+
+
+def secret_values(environ: Dict[str, str]) -> list:
+    """
+    Returns:
+        list: Values of the variables in 'environ' that look like credentials (*_KEY, *_SECRET, *_TOKEN, ...)
+    """
+    return [value for key, value in environ.items() if key.upper().endswith(_SECRET_SUFFIXES)]
+
+
+def _redact(message: str) -> str:
+    for secret in _redactions:
+        if secret in message:
+            message = message.replace(secret, "***")
+    return message
+
+
+def _patch(record: Dict[str, Any]):
+    """
+    Runs for every record: attaches the current request id & masks registered secrets
+    """
+    record["extra"]["request_id"] = _request_id.get()
+    if _redactions:
+        record["message"] = _redact(record["message"])
+
+
+def _serialize(record: Dict[str, Any]) -> str:
+    payload = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "request_id": record["extra"].get("request_id", "-"),
+        "logger": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    extra = {key: value for key, value in record["extra"].items() if key not in ("request_id", "json")}
+    if extra:
+        payload["extra"] = extra
+    if record["exception"] is not None:
+        exc_type, exc_value, exc_traceback = record["exception"]
+        payload["exception"] = _redact("".join(traceback.format_exception(exc_type, exc_value, exc_traceback)))
+    return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+def json_format(record: Dict[str, Any]) -> str:
+    # The JSON goes through 'extra' so its braces aren't read as format fields
+    record["extra"]["json"] = _serialize(record)
+    return "{extra[json]}\n"
+
+
+def parse_compression(value: Optional[str]) -> Optional[str]:
+    """
+    Parses LOG_COMPRESSION - 'gz' (or 'gzip', 'true', ...), 'bz2', 'xz', or off ('', 'false', 'none', ...)
+
+    Returns:
+        Optional[str]: Extension of the compressor to use, None when compression is off
+    """
+    if value is None:
+        return "gz"
+    value = value.strip().lower().lstrip(".")
+    if value in _COMPRESSION_OFF:
+        return None
+    value = _COMPRESSION_ALIASES.get(value, value)
+    if value not in _COMPRESSORS:
+        sys.__stderr__.write(f"Unknown LOG_COMPRESSION '{value}', using gz\n")
+        return "gz"
+    return value
+
+
+class RotatingFile:
+    """
+    Append-only log file named after the day, that rotates once it would exceed 'max_bytes' or the day changes
+
+    Rotated files are renamed with a timestamp, compressed ('compression': 'gz', 'bz2', 'xz' or None) &
+    deleted after 'retention_days'.
+    Not thread-safe - it's written by one BackgroundSink thread (or under loguru's handler lock).
+    """
+
+    def __init__(self,
+                 directory: str,
+                 prefix: str,
+                 suffix: str,
+                 max_bytes: int,
+                 retention_days: int,
+                 compression: Optional[str] = "gz"):
+        self.directory = directory
+        self.prefix = prefix
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.compression = compression
+        self._file = None
+        self._day: Optional[date] = None
+        self._open()
+
+    def _path(self, day: date) -> str:
+        return os.path.join(self.directory, f"{self.prefix}{day:%Y%m%d}{self.suffix}")
+
+    def _open(self):
+        self._day = date.today()
+        self._file = open(self._path(self._day), "a", encoding="utf-8")
+
+    def _rotate(self):
+        path = self._file.name
+        self._file.close()
+        if os.path.exists(path) and os.path.getsize(path):
+            rotated = f"{path[:-len(self.suffix)]}.{datetime.now():%H%M%S_%f}{self.suffix}"
+            os.replace(path, rotated)
+            if self.compression:
+                with open(rotated, "rb") as src, _COMPRESSORS[self.compression](f"{rotated}.{self.compression}", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.remove(rotated)
+        self._prune()
+        self._open()
+
+    def _is_rotated(self, name: str) -> bool:
+        """
+        Whether 'name' is a rotated file of this log - '<prefix><day>.<time>.<ext>', whatever the format
+        & compression were when it was rotated (the current day's file is never matched)
+        """
+        return name.startswith(self.prefix) and _ROTATED_NAME.match(name[len(self.prefix):]) is not None
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_days * 86400
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and self._is_rotated(entry.name) and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+
+    def write(self, text: str):
+        if date.today() != self._day or self._file.tell() + len(text) > self.max_bytes:
+            self._rotate()
+        self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    # Called by loguru when the sink is removed (synchronous mode, see LOG_BACKGROUND)
+    stop = close
+
+
+class BackgroundSink:
+    """
+    Loguru sink that hands formatted messages to a writer thread, so the caller - & the event loop - never waits on I/O
+
+    The queue is in-process & unbounded (no pickling, unlike loguru's 'enqueue'); the writer batches
+    whatever is pending into one write & one flush. 'await logger.complete()' waits until everything
+    logged so far is written, & removing the sink drains it.
+    """
+
+    def __init__(self, target: Any, name: str = "log-writer"):
+        """
+        Args:
+            target (Any): Where messages end up - a RotatingFile or a stream such as sys.stderr
+            name (str): Writer thread name
+        """
+        self.target = target
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, message: str):
+        self._queue.put(message)
+
+    def isatty(self) -> bool:
+        return callable(getattr(self.target, "isatty", None)) and self.target.isatty()
+
+    def _run(self):
+        while True:
+            batch, markers, stop = [self._queue.get()], [], False
+            while len(batch) < 1024:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            texts = []
+            for item in batch:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    markers.append(item)
+                else:
+                    texts.append(item)
+            try:
+                if texts:
+                    self.target.write("".join(texts))
+                    self.target.flush()
+            except Exception as e:
+                sys.__stderr__.write(f"Log sink {self._thread.name} failed: {e}\n")
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    def drain(self, timeout: Optional[float] = None):
+        """
+        Blocks until everything written so far has reached the target
+        """
+        marker = threading.Event()
+        self._queue.put(marker)
+        marker.wait(timeout)
+
+    async def complete(self):
+        await asyncio.to_thread(self.drain, 10.0)
+
+    def stop(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=10.0)
+        if isinstance(self.target, RotatingFile):
+            self.target.close()
+
+
+class InterceptHandler(logging.Handler):
+    """
+    Routes stdlib 'logging' records (uvicorn, httpx, praw, ...) into loguru, keeping their level & call site
+    """
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            level = _logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        frame, depth = sys._getframe(1), 1
+        while frame and frame.f_code.co_filename == logging.__file__:
+            frame = frame.f_back
+            depth += 1
+
+        _logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+def intercept_stdlib_logging(level: int = logging.INFO):
+    """
+    Makes loguru the only logging backend: the root logger gets an InterceptHandler, & loggers that
+    configured their own handlers (eg - uvicorn's) are reset to propagate to it
+
+    Called by the entry points (the API's lifespan, the CLI) once the libraries have set up their loggers,
+    not at import, so importing this module doesn't rewire the host application's logging.
     """
-    current_dir = os.path.abspath(os.path.dirname(__file__))
-    while current_dir != os.path.dirname(current_dir):  # Keep going up until root
-        if os.path.isdir(os.path.join(current_dir, ".git")):
-            return current_dir
-        current_dir = os.path.dirname(current_dir)
-    raise FileNotFoundError("Project root containing '.git' directory not found.")
+    logging.basicConfig(handlers=[InterceptHandler()], level=level, force=True)
+    for name in list(logging.root.manager.loggerDict):
+        existing = logging.getLogger(name)
+        existing.handlers = []
+        existing.propagate = True
+
+
+def _env_bool(key: str, default: bool) -> bool:
+    value = os.getenv(key)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
 
 
 def define_log_level(print_level="INFO", logfile_level="DEBUG", name: Optional[str] = None):
     """
-    Adjust the log level to above level
+    Sets up the one logging pipeline of the app & returns the loguru logger
+
+    Sinks write from background threads (BackgroundSink), so logging never blocks the caller - or the event loop - on I/O.
+    The file sink rotates daily & by size, compresses rotated files & drops them after a retention period.
+    Every record carries the current request id (see 'request_context'), & registered secrets are masked.
+    stdlib 'logging' is routed into the same sinks once 'intercept_stdlib_logging' is called.
+
+    Settings are read from the process environment, as logging starts before AppConfig; values from .env
+    are applied when AppConfig loads it (see 'reload_log_settings'):
+        > LOG_LEVEL / LOG_FILE_LEVEL - console & file levels (default: the arguments)
+        > LOG_JSON (default: false) / LOG_FILE_JSON (default: true) - one JSON object per line instead of text
+        > LOG_DIR (default: <project root>/logs)
+        > LOG_MAX_MB (default: 20), LOG_RETENTION_DAYS (default: 14)
+        > LOG_COMPRESSION (default: gz) - gz, bz2, xz, or false/none to keep rotated files uncompressed
+        > LOG_BACKGROUND (default: true) - false writes synchronously, eg - to debug the pipeline itself
     """
-    global _print_level
+    global _print_level, _applied
+    _applied = ((print_level, logfile_level, name), _log_settings())
+    print_level = os.getenv("LOG_LEVEL", print_level).upper()
+    logfile_level = os.getenv("LOG_FILE_LEVEL", logfile_level).upper()
     _print_level = print_level
 
-    current_date = datetime.now()
-    formatted_date = current_date.strftime("%Y%m%d")
-    log_name = f"{name}_{formatted_date}" if name else formatted_date
-
-    project_root = find_project_root()
-    logs_dir = os.path.join(project_root, "logs")
+    logs_dir = os.getenv("LOG_DIR") or os.path.join(find_project_root(), "logs")
     os.makedirs(logs_dir, exist_ok=True)
+    file_json = _env_bool("LOG_FILE_JSON", True)
+    log_file = RotatingFile(
+        logs_dir,
+        prefix=f"{name}_" if name else "",
+        suffix=".jsonl" if file_json else ".txt",
+        max_bytes=int(float(os.getenv("LOG_MAX_MB", "20")) * 1024 * 1024),
+        retention_days=int(os.getenv("LOG_RETENTION_DAYS", "14")),
+        compression=parse_compression(os.getenv("LOG_COMPRESSION")),
+    )
+
+    background = _env_bool("LOG_BACKGROUND", True)
+    console = BackgroundSink(sys.stderr, "log-console") if background else sys.stderr
+    file_sink = BackgroundSink(log_file, "log-file") if background else log_file
+
+    add_redactions(secret_values(os.environ))
 
     _logger.remove()
-    _logger.add(sys.stderr, level=print_level)
-    _logger.add(os.path.join(logs_dir, f"{log_name}.txt"), level=logfile_level)
+    _logger.configure(extra={"request_id": "-"}, patcher=_patch)
+    _logger.add(
+        console,
+        level=print_level,
+        format=json_format if _env_bool("LOG_JSON", False) else _CONSOLE_FORMAT,
+        backtrace=False,
+        diagnose=False,
+    )
+    _logger.add(
+        file_sink,
+        level=logfile_level,
+        format=json_format if file_json else _CONSOLE_FORMAT,
+        colorize=False,
+        backtrace=False,
+        diagnose=False,
+    )
     return _logger
 
 
+def _log_settings() -> Dict[str, Optional[str]]:
+    return {key: os.environ.get(key) for key in _LOG_SETTINGS}
+
+
+def reload_log_settings() -> bool:
+    """
+    Rebuilds the pipeline if LOG_* variables changed since it was set up - AppConfig calls it after loading .env,
+    as the pipeline is built at import, before the .env file is read
+
+    Returns:
+        bool: True if the pipeline was rebuilt
+    """
+    if _applied is None or _applied[1] == _log_settings():
+        return False
+    define_log_level(*_applied[0])
+    return True
+
+
 # logger = define_log_level()
 _logger_instance = define_log_level()
 logger = _logger_instance
 
 
+@contextmanager
+def request_context(request_id: str) -> Iterator[str]:
+    """
+    Tags every log record emitted inside the block - & in tasks it starts - with 'request_id'
+    """
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+def current_request_id() -> str:
+    return _request_id.get()
+
+
+# Per-context override for 'log_llm_stream', so concurrent streaming requests each get their own tokens
+_llm_stream_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar("llm_stream_sink", default=None)
+
+
 def log_llm_stream(msg):
+    sink = _llm_stream_sink.get()
+    if sink is not None:
+        sink(msg)
+        return
     _llm_stream_log(msg)
 
 
+@contextmanager
+def llm_stream_context(func: Callable[[str], None]):
+    """
+    Routes 'log_llm_stream' to 'func' for the current context only
+    Tasks created inside the block inherit the sink, other requests keep the global logfunc
+    """
+    token = _llm_stream_sink.set(func)
+    try:
+        yield
+    finally:
+        _llm_stream_sink.reset(token)
+
+
 def set_llm_stream_logfunc(func):
     global _llm_stream_log
     _llm_stream_log = func
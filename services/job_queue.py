@@ -0,0 +1,387 @@
+import asyncio
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from configs.app_config import AppConfig
+from logs.logging_config import logger, request_context
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobQueue:
+    """
+    Durable, SQLite-backed queue of persona generation jobs
+
+    Every job row survives a restart. A claimed job is leased to one worker (this queue's 'worker_id')
+    until 'lease_expires_at', & the worker keeps extending the lease while it runs the job. Only jobs
+    whose lease ran out - their worker died - are put back in the queue, so several processes or
+    replicas can share the database. A job that was claimed 'max_attempts' times is failed instead
+    of being retried forever. Methods are blocking & meant to be called through 'asyncio.to_thread'
+    from the API & the workers.
+
+    Configuration values are retrieved from AppConfig:
+        > JOB_QUEUE_PATH (default: outputs/jobs.db)
+        > JOB_LEASE_SECONDS (default: 60) - how long a job stays claimed without a heartbeat
+        > JOB_MAX_ATTEMPTS (default: 3)
+    """
+
+    def __init__(self,
+                 db_path: str = "outputs/jobs.db",
+                 lease_seconds: float = 60.0,
+                 max_attempts: int = 3,
+                 worker_id: Optional[str] = None):
+        """
+        Args:
+            db_path (str): SQLite database file, created if missing
+            lease_seconds (float): How long a claim holds without being renewed
+            max_attempts (int): Claims after which an interrupted job is failed
+            worker_id (Optional[str]): Owner recorded on claimed jobs (default: host, pid & a random suffix)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = max(1.0, lease_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._init_schema()
+
+    @classmethod
+    def from_config(cls) -> "JobQueue":
+        config = AppConfig.get_config_instance()
+        return cls(
+            db_path=config.get("JOB_QUEUE_PATH", "outputs/jobs.db"),
+            lease_seconds=config.get_float("JOB_LEASE_SECONDS", 60.0),
+            max_attempts=config.get_int("JOB_MAX_ATTEMPTS", 3),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_schema(self):
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    username TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    worker_id TEXT,
+                    lease_expires_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at);
+                """
+            )
+            # Databases created before leases existed
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, definition in (("worker_id", "TEXT"), ("lease_expires_at", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {definition}")
+
+    def enqueue(self, username: str) -> Dict[str, Any]:
+        """
+        Adds a job for the given user
+
+        Args:
+            username (str): Reddit username to analyze
+
+        Returns:
+            Dict[str, Any]: The stored job
+        """
+        job_id = uuid.uuid4().hex
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, username, status, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, username, QUEUED, time.time()),
+            )
+        return self.get(job_id)
+
+    def _recover_expired(self, conn: sqlite3.Connection, now: float) -> int:
+        """
+        Re-queues running jobs whose lease ran out, or fails them once they've used up their attempts
+        (must run inside a transaction)
+        """
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?, worker_id = NULL, lease_expires_at = NULL "
+            "WHERE status = ? AND lease_expires_at < ? AND attempts >= ?",
+            (FAILED, f"Gave up after {self.max_attempts} interrupted attempts", now, RUNNING, now, self.max_attempts),
+        )
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, worker_id = NULL, lease_expires_at = NULL "
+            "WHERE status = ? AND (lease_expires_at IS NULL OR lease_expires_at < ?)",
+            (QUEUED, RUNNING, now),
+        )
+        return cursor.rowcount
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically leases the oldest queued job to this worker, after recovering expired leases
+
+        Returns:
+            Optional[Dict[str, Any]]: The claimed job, or None if the queue is empty
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                self._recover_expired(conn, now)
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, worker_id = ?, "
+                    "lease_expires_at = ? WHERE id = ?",
+                    (RUNNING, now, self.worker_id, now + self.lease_seconds, row["id"]),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def heartbeat(self, job_id: str) -> bool:
+        """
+        Extends this worker's lease on a running job
+
+        Returns:
+            bool: False if the lease was lost (it expired & the job was recovered elsewhere)
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = ? AND worker_id = ?",
+                (time.time() + self.lease_seconds, job_id, RUNNING, self.worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def _finish(self, job_id: str, status: str, column: str, value: str) -> bool:
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = ?, {column} = ?, finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND status = ? AND worker_id = ?",
+                (status, value, time.time(), job_id, RUNNING, self.worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, result: str) -> bool:
+        """
+        Marks a job this worker holds as done with its persona text
+
+        Returns:
+            bool: False if the lease was lost, in which case the job is left to its new owner
+        """
+        return self._finish(job_id, DONE, "result", result)
+
+    def fail(self, job_id: str, error: str) -> bool:
+        """
+        Marks a job this worker holds as failed with its error message
+
+        Returns:
+            bool: False if the lease was lost, in which case the job is left to its new owner
+        """
+        return self._finish(job_id, FAILED, "error", error)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns:
+            Optional[Dict[str, Any]]: The job row, or None if unknown
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def recover_expired(self) -> int:
+        """
+        Puts jobs whose worker stopped renewing its lease (eg - the process died) back in the queue,
+        failing those out of attempts. Jobs leased by live workers - in this process or another - are left alone
+
+        Returns:
+            int: Number of re-queued jobs
+        """
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                recovered = self._recover_expired(conn, time.time())
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return recovered
+
+    def release(self) -> int:
+        """
+        Hands the jobs this worker is running back to the queue on shutdown, without counting the attempt
+
+        Returns:
+            int: Number of released jobs
+        """
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, worker_id = NULL, lease_expires_at = NULL, "
+                "attempts = MAX(attempts - 1, 0) WHERE status = ? AND worker_id = ?",
+                (QUEUED, RUNNING, self.worker_id),
+            )
+            return cursor.rowcount
+
+    def stats(self, window: int = 100) -> Dict[str, Any]:
+        """
+        Reports queue depth & wait/run times
+
+        Args:
+            window (int): Number of most recently finished jobs used for the averages
+
+        Returns:
+            Dict[str, Any]: Counts per status, oldest queued wait & average wait/run seconds
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            counts = {
+                row["status"]: row["n"]
+                for row in conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+            }
+            oldest = conn.execute(
+                "SELECT MIN(created_at) FROM jobs WHERE status = ?", (QUEUED,)
+            ).fetchone()[0]
+            recent: List[sqlite3.Row] = conn.execute(
+                "SELECT created_at, started_at, finished_at FROM jobs "
+                "WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT ?",
+                (window,),
+            ).fetchall()
+
+        waits = [r["started_at"] - r["created_at"] for r in recent if r["started_at"]]
+        runs = [r["finished_at"] - r["started_at"] for r in recent if r["started_at"]]
+        return {
+            "depth": counts.get(QUEUED, 0),
+            "running": counts.get(RUNNING, 0),
+            "done": counts.get(DONE, 0),
+            "failed": counts.get(FAILED, 0),
+            "oldest_queued_seconds": (now - oldest) if oldest else 0.0,
+            "avg_wait_seconds": (sum(waits) / len(waits)) if waits else 0.0,
+            "avg_run_seconds": (sum(runs) / len(runs)) if runs else 0.0,
+        }
+
+
+class JobWorkerPool:
+    """
+    Pool of async workers that drain the JobQueue by running the persona workflow
+
+    Configuration values are retrieved from AppConfig:
+        > JOB_WORKERS (default: 2)
+        > JOB_POLL_SECONDS (default: 1.0) - idle poll interval, new jobs also wake workers directly
+    """
+
+    def __init__(self, queue: JobQueue, workflow, workers: int = 2, poll_seconds: float = 1.0):
+        """
+        Args:
+            queue (JobQueue): The durable queue to drain
+            workflow (PersonaWorkflow): Shared workflow used to run each job
+            workers (int): Number of concurrent worker tasks
+            poll_seconds (float): How long an idle worker sleeps before checking the queue again
+        """
+        self.queue = queue
+        self.workflow = workflow
+        self.workers = max(1, workers)
+        self.poll_seconds = poll_seconds
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_config(cls, queue: JobQueue, workflow) -> "JobWorkerPool":
+        config = AppConfig.get_config_instance()
+        return cls(
+            queue,
+            workflow,
+            workers=config.get_int("JOB_WORKERS", 2),
+            poll_seconds=config.get_float("JOB_POLL_SECONDS", 1.0),
+        )
+
+    async def start(self):
+        """
+        Recovers jobs with expired leases & starts the worker tasks
+        """
+        recovered = await asyncio.to_thread(self.queue.recover_expired)
+        if recovered:
+            logger.info(f"Re-queued {recovered} persona jobs whose worker stopped")
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        logger.info(f"Started {self.workers} persona job workers")
+
+    async def stop(self):
+        """
+        Cancels the worker tasks & hands their running jobs back to the queue
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        released = await asyncio.to_thread(self.queue.release)
+        if released:
+            logger.info(f"Released {released} running persona jobs back to the queue")
+
+    def notify(self):
+        """
+        Wakes idle workers after a job was enqueued
+        """
+        self._wakeup.set()
+
+    async def _worker(self, index: int):
+        while True:
+            job = await asyncio.to_thread(self.queue.claim_next)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            with request_context(f"job-{job['id']}"):
+                await self._process(index, job)
+
+    async def _heartbeat(self, job_id: str):
+        """
+        Renews the job's lease a few times per lease period while it runs
+        """
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await asyncio.to_thread(self.queue.heartbeat, job_id):
+                logger.warning(f"Lost the lease on persona job {job_id}, its result will be discarded")
+                return
+
+    async def _process(self, index: int, job: Dict[str, Any]):
+        """
+        Runs one claimed job through the workflow & records its outcome in the queue
+        """
+        logger.info(f"Worker {index} running persona job {job['id']} for {job['username']} (attempt {job['attempts']})")
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            result = await self.workflow.run(username=job["username"])
+            if result and result.get("response"):
+                await asyncio.to_thread(self.queue.complete, job["id"], result["response"])
+            else:
+                error = (result or {}).get("error", "Persona generation failed")
+                await asyncio.to_thread(self.queue.fail, job["id"], error)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Persona job {job['id']} failed: {e}")
+            await asyncio.to_thread(self.queue.fail, job["id"], str(e))
+        finally:
+            heartbeat.cancel()
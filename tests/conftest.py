@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+import pytest
+
+# Set before any app module is imported: AppConfig skips the .env file when credentials are present,
+# & logs go to a throwaway directory instead of logs/
+_LOG_DIR = tempfile.mkdtemp(prefix="persona-tests-logs-")
+for key, value in {
+    "GROQ_API_KEY": "test-groq-key",
+    "GROQ_MODEL_NAME": "meta-llama/llama-4-scout-17b-16e-instruct",
+    "REDDIT_CLIENT_ID": "test-client",
+    "REDDIT_CLIENT_SECRET": "test-secret",
+    "REDDIT_USER_AGENT": "test-agent",
+    "WORKFLOW_WARMUP": "startup",
+    "PERSONA_CACHE_ENABLED": "false",
+    "CORPUS_STORE_ENABLED": "false",
+    "LLM_CACHE_ENABLED": "false",
+    "LOG_DIR": _LOG_DIR,
+    "LOG_LEVEL": "WARNING",
+}.items():
+    os.environ.setdefault(key, value)
+
+from benchmarks.fakes import Cassette  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs every test in its own directory, so stores & persona files under outputs/ never leak between tests
+    """
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def cassette() -> Cassette:
+    return Cassette.synthetic(users=3, items=12, words=40, seed=11)
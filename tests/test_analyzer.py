@@ -0,0 +1,215 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.fakes import COMMENT, SUBMISSION, Cassette, ReplayChatModel, ReplayReddit
+from core.llm import CachedLLM
+from core.llm_cache import LLMResponseCache
+from core.reddit_scraper import RedditScraper
+from document_processing.analyzer import MAP_REDUCE, SINGLE, PersonaAnalyzer
+
+USER = "bench_user_0"
+
+
+class ScriptedChatModel(ReplayChatModel):
+    """
+    Replays cited JSON findings to map-step prompts & a cited persona to everything else, & keeps every prompt
+    """
+
+    def __init__(self, cassette: Cassette, quote: str, fail_first: int = 0, error: type = None):
+        super().__init__(cassette)
+        self.quote = quote
+        self.prompts = []
+        self.fail_first = fail_first
+        self.error = error or RateLimited
+
+    def _reply(self, prompt):
+        self.prompts.append(prompt)
+        self.calls += 1
+        if self.fail_first:
+            self.fail_first -= 1
+            raise self.error()
+        if "extract evidence for a user persona" in prompt:
+            return json.dumps({"Occupation": [{"value": "Engineer", "citation": self.quote}]})
+        return f'</> Occupation: Engineer\nCited from: "{self.quote}"'
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class BadGateway(Exception):
+    status_code = 502
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def _quote(cassette: Cassette) -> str:
+    return " ".join(cassette.listing(USER, COMMENT)[0]["body"].split()[:6])
+
+
+def _workflow(cassette: Cassette, llm):
+    from workflows.workflow import PersonaWorkflow
+
+    scraper = RedditScraper(reddit_factory=ReplayReddit.factory(cassette))
+    return PersonaWorkflow(scraper=scraper, analyzer=PersonaAnalyzer(llm=llm))
+
+
+@pytest.mark.parametrize("mode, budget, expected", [
+    (SINGLE, "200", False),
+    (MAP_REDUCE, "", True),
+    ("auto", "", False),
+    ("auto", "200", True),
+])
+def test_needs_map_reduce(monkeypatch, cassette, mode, budget, expected):
+    monkeypatch.setenv("PERSONA_MODE", mode)
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", budget)
+    analyzer = PersonaAnalyzer(llm=ReplayChatModel(cassette))
+    posts = [thing["selftext"] for thing in cassette.listing(USER, SUBMISSION)]
+    comments = [thing["body"] for thing in cassette.listing(USER, COMMENT)]
+
+    assert analyzer.needs_map_reduce(posts, comments, USER) is expected
+
+
+def test_prompt_budget_defaults_to_the_context_window(monkeypatch, cassette):
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "")
+    monkeypatch.setenv("LLM_MAX_COMPLETION_TOKENS", "2048")
+    assert PersonaAnalyzer(llm=ReplayChatModel(cassette)).prompt_builder.prompt_token_budget == 131072 - 2048
+
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "6000")
+    assert PersonaAnalyzer(llm=ReplayChatModel(cassette)).prompt_builder.prompt_token_budget == 6000
+
+
+def test_large_history_goes_through_map_reduce_with_every_item(monkeypatch, cassette):
+    monkeypatch.setenv("PERSONA_MODE", "auto")
+    monkeypatch.setenv("PROMPT_TOKEN_BUDGET", "700")
+    monkeypatch.setenv("MAP_REDUCE_CHUNK_TOKENS", "400")
+    monkeypatch.setenv("REDDIT_FETCH_LIMIT", "12")
+    monkeypatch.setenv("RETRIEVAL_TOP_K", "1")
+    llm = ScriptedChatModel(cassette, _quote(cassette))
+
+    result = asyncio.run(_workflow(cassette, llm).run(USER))
+
+    assert "Engineer" in result["response"]
+    map_prompts = [p for p in llm.prompts if "extract evidence for a user persona" in p]
+    assert len(map_prompts) > 1
+    # Retrieval would have narrowed the history down to the top matches - map-reduce reads all of it
+    sent = "\n".join(map_prompts)
+    for thing in cassette.listing(USER, COMMENT):
+        assert " ".join(thing["body"].split()[:8]) in sent
+
+
+def test_retrieval_is_skipped_for_map_reduce_histories(monkeypatch, cassette):
+    from langchain_core.documents import Document
+
+    from workflows.graphs.persona.nodes.retriever_node import RetrieverNode
+    from workflows.state import NodeState
+
+    comments = [thing["body"] for thing in cassette.listing(USER, COMMENT)]
+    state = NodeState(username=USER, comments=comments, documents=[
+        Document(page_content=text, metadata={"id": f"t1_{i}", "kind": COMMENT}) for i, text in enumerate(comments)
+    ])
+
+    def retrieve(mode: str) -> dict:
+        monkeypatch.setenv("PERSONA_MODE", mode)
+        node = RetrieverNode(analyzer=PersonaAnalyzer(llm=ReplayChatModel(cassette)))
+        return asyncio.run(node.process(state.model_copy())).evidence
+
+    assert retrieve(MAP_REDUCE) == {}
+    assert retrieve(SINGLE)
+
+
+def test_map_reduce_skips_failed_chunks(monkeypatch, cassette):
+    monkeypatch.setenv("MAP_REDUCE_CHUNK_TOKENS", "300")
+    llm = ScriptedChatModel(cassette, _quote(cassette))
+    analyzer = PersonaAnalyzer(llm=llm)
+    original = analyzer._complete
+    calls = {"n": 0}
+
+    async def flaky_complete(prompt, stream=False):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise RuntimeError("chunk failed")
+        return await original(prompt, stream=stream)
+
+    analyzer._complete = flaky_complete
+    comments = [thing["body"] for thing in cassette.listing(USER, COMMENT)]
+
+    persona = asyncio.run(analyzer.analyze_user_map_reduce_async(USER, [], comments))
+
+    assert "Engineer" in persona
+    assert 'seen in' in llm.prompts[-1]
+
+
+@pytest.mark.parametrize("error", [RateLimited, BadGateway, TimeoutError, ConnectionError])
+def test_rate_limited_and_transient_failures_are_retried(monkeypatch, cassette, error):
+    monkeypatch.setenv("RATE_RETRY_BASE_SECONDS", "0.01")
+    monkeypatch.setenv("RATE_RETRY_CAP_SECONDS", "0.01")
+    llm = ScriptedChatModel(cassette, _quote(cassette), fail_first=2, error=error)
+    analyzer = PersonaAnalyzer(llm=llm)
+
+    persona = asyncio.run(analyzer.analyze_user_async(USER, ["Some post"], ["Some comment"]))
+
+    assert "Engineer" in persona
+    assert llm.calls == 3
+
+
+def test_client_errors_are_not_retried(monkeypatch, cassette):
+    monkeypatch.setenv("RATE_RETRY_BASE_SECONDS", "0.01")
+    llm = ScriptedChatModel(cassette, _quote(cassette), fail_first=2, error=BadRequest)
+
+    with pytest.raises(BadRequest):
+        asyncio.run(PersonaAnalyzer(llm=llm).analyze_user_async(USER, ["Some post"], ["Some comment"]))
+    assert llm.calls == 1
+
+
+def test_persona_cache_skips_the_llm_for_unchanged_history(monkeypatch, cassette):
+    monkeypatch.setenv("PERSONA_CACHE_ENABLED", "true")
+    llm = ReplayChatModel(cassette)
+    workflow = _workflow(cassette, llm)
+
+    first = asyncio.run(workflow.run(USER))
+    calls = llm.calls
+    second = asyncio.run(workflow.run(USER))
+
+    assert calls > 0
+    assert llm.calls == calls
+    assert second["response"] == first["response"]
+
+    listing = cassette.listing(USER, COMMENT)
+    cassette.record_listing(USER, COMMENT, [{**listing[0], "fullname": "t1_new", "body": "Brand new comment"}] + listing)
+    asyncio.run(workflow.run(USER))
+    assert llm.calls > calls
+
+
+def test_llm_cache_serves_repeated_prompts(cassette):
+    llm = ReplayChatModel(cassette, default_reply="cached answer")
+    cache = LLMResponseCache(db_path="outputs/.cache/llm.db")
+    cached = CachedLLM(llm, cache, model="test-model", temperature=0.3)
+
+    async def _run():
+        first = await cached.ainvoke("same prompt")
+        second = await cached.ainvoke("same prompt")
+        streamed = [chunk.content async for chunk in cached.astream("other prompt")]
+        replayed = [chunk.content async for chunk in cached.astream("other prompt")]
+        return first, second, streamed, replayed
+
+    first, second, streamed, replayed = asyncio.run(_run())
+
+    assert first.content == second.content == "cached answer"
+    assert "".join(streamed) == "".join(replayed) == "cached answer"
+    assert llm.calls == 2
+    assert cache.stats()["hits"] == 2
+
+    # The SQLite tier survives a restart
+    reopened = CachedLLM(llm, LLMResponseCache(db_path="outputs/.cache/llm.db"), model="test-model", temperature=0.3)
+    assert asyncio.run(reopened.ainvoke("same prompt")).content == "cached answer"
+    assert llm.calls == 2
+
+    # Another temperature is another request
+    other = CachedLLM(llm, cache, model="test-model", temperature=0.9)
+    asyncio.run(other.ainvoke("same prompt"))
+    assert llm.calls == 3
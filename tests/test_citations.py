@@ -0,0 +1,72 @@
+import asyncio
+
+from benchmarks.fakes import COMMENT, Cassette, ReplayChatModel, ReplayReddit
+from core.reddit_scraper import RedditScraper
+from document_processing.analyzer import PersonaAnalyzer
+from document_processing.citation_index import CitationIndex, summarize
+
+USER = "bench_user_0"
+
+ITEMS = [
+    {"id": "t1_a", "permalink": "/r/x/comments/a/", "text": "I work as a nurse on night shifts, it's exhausting but rewarding."},
+    {"id": "t3_b", "permalink": "/r/x/comments/b/", "text": "Title: Weekend plans\nBody: Hiking with my dog Biscuit in the Rockies."},
+    {"id": "t1_c", "permalink": "/r/x/comments/c/", "text": "Lol"},
+]
+
+
+def test_find_matches_a_quote_ignoring_case_and_punctuation():
+    index = CitationIndex(ITEMS)
+
+    assert index.find("I work as a NURSE on night-shifts")["id"] == "t1_a"
+    assert index.find("hiking with my dog biscuit")["id"] == "t3_b"
+    assert index.find("lol")["id"] == "t1_c"
+
+
+def test_find_requires_whole_words_and_the_full_quote():
+    index = CitationIndex(ITEMS)
+
+    assert index.find("work as a doctor on night shifts") is None
+    assert index.find("nurs") is None
+    assert index.find("") is None
+
+
+def test_ellipsis_fragments_must_come_from_the_same_item():
+    index = CitationIndex(ITEMS)
+
+    assert index.find("I work as a nurse ... exhausting but rewarding")["id"] == "t1_a"
+    assert index.find("I work as a nurse … hiking with my dog") is None
+
+
+def test_verify_flags_fabricated_citations():
+    persona = "\n".join([
+        "</> Occupation: Nurse",
+        'Cited from: "I work as a nurse on night shifts"',
+        "</> Pets: Dog",
+        "Cited from: “Hiking with my dog Biscuit”",
+        "</> Income: High",
+        'Cited from: "I make six figures"',
+        "</> Age: Unknown",
+        "Cited from: Not explicitly mentioned",
+    ])
+
+    results = CitationIndex(ITEMS).verify(persona)
+
+    assert [r["verified"] for r in results] == [True, True, False, False]
+    assert results[0]["source_id"] == "t1_a"
+    assert results[1]["permalink"] == "/r/x/comments/b/"
+    assert results[2]["source_id"] is None
+    assert summarize(results) == {"citations": 4, "verified": 2, "fabricated": 2}
+
+
+def test_workflow_reports_verified_and_fabricated_citations(cassette: Cassette):
+    quote = " ".join(cassette.listing(USER, COMMENT)[0]["body"].split()[:8])
+    reply = f'</> Hobby: Reading\nCited from: "{quote}"\n</> Job: Pilot\nCited from: "I fly planes for a living"'
+    scraper = RedditScraper(reddit_factory=ReplayReddit.factory(cassette))
+    analyzer = PersonaAnalyzer(llm=ReplayChatModel(cassette, default_reply=reply))
+    from workflows.workflow import PersonaWorkflow
+
+    result = asyncio.run(PersonaWorkflow(scraper=scraper, analyzer=analyzer).run(USER))
+
+    citations = result["citations"]
+    assert [c["verified"] for c in citations] == [True, False]
+    assert citations[0]["source_id"] == cassette.listing(USER, COMMENT)[0]["fullname"]
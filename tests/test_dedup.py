@@ -0,0 +1,111 @@
+import asyncio
+import random
+
+from benchmarks.fakes import COMMENT, ReplayChatModel, ReplayReddit
+from core.reddit_scraper import RedditScraper
+from document_processing.analyzer import PersonaAnalyzer
+from document_processing.dedup import NearDuplicateFilter
+
+_VOCABULARY = [f"word{i}" for i in range(2000)]
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_VOCABULARY) for _ in range(words))
+
+
+def test_exact_copies_are_collapsed_ignoring_case_and_whitespace():
+    texts = ["Totally agree with this!", "totally   agree with THIS", "Something else entirely here"]
+
+    result = NearDuplicateFilter().dedupe(texts)
+
+    assert result.kept == [0, 2]
+    assert result.counts == {0: 2, 2: 1}
+    assert result.removed == 1
+
+
+def test_minor_edits_are_collapsed_into_the_earliest_item():
+    rng = random.Random(1)
+    original = _text(rng, 60)
+    words = original.split()
+    edited = " ".join(words[:30] + ["indeed"] + words[30:])
+    texts = [_text(rng, 40), original, edited, _text(rng, 40)]
+
+    result = NearDuplicateFilter().dedupe(texts)
+
+    assert result.kept == [0, 1, 3]
+    assert result.counts[1] == 2
+
+
+def _jaccard(a: str, b: str, k: int = 3) -> float:
+    def shingles(text: str) -> set:
+        words = text.split()
+        return {" ".join(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+
+    sa, sb = shingles(a), shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_recall_on_near_duplicate_pairs():
+    rng = random.Random(7)
+    texts, duplicates = [], []
+    while len(duplicates) < 200:
+        words = [rng.choice(_VOCABULARY) for _ in range(rng.randint(10, 120))]
+        edited = list(words)
+        for _ in range(rng.randint(1, max(1, len(words) // 25))):
+            edited.insert(rng.randrange(len(edited) + 1), rng.choice(_VOCABULARY))
+        original, edited = " ".join(words), " ".join(edited)
+        # Only pairs at or above the filter's threshold count as duplicates
+        if _jaccard(original, edited) < 0.8:
+            continue
+        texts.append(original)
+        duplicates.append(len(texts))
+        texts.append(edited)
+    texts += [_text(rng, rng.randint(5, 100)) for _ in range(1000)]
+
+    result = NearDuplicateFilter().dedupe(texts)
+
+    kept = set(result.kept)
+    assert sum(1 for index in duplicates if index not in kept) == len(duplicates)
+    # Unrelated texts are never merged
+    assert result.removed == len(duplicates)
+
+
+def test_pairs_below_the_threshold_are_kept_apart():
+    rng = random.Random(3)
+    words = [rng.choice(_VOCABULARY) for _ in range(40)]
+    # Rewriting every fifth word leaves no shingle of three words intact in most places
+    rewritten = [rng.choice(_VOCABULARY) if i % 5 == 0 else word for i, word in enumerate(words)]
+
+    result = NearDuplicateFilter().dedupe([" ".join(words), " ".join(rewritten)])
+
+    assert result.kept == [0, 1]
+
+
+def test_short_texts_are_not_lumped_together():
+    texts = ["lol", "same", "this", "nice one", "thanks"]
+
+    assert NearDuplicateFilter().dedupe(texts).kept == [0, 1, 2, 3, 4]
+
+
+class _PromptRecorder(ReplayChatModel):
+    def _reply(self, prompt):
+        self.prompts = getattr(self, "prompts", []) + [prompt]
+        return super()._reply(prompt)
+
+
+def test_workflow_reports_collapsed_items_and_marks_them_in_the_prompt(monkeypatch, cassette):
+    monkeypatch.setenv("RETRIEVAL_TOP_K", "0")
+    from workflows.workflow import PersonaWorkflow
+
+    user = "bench_user_0"
+    listing = cassette.listing(user, COMMENT)
+    copies = [{**listing[0], "fullname": f"t1_copy{i}"} for i in range(2)]
+    cassette.record_listing(user, COMMENT, copies + listing)
+    llm = _PromptRecorder(cassette)
+    scraper = RedditScraper(reddit_factory=ReplayReddit.factory(cassette))
+
+    result = asyncio.run(PersonaWorkflow(scraper=scraper, analyzer=PersonaAnalyzer(llm=llm)).run(user))
+
+    assert result["dedup"]["removed"] == 2
+    assert result["dedup"]["tokens_saved"] > 0
+    assert f"{listing[0]['body']} (posted 3×)" in llm.prompts[-1]
@@ -0,0 +1,125 @@
+import asyncio
+import json
+
+import httpx
+
+from api.main import app, lifespan
+from benchmarks.fakes import Cassette, build_offline_workflow
+from core.persona_store import PersonaStore
+from services.job_queue import DONE, FAILED, QUEUED
+
+
+def _call(cassette: Cassette, requests):
+    """
+    Starts the app on the offline fakes, runs 'requests(client)' against it & returns what it returned
+    """
+    async def _run():
+        app.state.workflow_factory = lambda: build_offline_workflow(cassette)
+        try:
+            async with lifespan(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    return await requests(client)
+        finally:
+            app.state.workflow_factory = None
+
+    return asyncio.run(_run())
+
+
+def _ndjson(response: httpx.Response) -> list:
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def test_generate_persona(cassette):
+    async def requests(client):
+        return await client.post("/api/generate-persona", json={"reddit_url": "https://www.reddit.com/user/bench_user_0/"})
+
+    response = _call(cassette, requests)
+
+    assert response.status_code == 200
+    assert "persona" in response.json()
+
+
+def test_bulk_streams_one_line_per_unique_user(cassette):
+    users = ["bench_user_0", "u/bench_user_1", "https://www.reddit.com/user/bench_user_2/", "BENCH_USER_0", "not a user!"]
+
+    async def requests(client):
+        return await client.post("/api/generate-persona/bulk", json={"users": users, "max_concurrency": 2})
+
+    response = _call(cassette, requests)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = _ndjson(response)
+    assert lines[0] == {"username": "not a user!", "status": "error", "error": "Invalid Reddit username or URL"}
+    ok = {line["username"]: line for line in lines[1:]}
+    assert sorted(ok) == ["bench_user_0", "bench_user_1", "bench_user_2"]
+    assert all(line["status"] == "ok" and line["persona"] for line in ok.values())
+
+
+def test_bulk_rejects_too_many_users(monkeypatch, cassette):
+    monkeypatch.setenv("BULK_MAX_USERS", "2")
+
+    async def requests(client):
+        return await client.post("/api/generate-persona/bulk", json={"users": ["aaa", "bbb", "ccc"]})
+
+    response = _call(cassette, requests)
+
+    assert response.status_code == 400
+
+
+def test_persona_job_runs_to_completion(monkeypatch, cassette):
+    monkeypatch.setenv("JOB_POLL_SECONDS", "0.05")
+
+    async def requests(client):
+        created = await client.post("/api/personas/jobs", json={"reddit_url": "https://www.reddit.com/user/bench_user_1/"})
+        job = created.json()
+        for _ in range(200):
+            polled = (await client.get(f"/api/personas/jobs/{job['id']}")).json()
+            if polled["status"] in (DONE, FAILED):
+                break
+            await asyncio.sleep(0.02)
+        stats = (await client.get("/api/personas/jobs/stats")).json()
+        missing = await client.get("/api/personas/jobs/no-such-job")
+        return created, polled, stats, missing
+
+    created, polled, stats, missing = _call(cassette, requests)
+
+    assert created.status_code == 202
+    assert created.json()["status"] == QUEUED
+    assert polled["status"] == DONE
+    assert polled["result"]
+    assert stats["done"] == 1 and stats["depth"] == 0
+    assert missing.status_code == 404
+
+
+def test_generated_personas_are_searchable(cassette):
+    async def requests(client):
+        await client.post("/api/generate-persona", json={"reddit_url": "https://www.reddit.com/user/bench_user_0/"})
+        found = await client.get("/api/personas/search", params={"q": "stand-in"})
+        stored = await client.get("/api/personas/bench_user_0")
+        missing = await client.get("/api/personas/nobody_here")
+        return found, stored, missing
+
+    found, stored, missing = _call(cassette, requests)
+
+    assert [result["username"] for result in found.json()["results"]] == ["bench_user_0"]
+    assert stored.json()["attributes"][0]["label"] == "Name"
+    assert missing.status_code == 404
+
+
+def test_personas_are_generated_when_the_store_cant_be_opened(monkeypatch, cassette):
+    def broken(cls):
+        raise RuntimeError("no such module: fts5")
+
+    monkeypatch.setattr(PersonaStore, "from_config", classmethod(broken))
+
+    async def requests(client):
+        generated = await client.post("/api/generate-persona", json={"reddit_url": "https://www.reddit.com/user/bench_user_0/"})
+        searched = await client.get("/api/personas/search", params={"q": "stand-in"})
+        return generated, searched
+
+    generated, searched = _call(cassette, requests)
+
+    assert generated.status_code == 200
+    assert searched.status_code == 503
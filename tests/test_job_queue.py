@@ -0,0 +1,149 @@
+import asyncio
+import sqlite3
+import time
+
+from services.job_queue import DONE, FAILED, QUEUED, RUNNING, JobQueue, JobWorkerPool
+
+
+def _queue(worker_id: str, lease_seconds: float = 60.0, max_attempts: int = 3) -> JobQueue:
+    return JobQueue("outputs/jobs.db", lease_seconds=lease_seconds, max_attempts=max_attempts, worker_id=worker_id)
+
+
+def _expire_leases(queue: JobQueue):
+    with sqlite3.connect(queue.db_path) as conn:
+        conn.execute("UPDATE jobs SET lease_expires_at = ? WHERE status = ?", (time.time() - 1, RUNNING))
+
+
+def test_claims_jobs_oldest_first_with_a_lease():
+    queue = _queue("a")
+    first = queue.enqueue("first_user")
+    queue.enqueue("second_user")
+
+    job = queue.claim_next()
+
+    assert job["id"] == first["id"]
+    assert job["status"] == RUNNING
+    assert job["worker_id"] == "a"
+    assert job["attempts"] == 1
+    assert job["lease_expires_at"] > time.time()
+
+
+def test_claim_on_an_empty_queue_returns_none():
+    assert _queue("a").claim_next() is None
+
+
+def test_live_leases_of_other_workers_are_left_alone():
+    a, b = _queue("a"), _queue("b")
+    job = a.enqueue("some_user")
+    a.claim_next()
+
+    assert b.recover_expired() == 0
+    assert b.claim_next() is None
+    assert b.get(job["id"])["worker_id"] == "a"
+
+
+def test_expired_lease_is_requeued_and_claimed_by_another_worker():
+    a, b = _queue("a"), _queue("b")
+    job = a.enqueue("some_user")
+    a.claim_next()
+    _expire_leases(a)
+
+    claimed = b.claim_next()
+
+    assert claimed["id"] == job["id"]
+    assert claimed["worker_id"] == "b"
+    assert claimed["attempts"] == 2
+    # The first worker lost the job: its heartbeat & result are refused
+    assert a.heartbeat(job["id"]) is False
+    assert a.complete(job["id"], "stale persona") is False
+    assert b.complete(job["id"], "persona") is True
+    assert b.get(job["id"])["status"] == DONE
+
+
+def test_job_fails_after_max_attempts():
+    a, b = _queue("a", max_attempts=2), _queue("b", max_attempts=2)
+    job = a.enqueue("crashy_user")
+    a.claim_next()
+    _expire_leases(a)
+    b.claim_next()
+    _expire_leases(b)
+
+    assert a.claim_next() is None
+    failed = a.get(job["id"])
+    assert failed["status"] == FAILED
+    assert "2 interrupted attempts" in failed["error"]
+
+
+def test_heartbeat_extends_the_lease():
+    queue = _queue("a", lease_seconds=5)
+    job = queue.enqueue("some_user")
+    before = queue.claim_next()["lease_expires_at"]
+    time.sleep(0.01)
+
+    assert queue.heartbeat(job["id"]) is True
+    assert queue.get(job["id"])["lease_expires_at"] > before
+
+
+def test_release_requeues_own_jobs_without_counting_the_attempt():
+    a, b = _queue("a"), _queue("b")
+    mine = a.enqueue("user_a")
+    theirs = a.enqueue("user_b")
+    a.claim_next()
+    b.claim_next()
+
+    assert a.release() == 1
+    assert a.get(mine["id"])["status"] == QUEUED
+    assert a.get(mine["id"])["attempts"] == 0
+    assert a.get(theirs["id"])["status"] == RUNNING
+
+
+def test_running_jobs_of_a_pre_lease_database_are_recovered(workdir):
+    db_path = workdir / "old.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE jobs (id TEXT PRIMARY KEY, username TEXT NOT NULL, status TEXT NOT NULL, result TEXT, "
+            "error TEXT, attempts INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        conn.execute("INSERT INTO jobs VALUES ('old', 'some_user', 'running', NULL, NULL, 1, 1, 1, NULL)")
+
+    queue = JobQueue(str(db_path), worker_id="a")
+
+    assert queue.recover_expired() == 1
+    assert queue.claim_next()["id"] == "old"
+
+
+class _FakeWorkflow:
+    def __init__(self):
+        self.users = []
+
+    async def run(self, username: str):
+        self.users.append(username)
+        if username == "broken_user":
+            return {"error": "Reddit said no"}
+        return {"response": f"Persona of {username}"}
+
+
+def test_worker_pool_drains_the_queue():
+    queue = _queue("pool", lease_seconds=3)
+    ok = queue.enqueue("good_user")
+    broken = queue.enqueue("broken_user")
+    workflow = _FakeWorkflow()
+
+    async def _drain():
+        pool = JobWorkerPool(queue, workflow, workers=2, poll_seconds=0.05)
+        await pool.start()
+        try:
+            for _ in range(100):
+                if {queue.get(ok["id"])["status"], queue.get(broken["id"])["status"]} <= {DONE, FAILED}:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await pool.stop()
+
+    asyncio.run(_drain())
+
+    assert queue.get(ok["id"])["status"] == DONE
+    assert queue.get(ok["id"])["result"] == "Persona of good_user"
+    assert queue.get(broken["id"])["status"] == FAILED
+    assert queue.get(broken["id"])["error"] == "Reddit said no"
+    assert sorted(workflow.users) == ["broken_user", "good_user"]
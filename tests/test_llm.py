@@ -0,0 +1,33 @@
+import asyncio
+
+from core.llm import LLMManager
+
+
+def test_clients_are_rebuilt_after_aclose():
+    first = LLMManager.get_llm(temperature=0.5)
+    assert LLMManager.get_llm(temperature=0.5) is first
+
+    asyncio.run(LLMManager.aclose())
+    second = LLMManager.get_llm(temperature=0.5)
+
+    assert second is not first
+    assert LLMManager.connection_stats()["clients"] == 1
+    assert not LLMManager()._llm.http.async_client.is_closed
+
+
+def test_semaphore_works_across_event_loops(monkeypatch):
+    monkeypatch.setenv("LLM_MAX_CONCURRENCY", "1")
+    monkeypatch.setattr(LLMManager, "_semaphores", type(LLMManager._semaphores)())
+
+    async def _contend():
+        async def _call():
+            async with LLMManager.get_semaphore():
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(_call() for _ in range(3)))
+        return LLMManager.get_semaphore()
+
+    first = asyncio.run(_contend())
+    second = asyncio.run(_contend())
+
+    assert first is not second
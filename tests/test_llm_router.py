@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from core.llm_router import CLOSED, Backend, BackendError, LLMRouter, RoutedChatModel
+
+
+def _router(statuses: dict) -> LLMRouter:
+    """
+    Router over one fake backend per entry of 'statuses' (backend name -> HTTP status it answers with)
+    """
+    def handler(request: httpx.Request) -> httpx.Response:
+        name = request.url.host
+        if statuses[name] == 200:
+            return httpx.Response(200, json={"choices": [{"message": {"content": f"from {name}"}}]})
+        return httpx.Response(statuses[name], text="nope")
+
+    transport = httpx.MockTransport(handler)
+    http = SimpleNamespace(client=httpx.Client(transport=transport), async_client=httpx.AsyncClient(transport=transport))
+    backends = [Backend(name, f"http://{name}/v1", "model", failure_threshold=1) for name in statuses]
+    return LLMRouter(backends, http, hedge_enabled=False)
+
+
+def test_server_errors_fail_over_and_open_the_breaker():
+    router = _router({"a": 502, "b": 200})
+
+    assert asyncio.run(router.acomplete("hi")) == "from b"
+    assert router.failovers == 1
+    assert router.complete("hi") == "from b"
+    assert router.backends[0].state != CLOSED
+
+
+@pytest.mark.parametrize("status", [400, 401, 429])
+def test_client_errors_are_raised_without_failover(status):
+    router = _router({"a": status, "b": status})
+
+    with pytest.raises(BackendError) as error:
+        asyncio.run(router.acomplete("hi"))
+    assert error.value.status_code == status
+    with pytest.raises(BackendError):
+        router.complete("hi")
+
+    assert router.failovers == 0
+    assert sum(backend.requests for backend in router.backends) == 2
+    assert all(backend.state == CLOSED and backend.failures == 0 for backend in router.backends)
+
+
+def test_routed_chat_model_streams_blocking_and_async():
+    model = RoutedChatModel(_router({"a": 200}))
+
+    async def _astream():
+        return [chunk.content async for chunk in model.astream("hi")]
+
+    assert [chunk.content for chunk in model.stream("hi")] == ["from a"]
+    assert asyncio.run(_astream()) == ["from a"]
@@ -0,0 +1,39 @@
+import os
+import time
+
+from core.persona_cache import PersonaCache
+
+
+def _entries(cache: PersonaCache) -> list:
+    return sorted(path.name for path in cache.cache_dir.glob("*.json"))
+
+
+def _age(cache: PersonaCache, username: str, seconds: float):
+    path = cache._disk_path(cache.fingerprint(username, [], []))
+    written_at = time.time() - seconds
+    os.utime(path, (written_at, written_at))
+
+
+def test_disk_tier_keeps_the_newest_entries_up_to_its_cap():
+    cache = PersonaCache(cache_dir="outputs/.cache")
+    (cache.cache_dir / "llm.db").write_text("not a persona")
+    for age, username in [(300, "oldest"), (200, "older"), (100, "old")]:
+        cache.set(username, [], [], f"Persona of {username}")
+        _age(cache, username, age)
+
+    cache.max_disk_entries = 2
+    cache.set("new", [], [], "Persona of new")
+
+    assert _entries(cache) == sorted(cache.fingerprint(name, [], []) + ".json" for name in ("old", "new"))
+    assert (cache.cache_dir / "llm.db").exists()
+
+
+def test_expired_disk_entries_are_deleted_on_write():
+    cache = PersonaCache(ttl_seconds=60, cache_dir="outputs/.cache")
+    cache.set("stale", [], [], "Old persona")
+    _age(cache, "stale", 120)
+
+    cache.set("fresh", [], [], "New persona")
+
+    assert _entries(cache) == [cache.fingerprint("fresh", [], []) + ".json"]
+    assert PersonaCache(ttl_seconds=60, cache_dir="outputs/.cache").get("fresh", [], []) == "New persona"
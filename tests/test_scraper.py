@@ -0,0 +1,95 @@
+from benchmarks.fakes import SUBMISSION, Cassette, ReplayReddit
+from core.corpus_store import CorpusStore
+from core.reddit_scraper import RedditScraper
+
+USER = "bench_user_0"
+
+
+def _scraper(cassette: Cassette, full_refresh_seconds: int = 86400) -> RedditScraper:
+    scraper = RedditScraper(reddit_factory=ReplayReddit.factory(cassette))
+    scraper.corpus_store = CorpusStore("outputs/corpus.db", full_refresh_seconds=full_refresh_seconds)
+    return scraper
+
+
+def _post_new_submissions(cassette: Cassette, count: int) -> list:
+    """
+    Puts 'count' new submissions on top of the user's listing, newest first, & returns their fullnames
+    """
+    listing = cassette.listing(USER, SUBMISSION)
+    newest = listing[0]["created_utc"]
+    new = [
+        {
+            "fullname": f"t3_new{i:04d}",
+            "created_utc": newest + 60 * (count - i),
+            "permalink": f"/r/bench/comments/new{i:04d}/",
+            "title": f"New post {i}",
+            "selftext": f"Something new number {i}",
+        }
+        for i in range(count)
+    ]
+    cassette.record_listing(USER, SUBMISSION, new + listing)
+    return [thing["fullname"] for thing in new]
+
+
+def _ids(items: list) -> list:
+    return [item["id"] for item in items]
+
+
+def test_first_visit_fetches_latest_items(cassette):
+    posts, comments = _scraper(cassette).fetch_user_items(USER, limit=5)
+
+    expected = [thing["fullname"] for thing in cassette.listing(USER, SUBMISSION)[:5]]
+    assert _ids(posts) == expected
+    assert len(comments) == 5
+    assert posts[0]["text"].startswith("Title: ")
+
+
+def test_repeat_visit_only_fetches_new_items(cassette):
+    scraper = _scraper(cassette)
+    first, _ = scraper.fetch_user_items(USER, limit=5)
+    new_ids = _post_new_submissions(cassette, 2)
+
+    posts, _ = scraper.fetch_user_items(USER, limit=5)
+
+    assert _ids(posts) == new_ids + _ids(first)[:3]
+
+
+def test_more_new_items_than_the_limit_falls_back_to_a_full_fetch(cassette):
+    scraper = _scraper(cassette)
+    scraper.fetch_user_items(USER, limit=5)
+    new_ids = _post_new_submissions(cassette, 7)
+
+    posts, _ = scraper.fetch_user_items(USER, limit=5)
+
+    # Reddit answers 'before' with the 5 items right after the cursor, the newest two would be missed
+    assert _ids(posts) == new_ids[:5]
+
+
+def test_full_refresh_drops_items_deleted_on_reddit(cassette):
+    scraper = _scraper(cassette, full_refresh_seconds=-1)
+    first, _ = scraper.fetch_user_items(USER, limit=5)
+    deleted = first[1]["id"]
+    listing = cassette.listing(USER, SUBMISSION)
+    cassette.record_listing(USER, SUBMISSION, [thing for thing in listing if thing["fullname"] != deleted])
+
+    posts, _ = scraper.fetch_user_items(USER, limit=5)
+    stored, _ = scraper.corpus_store.all_items(USER)
+
+    assert deleted not in _ids(posts)
+    assert deleted not in _ids(stored)
+    assert len(stored) == 5
+
+
+def test_scrapes_without_a_corpus_store(cassette):
+    scraper = RedditScraper(reddit_factory=ReplayReddit.factory(cassette))
+    assert scraper.corpus_store is None
+
+    posts, comments = scraper.fetch_user_data(USER, limit=3)
+
+    assert len(posts) == 3 and len(comments) == 3
+
+
+def test_unknown_user_yields_nothing(cassette):
+    posts, comments = _scraper(cassette).fetch_user_items("nobody_here", limit=5)
+
+    assert posts == [] and comments == []
@@ -1,4 +1,10 @@
+import asyncio
+from typing import Optional
+
+from core.corpus_store import SUBMISSION
+from core.persona_cache import PersonaCache
 from document_processing.analyzer import PersonaAnalyzer
+from document_processing.dedup import with_count
 from logs.logging_config import logger
 from workflows.state import NodeState
 
@@ -6,10 +12,27 @@ from workflows.state import NodeState
 class AnalyzerNode:
     """Node responsible for analyzing Reddit posts to extract traits."""
 
-    def __init__(self):
-        self.analyzer = PersonaAnalyzer()
+    def __init__(self, analyzer: Optional[PersonaAnalyzer] = None):
+        self.analyzer = analyzer or PersonaAnalyzer()
+        self.cache = PersonaCache.from_config()
         logger.info("AnalyzerNode initialized with PersonaAnalyzer")
 
+    @staticmethod
+    def _select_evidence(state: NodeState) -> tuple[list[str], list[str]]:
+        """
+        Narrows posts & comments down to the documents retrieved for any persona attribute (see RetrieverNode),
+        keeping their scraped order & near-duplicate counts - or returns all of them when nothing was retrieved
+        """
+        selected = {doc_id for ids in state.evidence.values() for doc_id in ids}
+        if not selected:
+            return state.posts, state.comments
+
+        documents = [doc for doc in state.documents if doc.metadata.get("id") in selected]
+        rendered = [(doc, with_count(doc.page_content, doc.metadata.get("occurrences", 1))) for doc in documents]
+        posts = [text for doc, text in rendered if doc.metadata.get("kind") == SUBMISSION]
+        comments = [text for doc, text in rendered if doc.metadata.get("kind") != SUBMISSION]
+        return posts, comments
+
     async def process(self, state: NodeState) -> NodeState:
         try:
             if not state.documents:
@@ -17,15 +40,33 @@ class AnalyzerNode:
                 state.response = "No Reddit posts available to analyze."
                 return state
 
-            logger.info(f"Analyzing {len(state.documents)} Reddit posts...")
+            # The cache hashes the whole history & reads/writes JSON files, so it runs off the event loop
+            if self.cache:
+                cached = await asyncio.to_thread(self.cache.get, state.username, state.posts, state.comments)
+                if cached is not None:
+                    logger.info(f"Serving cached persona for {state.username}, content unchanged.")
+                    state.selection = cached
+                    return state
+
+            # Map-reduce exists so that no item gets dropped, so it's decided on the whole history & skips retrieval
+            if self.analyzer.needs_map_reduce(state.posts, state.comments, state.username):
+                posts, comments = state.posts, state.comments
+                analyze = self.analyzer.analyze_user_map_reduce_async
+            else:
+                posts, comments = self._select_evidence(state)
+                analyze = self.analyzer.analyze_user_async
+            logger.info(f"Analyzing {len(posts) + len(comments)} of {len(state.documents)} Reddit posts...")
 
-            traits = self.analyzer.analyze_user(
+            traits = await analyze(
                 username=state.username,
-                posts=state.posts,
-                comments=state.comments
+                posts=posts,
+                comments=comments,
+                stream=bool(state.stream_values.get("stream_tokens"))
             )
 
             state.selection = traits
+            if self.cache:
+                await asyncio.to_thread(self.cache.set, state.username, state.posts, state.comments, traits)
             logger.info("Persona traits extracted.")
             return state
 
@@ -0,0 +1,34 @@
+from document_processing.citation_index import CitationIndex, summarize
+from logs.logging_config import logger
+from workflows.state import NodeState
+
+
+class CitationNode:
+    """Node responsible for checking the persona's citations against the scraped posts & comments."""
+
+    def __init__(self):
+        logger.info("CitationNode initialized")
+
+    async def process(self, state: NodeState) -> NodeState:
+        try:
+            if not state.selection or not state.documents:
+                logger.warning("No persona or documents available in state for citation checks.")
+                return state
+
+            index = CitationIndex.from_documents(state.documents)
+            state.citations = index.verify(state.response or "")
+
+            summary = summarize(state.citations)
+            if summary["fabricated"]:
+                logger.warning(
+                    f"{summary['fabricated']} of {summary['citations']} citations for {state.username} "
+                    "don't match any post or comment."
+                )
+            else:
+                logger.info(f"All {summary['citations']} citations for {state.username} verified.")
+            return state
+
+        except Exception as e:
+            logger.error(f"CitationNode failed: {e}")
+            state.error = str(e)
+            return state
@@ -0,0 +1,68 @@
+import asyncio
+from typing import List, Tuple
+
+from langchain_core.documents import Document
+
+from core.corpus_store import SUBMISSION
+from core.token_budget import TokenCounter
+from document_processing.dedup import NearDuplicateFilter, with_count
+from logs.logging_config import logger
+from workflows.state import NodeState
+
+
+class DedupNode:
+    """Node responsible for collapsing near-duplicate posts/comments before they reach the prompt."""
+
+    def __init__(self):
+        self.filter = NearDuplicateFilter()
+        logger.info("DedupNode initialized with NearDuplicateFilter")
+
+    def _dedupe(self, documents: List[Document]) -> Tuple[List[Document], int, int]:
+        """
+        Returns the kept documents, tagged with how many items each stands for, the number removed & the tokens saved
+        """
+        result = self.filter.dedupe([doc.page_content for doc in documents])
+        if not result.removed:
+            return documents, 0, 0
+
+        kept_indices = set(result.kept)
+        tokens_saved = sum(
+            TokenCounter.count(doc.page_content)
+            for index, doc in enumerate(documents)
+            if index not in kept_indices
+        )
+        kept = [
+            Document(
+                page_content=documents[index].page_content,
+                metadata={**documents[index].metadata, "occurrences": result.counts[index]},
+            )
+            for index in result.kept
+        ]
+        return kept, result.removed, tokens_saved
+
+    async def process(self, state: NodeState) -> NodeState:
+        try:
+            if not state.documents:
+                return state
+
+            # Shingling & hashing thousands of items is CPU-bound, so it runs off the event loop
+            kept, removed, tokens_saved = await asyncio.to_thread(self._dedupe, state.documents)
+            state.dedup = {"removed": removed, "tokens_saved": tokens_saved}
+            if not removed:
+                return state
+
+            rendered = [(doc, with_count(doc.page_content, doc.metadata["occurrences"])) for doc in kept]
+            state.documents = kept
+            state.posts = [text for doc, text in rendered if doc.metadata.get("kind") == SUBMISSION]
+            state.comments = [text for doc, text in rendered if doc.metadata.get("kind") != SUBMISSION]
+
+            logger.info(
+                f"Collapsed {removed} near-duplicate posts/comments for {state.username}, "
+                f"saving ~{tokens_saved} tokens"
+            )
+            return state
+
+        except Exception as e:
+            # Dedup only trims the prompt, the analyzer can still work on every document
+            logger.error(f"DedupNode failed: {e}")
+            return state
@@ -1,3 +1,6 @@
+import asyncio
+
+from core.persona_store import PersonaStore
 from document_processing.persona_writer import PersonaWriter
 from logs.logging_config import logger
 from workflows.state import NodeState
@@ -8,6 +11,12 @@ class FormatterNode:
 
     def __init__(self):
         self.writer = PersonaWriter()
+        try:
+            self.store = PersonaStore.from_config()
+        except Exception as e:
+            # eg - an SQLite build without FTS5, personas are still written as text files
+            logger.warning(f"Persona store unavailable, personas won't be searchable: {e}")
+            self.store = None
         logger.info("FormatterNode initialized with PersonaWriter")
 
     async def process(self, state: NodeState) -> NodeState:
@@ -23,6 +32,12 @@ class FormatterNode:
                 state.selection.content if hasattr(state.selection, "content") else str(state.selection)
             )
             self.writer.save_persona_to_txt(state.username, persona_text)
+            if self.store:
+                try:
+                    await asyncio.to_thread(self.store.save, state.username, persona_text)
+                except Exception as e:
+                    # The persona is already written, the search store is best-effort
+                    logger.warning(f"Couldn't save persona of {state.username} to the persona store: {e}")
 
             logger.info("Persona summary successfully generated.")
             state.response = persona_text
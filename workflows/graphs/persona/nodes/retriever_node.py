@@ -0,0 +1,59 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from configs.app_config import AppConfig
+from document_processing.analyzer import PersonaAnalyzer
+from document_processing.retriever import BM25Index
+from logs.logging_config import logger
+from workflows.state import NodeState
+
+
+class RetrieverNode:
+    """
+    Node responsible for picking the most relevant posts/comments for every persona attribute
+
+    A BM25 index is built over the (deduplicated) documents & queried once per attribute;
+    the top RETRIEVAL_TOP_K (default: 5, 0 disables retrieval) documents per attribute become the evidence.
+    Histories the analyzer will send through map-reduce skip retrieval, map-reduce reads every item anyway.
+    """
+
+    def __init__(self, analyzer: Optional[PersonaAnalyzer] = None):
+        self.top_k = AppConfig.get_config_instance().get_int("RETRIEVAL_TOP_K", 5)
+        self.analyzer = analyzer
+        logger.info(f"RetrieverNode initialized with top_k={self.top_k}")
+
+    def _retrieve(self, state: NodeState) -> Optional[Dict[str, List[int]]]:
+        """
+        Returns the indices of the top documents per attribute, or None when the history goes through map-reduce
+        """
+        if self.analyzer and self.analyzer.needs_map_reduce(state.posts, state.comments, state.username):
+            return None
+        index = BM25Index(doc.page_content for doc in state.documents)
+        return index.search_attributes(k=self.top_k)
+
+    async def process(self, state: NodeState) -> NodeState:
+        try:
+            if self.top_k <= 0 or not state.documents:
+                return state
+
+            # Token counting, indexing & scoring are CPU-bound, so they run off the event loop
+            hits = await asyncio.to_thread(self._retrieve, state)
+            if hits is None:
+                logger.info(f"Skipping retrieval for {state.username}, the history goes through map-reduce")
+                return state
+
+            state.evidence = {
+                attribute: [state.documents[i].metadata.get("id") for i in indices]
+                for attribute, indices in hits.items()
+            }
+
+            selected = {i for indices in hits.values() for i in indices}
+            logger.info(
+                f"Retrieved {len(selected)}/{len(state.documents)} documents as persona evidence for {state.username}"
+            )
+            return state
+
+        except Exception as e:
+            # Retrieval only narrows the prompt down, the analyzer falls back to every document
+            logger.error(f"RetrieverNode failed: {e}")
+            return state
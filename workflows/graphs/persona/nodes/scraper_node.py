@@ -1,4 +1,9 @@
+from typing import Optional
+
+from configs.app_config import AppConfig
+from core.corpus_store import SUBMISSION
 from core.reddit_scraper import RedditScraper
+from document_processing.utils import TextCleaner
 from workflows.state import NodeState
 from logs.logging_config import logger
 
@@ -10,8 +15,11 @@ class ScraperNode:
     Node responsible for scraping Reddit posts from the provided username
     """
 
-    def __init__(self):
-        self.scraper = RedditScraper()
+    def __init__(self, scraper: Optional[RedditScraper] = None):
+        self.scraper = scraper or RedditScraper()
+        config = AppConfig.get_config_instance()
+        self.fetch_limit = config.get_int("REDDIT_FETCH_LIMIT", 10)
+        self.item_max_chars = config.get_int("REDDIT_ITEM_MAX_CHARS", 3000)
         logger.info("ScraperNode Initialized with RedditScraper")
 
     async def process(self, state: NodeState) -> NodeState:
@@ -19,7 +27,7 @@ class ScraperNode:
             handle = state.username.strip()
             logger.info(f"Scraping Reddit data for: {handle}")
             
-            posts, comments = self.scraper.fetch_user_data(handle)
+            posts, comments = await self.scraper.fetch_user_items_async(handle, limit=self.fetch_limit)
             combined = posts + comments
 
             if not combined:
@@ -27,9 +35,18 @@ class ScraperNode:
                 state.response = f"Could not find any Reddit posts for user '{handle}'."
                 return state
 
-            state.posts = posts
-            state.comments = comments
-            state.documents = [Document(page_content=text) for text in combined]
+            # Items stream through the normalization pipeline, link-only/empty ones are dropped
+            normalized = TextCleaner.normalize_stream((item["text"] for item in combined), max_chars=self.item_max_chars)
+            state.documents = [
+                Document(
+                    page_content=text,
+                    metadata={"id": item["id"], "kind": item["kind"], "permalink": item["permalink"]},
+                )
+                for item, text in zip(combined, normalized)
+                if text
+            ]
+            state.posts = [doc.page_content for doc in state.documents if doc.metadata["kind"] == SUBMISSION]
+            state.comments = [doc.page_content for doc in state.documents if doc.metadata["kind"] != SUBMISSION]
 
             logger.info(f"Scraped {len(state.documents)} documents for user: {handle}")
             return state
@@ -0,0 +1,76 @@
+"""
+Prompt templates for the map-reduce persona mode
+
+The map prompt extracts partial, cited evidence from one chunk of a user's history as JSON.
+The reduce prompt turns the merged evidence of every chunk into the final persona card,
+using the same layout as the single-prompt mode in core/prompt_templates.py
+"""
+
+PERSONA_ATTRIBUTES = [
+    "Name", "Age", "Occupation", "Location", "Traits", "Behaviors", "Motivations", "Frustrations", "Goals",
+]
+
+PARTIAL_PERSONA_PROMPT = """
+From the following Reddit posts/comments of user `{username}`, extract evidence for a user persona.
+
+Return ONLY a JSON object with these keys: {attributes}.
+Each key maps to a list of objects: {{"value": "<finding in plain language>", "citation": "<exact excerpt>"}}.
+
+- Only include findings that the text directly supports.
+- The citation must be copied verbatim from a single post or comment below.
+- A post or comment ending in "(posted N×)" was posted N times - don't copy that marker into citations.
+- Use an empty list for attributes with no evidence.
+
+Reddit content (part {part} of {parts}):
+-------------------------------------------------------
+
+{content}
+""".strip()
+
+REDUCE_PERSONA_PROMPT = """
+Below is evidence about Reddit user `{username}`, gathered from {parts} separate parts of their post & comment history.
+Merge it into one detailed user persona. Prefer findings supported by several citations, drop contradictions with weak support.
+
+For each attribute (Name, Age, Occupation, Location, Traits, Behaviors, Motivations, Frustrations, Goals):
+
+- Write the value in plain language.
+- Under each value, include: `Cited from: "<exact excerpt>"`, reusing a citation from the evidence verbatim.
+- For multi-value fields (like Traits, Behaviors, etc.), format as bullet points with their citations below them.
+- Don't use asterisks in the output.
+
+Use this structure:
+
+</> Name: ...
+Cited from: "..."
+
+</> Age: ...
+Cited from: "..."
+
+</> Occupation: ...
+Cited from: "..."
+
+</> Location: ...
+Cited from: "..."
+
+</> Traits:
+• Trait 1
+    ↳ Cited from: "..."
+...
+
+</> Motivations:
+• Motivation 1
+    ↳ Cited from: "..."
+
+</> Frustrations:
+• Frustration 1
+    ↳ Cited from: "..."
+
+</> Goals:
+• Goal 1
+    ↳ Cited from: "..."
+
+Evidence:
+-------------------------------------------------------
+
+{evidence}
+""".strip()
@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Annotated, Optional, List
 
-from langchain.schema import Document
+from langchain_core.documents import Document
 from pydantic import BaseModel, Field
 
 from core.reducer import Reducer
@@ -49,6 +49,15 @@ class NodeState(BaseModel):
     documents: Annotated[list[Document], Reducer.update] = Field(default_factory=list)
     retrieval_attempts: Annotated[int, Reducer.increment_one] = 0
 
+    # Near-duplicate removal: {"removed": <items>, "tokens_saved": <approx. tokens>}
+    dedup: Annotated[dict, Reducer.update] = Field(default_factory=dict)
+
+    # Retrieval: persona attribute -> ids of the most relevant documents, best first
+    evidence: Annotated[dict[str, list[str]], Reducer.update] = Field(default_factory=dict)
+
+    # Citation checks: one {"citation", "verified", "source_id", "permalink"} entry per citation
+    citations: Annotated[list[dict], Reducer.update] = Field(default_factory=list)
+
 
 class InputState(BaseModel):
     """Initial input to the graph from frontend or API layer."""
@@ -59,3 +68,5 @@ class InputState(BaseModel):
 class OutputState(BaseModel):
     """Final output from the LangGraph pipeline."""
     response: str
+    citations: list[dict] = Field(default_factory=list)
+    dedup: dict = Field(default_factory=dict)
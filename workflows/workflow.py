@@ -1,25 +1,74 @@
-import logging
 import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 from langgraph.graph import END, START, StateGraph
 from langchain_core.runnables.graph import CurveStyle
 
+from core.metrics import REGISTRY, span
+from core.reddit_scraper import RedditScraper
+from document_processing.analyzer import PersonaAnalyzer
 from workflows.state import NodeState, OutputState
 from workflows.graphs.persona.nodes.scraper_node import ScraperNode
+from workflows.graphs.persona.nodes.dedup_node import DedupNode
+from workflows.graphs.persona.nodes.retriever_node import RetrieverNode
 from workflows.graphs.persona.nodes.analyzer_node import AnalyzerNode
 from workflows.graphs.persona.nodes.formatter_node import FormatterNode
-from logs.logging_config import logger
+from workflows.graphs.persona.nodes.citation_node import CitationNode
+from logs.logging_config import intercept_stdlib_logging, llm_stream_context, logger
+
+_NODE_SECONDS = REGISTRY.histogram("persona_node_duration_seconds", "Time spent in each workflow node", ["node"])
+_NODE_ERRORS = REGISTRY.counter("persona_node_errors_total", "Workflow node runs that raised or set an error", ["node"])
+_WORKFLOW_SECONDS = REGISTRY.histogram("persona_workflow_duration_seconds", "End-to-end time of 'PersonaWorkflow.run'")
+_WORKFLOW_RUNS = REGISTRY.counter("persona_workflow_runs_total", "Workflow runs by outcome (ok / error)", ["outcome"])
+
+
+def instrument_node(name: str, process: Callable[[NodeState], Awaitable[NodeState]]) -> Callable[[NodeState], Awaitable[NodeState]]:
+    """
+    Wraps a node's 'process' so each run is timed into persona_node_duration_seconds, counted in
+    persona_node_errors_total when it raises or sets 'state.error', & traced as a 'persona.node.<name>' span
+
+    Args:
+        name (str): Node name in the graph
+        process (Callable): The node's async 'process' method
+
+    Returns:
+        Callable: Instrumented coroutine function with the same signature
+    """
+    async def _process(state: NodeState) -> NodeState:
+        error_before = state.error
+        start = time.perf_counter()
+        try:
+            with span(f"persona.node.{name}", **{"persona.username": state.username}):
+                result = await process(state)
+        except Exception:
+            _NODE_ERRORS.inc(node=name)
+            raise
+        finally:
+            _NODE_SECONDS.observe(time.perf_counter() - start, node=name)
+
+        if getattr(result, "error", None) and result.error != error_before:
+            _NODE_ERRORS.inc(node=name)
+        return result
+
+    return _process
 
 
 class PersonaWorkflow:
     """
     Defines and compiles the LangGraph workflow for Reddit Persona generation
+
+    The Reddit scraper & persona analyzer can be passed in, eg - built on the record/replay fakes
+    in benchmarks/fakes.py to run the whole graph offline
     """
-    def __init__(self):
+    def __init__(self, scraper: Optional[RedditScraper] = None, analyzer: Optional[PersonaAnalyzer] = None):
         logger.info("Initializing PersonaWorkflow...")
 
-        self.scraper_node = ScraperNode()
-        self.analyzer_node = AnalyzerNode()
+        self.scraper_node = ScraperNode(scraper=scraper)
+        self.dedup_node = DedupNode()
+        self.analyzer_node = AnalyzerNode(analyzer=analyzer)
+        self.retriever_node = RetrieverNode(analyzer=self.analyzer_node.analyzer)
         self.formatter_node = FormatterNode()
+        self.citation_node = CitationNode()
 
         self.graph = self._build_graph()
 
@@ -28,19 +77,26 @@ class PersonaWorkflow:
     def _build_graph(self):
         """
         Creates and compiles the LangGraph workflow
+        Every node is wrapped by 'instrument_node' for the /metrics endpoint
         """
         workflow = StateGraph(NodeState, output=OutputState)
 
         # Define nodes
-        workflow.add_node("scraper", self.scraper_node.process)
-        workflow.add_node("analyzer", self.analyzer_node.process)
-        workflow.add_node("formatter", self.formatter_node.process)
+        workflow.add_node("scraper", instrument_node("scraper", self.scraper_node.process))
+        workflow.add_node("dedup", instrument_node("dedup", self.dedup_node.process))
+        workflow.add_node("retriever", instrument_node("retriever", self.retriever_node.process))
+        workflow.add_node("analyzer", instrument_node("analyzer", self.analyzer_node.process))
+        workflow.add_node("formatter", instrument_node("formatter", self.formatter_node.process))
+        workflow.add_node("citations", instrument_node("citations", self.citation_node.process))
 
         # Connect the flow
         workflow.add_edge(START, "scraper")
-        workflow.add_edge("scraper", "analyzer")
+        workflow.add_edge("scraper", "dedup")
+        workflow.add_edge("dedup", "retriever")
+        workflow.add_edge("retriever", "analyzer")
         workflow.add_edge("analyzer", "formatter")
-        workflow.add_edge("formatter", END)
+        workflow.add_edge("formatter", "citations")
+        workflow.add_edge("citations", END)
 
         logger.info("Workflow graph defined.")
 
@@ -99,18 +155,139 @@ class PersonaWorkflow:
         Returns:
             dict: OutputState containing the final persona summary.
         """
+        start = time.perf_counter()
         try:
             logger.info(f"Running workflow for user: {username}")
             input_state = {"username": username}
-            result = await self.graph.ainvoke(input_state)
+            with span("persona.workflow", **{"persona.username": username}):
+                result = await self.graph.ainvoke(input_state)
+            _WORKFLOW_RUNS.inc(outcome="ok" if result and result.get("response") else "error")
             return result
         except Exception as e:
             logger.error(f"Workflow run failed: {e}")
+            _WORKFLOW_RUNS.inc(outcome="error")
             return {"error": str(e)}
-        
+        finally:
+            _WORKFLOW_SECONDS.observe(time.perf_counter() - start)
+
+    async def astream(self, username: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the persona workflow while streaming progress as it happens.
+
+        Yields one event dict at a time:
+            > {"event": "node", "node": <name>, "error": <str|None>} - after each graph node finishes
+            > {"event": "token", "text": <str>} - LLM tokens, as the analyzer receives them
+            > {"event": "done", "persona": <str>, "citations": <list>, "dedup": <dict>} or {"event": "error", "detail": <str>} - once, at the end
+
+        The graph runs in its own task, so the formatter still saves the persona even if
+        the consumer stops reading early.
+
+        Args:
+            username (str): Reddit username to analyze.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        final: Dict[str, Any] = {}
+
+        async def _drive():
+            try:
+                input_state = {"username": username, "stream_values": {"stream_tokens": True}}
+                async for update in self.graph.astream(input_state, stream_mode="updates"):
+                    for node, values in update.items():
+                        error = _state_value(values, "error")
+                        response = _state_value(values, "response")
+                        if error:
+                            final["error"] = error
+                        if response:
+                            final["response"] = response
+                        if node == "citations":
+                            final["citations"] = _state_value(values, "citations") or []
+                        if node == "dedup":
+                            final["dedup"] = _state_value(values, "dedup") or {}
+                        queue.put_nowait({"event": "node", "node": node, "error": error})
+            except Exception as e:
+                logger.error(f"Workflow stream failed: {e}")
+                final["error"] = str(e)
+            finally:
+                queue.put_nowait(None)
+
+        logger.info(f"Streaming workflow for user: {username}")
+        with llm_stream_context(lambda text: queue.put_nowait({"event": "token", "text": text})):
+            task = asyncio.create_task(_drive())
+
+        while (event := await queue.get()) is not None:
+            yield event
+        await task
+
+        if final.get("response") and not final.get("error"):
+            yield {
+                "event": "done",
+                "persona": final["response"],
+                "citations": final.get("citations", []),
+                "dedup": final.get("dedup", {}),
+            }
+        else:
+            yield {"event": "error", "detail": final.get("error") or final.get("response") or "Persona generation failed"}
+
+    async def run_many(self, usernames: List[str], max_concurrency: int = 8) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the persona workflow for many users concurrently, yielding results as they finish.
+
+        Usernames are deduplicated case-insensitively. At most 'max_concurrency' workflows run at once,
+        on top of the per-process Reddit (REDDIT_MAX_CONCURRENCY) & LLM (LLM_MAX_CONCURRENCY) limits.
+        If the consumer stops early, workflows that haven't finished are cancelled.
+
+        Args:
+            usernames (List[str]): Reddit usernames to analyze.
+            max_concurrency (int): Max workflows in flight at once.
+
+        Yields:
+            dict: {"username", "status": "ok"|"error", "persona", "citations" & "dedup" or "error", "seconds"} per unique user.
+        """
+        unique_by_key: Dict[str, str] = {}
+        for name in usernames:
+            unique_by_key.setdefault(name.lower(), name)
+        unique = list(unique_by_key.values())
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        logger.info(f"Running bulk workflow for {len(unique)} users ({len(usernames) - len(unique)} duplicates dropped)")
+
+        async def _run_one(username: str) -> Dict[str, Any]:
+            async with semaphore:
+                start = time.perf_counter()
+                result = await self.run(username=username)
+                elapsed = round(time.perf_counter() - start, 3)
+            if result and result.get("response"):
+                return {
+                    "username": username,
+                    "status": "ok",
+                    "persona": result["response"],
+                    "citations": result.get("citations", []),
+                    "dedup": result.get("dedup", {}),
+                    "seconds": elapsed,
+                }
+            error = (result or {}).get("error", "Persona generation failed")
+            return {"username": username, "status": "error", "error": error, "seconds": elapsed}
+
+        tasks = [asyncio.create_task(_run_one(name)) for name in unique]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def _state_value(values: Any, key: str) -> Any:
+    """
+    Reads a field from a node update, which may be a NodeState or a plain dict
+    """
+    if isinstance(values, dict):
+        return values.get(key)
+    return getattr(values, key, None)
+
 
 if __name__ == "__main__":
     async def main():
+        intercept_stdlib_logging()
         reddit_url = input("Enter the Reddit profile URL (eg - https://www.reddit.com/user/kojied/): ").strip()
         logger.info(f"Received URL: {reddit_url}")
         